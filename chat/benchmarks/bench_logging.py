@@ -0,0 +1,133 @@
+"""Per-record cost of the chat logging pipeline.
+
+Compares the previous setup (a filter rewriting every record with f-strings,
+formatted and written synchronously by the calling thread) with the queue
+based pipeline from ``config.logging_config``. "Caller" is the time the
+event loop thread spends per ``logger.info``/``logger.debug`` call; "listener"
+is the formatting cost moved to the background thread.
+
+Usage:
+    python benchmarks/bench_logging.py [--records N]
+"""
+
+import argparse
+import io
+import logging
+import os
+import sys
+import time
+
+os.environ.setdefault('TWITCH_BOT_ID', '0')
+os.environ.setdefault('TWITCH_OWNER_ID', '0')
+os.environ.setdefault('TWITCH_CLIENT_ID', 'bench')
+os.environ.setdefault('TWITCH_CLIENT_SECRET', 'bench')
+os.environ.setdefault('TWITCH_CHANNEL', 'bench')
+os.environ.setdefault('MIDI_CLIENT_ID', 'bench')
+os.environ.setdefault('MIDI_CLIENT_SECRET', 'bench')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.logging_config import (  # noqa: E402
+    ChatLogFilter,
+    ChatQueueHandler,
+    ChatTextFormatter,
+    JsonFormatter,
+    correlation_id_var,
+)
+
+
+class LegacyChatLogFilter(logging.Filter):
+    """The filter as it was before the queue pipeline, kept for comparison."""
+
+    def filter(self, record):
+        correlation_id = correlation_id_var.get()
+        level_map = {
+            'DEBUG': '[Debug]',
+            'INFO': '[Information]',
+            'WARNING': '[Warning]',
+            'ERROR': '[Error]',
+            'CRITICAL': '[Critical]'
+        }
+        record.levelname = level_map.get(record.levelname, f'[{record.levelname}]')
+        if correlation_id:
+            record.msg = f"[chat] {record.msg} correlationID={correlation_id}"
+        else:
+            record.msg = f"[chat] {record.msg}"
+        return True
+
+
+class DiscardQueue:
+    """Queue stand-in that keeps the last record so the listener side can be timed separately."""
+
+    def put_nowait(self, record):
+        self.last = record
+
+
+def _logger(handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(f'bench.{id(handler)}')
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def _per_call(records: int, call) -> float:
+    """Nanoseconds per call."""
+    start = time.perf_counter_ns()
+    for i in range(records):
+        call(i)
+    return (time.perf_counter_ns() - start) / records
+
+
+def bench_legacy(records: int) -> dict:
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s', '%Y-%m-%d %H:%M:%S'))
+    handler.addFilter(LegacyChatLogFilter())
+    logger = _logger(handler)
+    user, text = 'viewer', '!engine Room'
+    return {
+        'info': _per_call(records, lambda i: logger.info(f"[channel] - chat from {user}: {text} {i}")),
+        'debug (filtered)': _per_call(records, lambda i: logger.debug(f"Sending message {i}: {text[:50]}...")),
+    }
+
+
+def bench_queue(records: int, formatter: logging.Formatter) -> dict:
+    log_queue = DiscardQueue()
+    handler = ChatQueueHandler(log_queue)
+    handler.addFilter(ChatLogFilter())
+    logger = _logger(handler)
+    user, text = 'viewer', '!engine Room'
+    results = {
+        'info': _per_call(records, lambda i: logger.info("[%s] - chat from %s: %s %d", 'channel', user, text, i)),
+        'debug (filtered)': _per_call(records, lambda i: logger.debug("Sending message %d: %.50s...", i, text)),
+    }
+    record = log_queue.last
+    sink = logging.StreamHandler(io.StringIO())
+    sink.setFormatter(formatter)
+    results['listener (format + write)'] = _per_call(records, lambda i: sink.handle(record))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=100_000)
+    args = parser.parse_args()
+
+    token = correlation_id_var.set('3f2b8c1e-0000-4000-8000-000000000000')
+    try:
+        runs = {
+            'legacy (sync, f-strings)': bench_legacy(args.records),
+            'queue + text': bench_queue(args.records, ChatTextFormatter()),
+            'queue + json': bench_queue(args.records, JsonFormatter()),
+        }
+    finally:
+        correlation_id_var.reset(token)
+
+    print(f"{args.records} records per measurement, ns per record\n")
+    for name, results in runs.items():
+        print(name)
+        for measurement, ns in results.items():
+            print(f"  {measurement:<28}{ns:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Command throughput and latency on each event loop backend.
+
+Runs the command path (``CommandRegistry.execute_command`` for ``!time``,
+which calls the MIDI API, then the overlay publish on NATS) against the
+local stand-ins, ``--commands`` times with ``--concurrency`` commands in
+flight, once per backend from ``services.event_loop``. The stand-ins run on
+their own thread and stdlib loop, so only the chat side runs on the backend
+being measured. Backends that are not installed are skipped.
+
+Usage:
+    python benchmarks/bench_loop.py [--commands N] [--concurrency C] [--latency SECONDS] [--runs N]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+
+os.environ.setdefault('TWITCH_BOT_ID', '0')
+os.environ.setdefault('TWITCH_OWNER_ID', '0')
+os.environ.setdefault('TWITCH_CLIENT_ID', 'bench')
+os.environ.setdefault('TWITCH_CLIENT_SECRET', 'bench')
+os.environ.setdefault('TWITCH_CHANNEL', 'bench')
+os.environ.setdefault('MIDI_CLIENT_ID', 'bench')
+os.environ.setdefault('MIDI_CLIENT_SECRET', 'bench')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from commands.command_registry import CommandRegistry  # noqa: E402
+from config.settings import settings  # noqa: E402
+from services.container import ServiceContainer  # noqa: E402
+from services.event_loop import loop_factory  # noqa: E402
+from standins import MidiStandIn, NatsStandIn  # noqa: E402
+
+
+class StandIns:
+    """MIDI and NATS stand-ins served from a background thread."""
+
+    def __init__(self, latency: float):
+        self.midi = MidiStandIn(latency)
+        self.nats = NatsStandIn(latency)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='bench-standins', daemon=True)
+
+    def __enter__(self) -> 'StandIns':
+        self._thread.start()
+        self._call(self.midi.start())
+        self._call(self.nats.start())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._call(self.nats.stop())
+        self._call(self.midi.stop())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _call(self, coro) -> None:
+        asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+
+async def run_commands(commands: int, concurrency: int) -> tuple:
+    """Warm up the services, then time ``commands`` commands; returns (seconds, latencies)."""
+    services = ServiceContainer()
+    services.start()
+    await services.wait_started()
+    registry = CommandRegistry(
+        nats_publisher=services.nats,
+        state_cache=services.state_cache,
+        midi_limiter=services.midi_limiter,
+        midi_client=services.midi_client
+    )
+    latencies = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def command(value: int) -> None:
+        async with slots:
+            start = time.perf_counter()
+            await registry.execute_command('time', [str(value)], None)
+            await services.nats.publish('overlay.time', str(value))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(command(i % 11) for i in range(commands)))
+    elapsed = time.perf_counter() - start
+    await services.close()
+    return elapsed, latencies
+
+
+def bench_backend(backend: str, commands: int, concurrency: int, runs: int) -> tuple:
+    """Median throughput (commands/s), p50 and p99 latency (seconds) over ``runs`` fresh loops."""
+    _, factory = loop_factory(backend)
+    throughput, p50, p99 = [], [], []
+    for _ in range(runs):
+        with asyncio.Runner(loop_factory=factory) as runner:
+            elapsed, latencies = runner.run(run_commands(commands, concurrency))
+        cuts = statistics.quantiles(latencies, n=100)
+        throughput.append(commands / elapsed)
+        p50.append(cuts[49])
+        p99.append(cuts[98])
+    return statistics.median(throughput), statistics.median(p50), statistics.median(p99)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--commands', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every stand-in response')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+    # Expected failures (no JetStream on the stand-in) are not part of the measurement
+    logging.disable(logging.CRITICAL)
+    # The limiter would otherwise shed load when the stand-ins are the bottleneck
+    settings.midi_concurrency_initial = settings.midi_concurrency_max = args.concurrency
+
+    with StandIns(args.latency) as standins:
+        settings.midi_device_url = standins.midi.url
+        settings.nats_url = standins.nats.url
+        print(f"{args.commands} commands, {args.concurrency} in flight, "
+              f"{args.latency * 1000:.0f}ms stand-in latency, median of {args.runs} runs")
+        print(f"  {'':<10}{'commands/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+        for backend in ('asyncio', 'uvloop'):
+            if loop_factory(backend)[0] != backend:
+                print(f"  {backend:<10}{'not installed':>12}")
+                continue
+            throughput, p50, p99 = bench_backend(backend, args.commands, args.concurrency, args.runs)
+            print(f"  {backend:<10}{throughput:>12.0f}{p50 * 1000:>10.2f}{p99 * 1000:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
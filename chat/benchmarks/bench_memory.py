@@ -0,0 +1,135 @@
+"""Steady-state resident memory of the chat service under simulated traffic.
+
+Imports the service as ``main.py`` does (TwitchIO included), connects a
+``ServiceContainer`` to the local MIDI and NATS stand-ins and runs chat
+commands through ``EightBitSaxLoungeComponent`` with a minimal fake Twitch
+context: the MIDI call, overlay publish, tracing, telemetry, logging and
+flight recorder all run as in production. Resident memory is sampled after
+the warm-up batch and after each further batch; the last sample is the
+steady state.
+
+``--check`` exits with status 1 when the steady state is over the budget
+(``MEMORY_BUDGET_MB``, set by ``LOW_FOOTPRINT=true``), or when memory kept
+growing over the last batches; tests/services/test_memory.py runs it that way.
+
+Usage:
+    python benchmarks/bench_memory.py [--commands N] [--batches N] [--check]
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+os.environ.setdefault('TWITCH_BOT_ID', '0')
+os.environ.setdefault('TWITCH_OWNER_ID', '0')
+os.environ.setdefault('TWITCH_CLIENT_ID', 'bench')
+os.environ.setdefault('TWITCH_CLIENT_SECRET', 'bench')
+os.environ.setdefault('TWITCH_CHANNEL', 'bench')
+os.environ.setdefault('MIDI_CLIENT_ID', 'bench')
+os.environ.setdefault('MIDI_CLIENT_SECRET', 'bench')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# The service's log output is not part of the measurement
+sys.stderr = open(os.devnull, 'w')
+
+import main as service  # noqa: E402,F401 - configures logging and imports what the service imports
+from bots.twitch.eightbitsaxlounge_component import EightBitSaxLoungeComponent  # noqa: E402
+from config.settings import settings  # noqa: E402
+from services.container import ServiceContainer  # noqa: E402
+from services.memory import resident_bytes  # noqa: E402
+from standins import MidiStandIn, NatsStandIn  # noqa: E402
+
+# (command, args) cycled through: valid values, invalid input and argument-less usage replies
+TRAFFIC = (
+    ('time', ['5']), ('delay', ['3']), ('engine', ['room']), ('dial1', ['7']),
+    ('dial2', ['11']), ('engine', ['nope']), ('time', []), ('engine', ['hall']),
+)
+# Growth over the last batches still counted as steady (allocator noise)
+GROWTH_TOLERANCE = 2 * 1024 * 1024
+
+
+class FakeContext:
+    """The parts of a TwitchIO command context the component uses."""
+
+    __slots__ = ('author', 'message', 'replies')
+
+    def __init__(self, user: str):
+        self.author = SimpleNamespace(name=user)
+        self.message = SimpleNamespace(timestamp=datetime.now(timezone.utc))
+        self.replies = 0
+
+    async def send(self, message: str) -> None:
+        self.replies += 1
+
+
+async def simulate(commands: int, batches: int, concurrency: int) -> list:
+    """Run ``batches`` batches of ``commands`` commands; resident bytes after each."""
+    midi, nats = MidiStandIn(), NatsStandIn()
+    await midi.start()
+    await nats.start()
+    settings.midi_device_url = midi.url
+    settings.nats_url = nats.url
+    services = ServiceContainer()
+    services.start()
+    await services.wait_started()
+    component = EightBitSaxLoungeComponent(services=services)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def command(i: int) -> None:
+        name, args = TRAFFIC[i % len(TRAFFIC)]
+        async with slots:
+            await component._execute_command(name, list(args), FakeContext(f'chatter{i % 500}'))
+
+    samples = []
+    try:
+        for batch in range(batches + 1):
+            await asyncio.gather(*(command(batch * commands + i) for i in range(commands)))
+            gc.collect()
+            samples.append(resident_bytes())
+    finally:
+        await services.close()
+        await nats.stop()
+        await midi.stop()
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--commands', type=int, default=1000, help='Commands per batch')
+    parser.add_argument('--batches', type=int, default=4, help='Batches after the warm-up batch')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--check', action='store_true', help='Exit 1 when over budget or still growing')
+    args = parser.parse_args()
+
+    imported = resident_bytes()
+    samples = asyncio.run(simulate(args.commands, args.batches, args.concurrency))
+    steady = samples[-1]
+    growth = steady - samples[len(samples) // 2]
+    budget = settings.memory_budget_mb * 2 ** 20
+
+    mode = 'low footprint' if settings.low_footprint else 'default'
+    print(f"Resident memory ({mode}), MiB")
+    print(f"  after imports      {imported / 2 ** 20:>8.1f}")
+    print(f"  after warm-up      {samples[0] / 2 ** 20:>8.1f}")
+    print(f"  steady state       {steady / 2 ** 20:>8.1f}  ({args.batches} x {args.commands} commands)")
+    print(f"  growth, last half  {growth / 2 ** 20:>8.1f}")
+    print(f"  budget             {budget / 2 ** 20:>8.1f}" if budget else "  budget                 none")
+
+    if not args.check:
+        return 0
+    if budget and steady > budget:
+        print(f"FAIL: steady state is {(steady - budget) / 2 ** 20:.1f}MiB over the budget")
+        return 1
+    if growth > GROWTH_TOLERANCE:
+        print(f"FAIL: still growing by {growth / 2 ** 20:.1f}MiB after warm-up")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
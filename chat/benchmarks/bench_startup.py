@@ -0,0 +1,153 @@
+"""Cold start cost of the chat service.
+
+Imports: time to import each top-level module in a fresh interpreter. ``main``
+no longer imports TwitchIO; ``bots.twitch.bot`` is imported in a thread while
+the services warm up.
+
+Warm-up: time until the token database is read, NATS is connected and the
+MIDI API is authenticated, then the latency of the first command, against
+local stand-ins that add ``--latency`` to every handshake and response.
+"serial" is the previous order (database, then NATS, then the first command
+authenticates on a new client); "concurrent" is ``ServiceContainer`` warming
+up alongside the database read.
+
+Usage:
+    python benchmarks/bench_startup.py [--latency SECONDS] [--runs N]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('TWITCH_BOT_ID', '0')
+os.environ.setdefault('TWITCH_OWNER_ID', '0')
+os.environ.setdefault('TWITCH_CLIENT_ID', 'bench')
+os.environ.setdefault('TWITCH_CLIENT_SECRET', 'bench')
+os.environ.setdefault('TWITCH_CHANNEL', 'bench')
+os.environ.setdefault('MIDI_CLIENT_ID', 'bench')
+os.environ.setdefault('MIDI_CLIENT_SECRET', 'bench')
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import asqlite  # noqa: E402
+
+from config.settings import settings  # noqa: E402
+from services.container import ServiceContainer  # noqa: E402
+from services.midi_client import MidiClient  # noqa: E402
+from standins import MidiStandIn, NatsStandIn  # noqa: E402
+
+MODULES = ('config.settings', 'services.container', 'services.health_server', 'main', 'bots.twitch.bot')
+_IMPORT_SNIPPET = (
+    "import sys, time; sys.path.insert(0, {src!r}); "
+    "start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+)
+
+
+def import_seconds(module: str) -> float:
+    """Seconds to import ``module`` in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, '-c', _IMPORT_SNIPPET.format(src=SRC, module=module)],
+        capture_output=True, text=True, check=True, env=os.environ.copy()
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+async def read_tokens(path: str) -> list:
+    """The token database read done by ``Bot._setup_database``."""
+    async with asqlite.create_pool(path) as db:
+        async with db.acquire() as connection:
+            await connection.execute(
+                "CREATE TABLE IF NOT EXISTS tokens(user_id TEXT PRIMARY KEY, token TEXT NOT NULL, refresh TEXT NOT NULL)"
+            )
+            return await connection.fetchall("SELECT * from tokens")
+
+
+async def first_command(client: MidiClient) -> None:
+    await client.set_effect('VentrisDualReverb', 'ReverbEngineA', 'Time', value=5)
+
+
+async def serial(db_path: str) -> tuple:
+    services = ServiceContainer()
+    start = time.perf_counter()
+    await read_tokens(db_path)
+    await services._connect_nats()
+    ready = time.perf_counter() - start
+
+    # Previously every command built its own client and authenticated on first use
+    client = MidiClient(
+        settings.midi_device_url, settings.midi_client_id, settings.midi_client_secret,
+        limiter=services.midi_limiter
+    )
+    start = time.perf_counter()
+    await first_command(client)
+    command = time.perf_counter() - start
+    await client.close()
+    await services.close()
+    return ready, command
+
+
+async def concurrent(db_path: str) -> tuple:
+    services = ServiceContainer()
+    start = time.perf_counter()
+    services.start()
+    await asyncio.gather(read_tokens(db_path), services.wait_started())
+    ready = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await first_command(services.midi_client)
+    command = time.perf_counter() - start
+    await services.close()
+    return ready, command
+
+
+async def bench_warm_up(latency: float, runs: int) -> dict:
+    midi, nats = MidiStandIn(latency), NatsStandIn(latency)
+    await midi.start()
+    await nats.start()
+    settings.midi_device_url = midi.url
+    settings.nats_url = nats.url
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'tokens.db')
+            for name, run in (('serial', serial), ('concurrent', concurrent)):
+                samples = [await run(db_path) for _ in range(runs)]
+                results[name] = (
+                    statistics.median(ready for ready, _ in samples),
+                    statistics.median(command for _, command in samples),
+                )
+    finally:
+        await nats.stop()
+        await midi.stop()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds added to every stand-in response')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    # Expected failures (no JetStream on the stand-in) are not part of the measurement
+    logging.disable(logging.CRITICAL)
+
+    print("Import time in a fresh interpreter, ms")
+    for module in MODULES:
+        samples = [import_seconds(module) for _ in range(args.runs)]
+        print(f"  {module:<28}{statistics.median(samples) * 1000:>10.0f}")
+
+    results = asyncio.run(bench_warm_up(args.latency, args.runs))
+    print(f"\nWarm-up with {args.latency * 1000:.0f}ms stand-in latency, median of {args.runs} runs, ms")
+    print(f"  {'':<14}{'ready':>10}{'first command':>16}")
+    for name, (ready, command) in results.items():
+        print(f"  {name:<14}{ready * 1000:>10.0f}{command * 1000:>16.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Local stand-ins for the MIDI API and the NATS server, used by the benchmarks.
+
+Both add a fixed ``latency`` to every handshake and response so startup and
+request paths can be compared without a cluster.
+
+- ``MidiStandIn``: aiohttp app answering ``POST /api/token``, ``GET /health``
+  and the ``/api/Midi/*`` endpoints.
+- ``NatsStandIn``: just enough of the NATS client protocol for nats-py to
+  connect, publish and flush. Requests (JetStream API calls) are answered with
+  a JetStream error so KV and consumer setup fail fast instead of timing out.
+"""
+
+import asyncio
+import json
+import re
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+
+_INFO = {
+    'server_id': 'standin',
+    'server_name': 'standin',
+    'version': '2.10.0',
+    'proto': 1,
+    'headers': True,
+    'max_payload': 1048576,
+    'jetstream': True,
+}
+_JS_ERROR = json.dumps({
+    'type': 'io.nats.jetstream.api.v1.error',
+    'error': {'code': 503, 'err_code': 10039, 'description': 'jetstream not enabled on stand-in'},
+}).encode()
+
+
+class MidiStandIn:
+    """MIDI API stand-in on 127.0.0.1."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self.port: Optional[int] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post('/api/token', self._token)
+        app.router.add_get('/health', self._ok)
+        app.router.add_post('/api/Midi/{endpoint}', self._ok)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _token(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        return web.json_response({'token': 'standin-token'})
+
+    async def _ok(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        return web.json_response({'success': True})
+
+
+class NatsStandIn:
+    """NATS server stand-in on 127.0.0.1."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.published = 0
+        self.port: Optional[int] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    @property
+    def url(self) -> str:
+        return f'nats://127.0.0.1:{self.port}'
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, '127.0.0.1', 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # sid -> subject pattern
+        subs: Dict[str, re.Pattern] = {}
+        try:
+            await asyncio.sleep(self.latency)
+            writer.write(b'INFO ' + json.dumps(_INFO).encode() + b'\r\n')
+            await writer.drain()
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                op, *args = line.decode().split()
+                op = op.upper()
+                if op == 'PING':
+                    writer.write(b'PONG\r\n')
+                elif op == 'SUB':
+                    subs[args[-1]] = _pattern(args[0])
+                elif op == 'UNSUB':
+                    subs.pop(args[0], None)
+                elif op in ('PUB', 'HPUB'):
+                    reply, size = _publish_args(op, args)
+                    await reader.readexactly(size + 2)
+                    self.published += 1
+                    if reply:
+                        await asyncio.sleep(self.latency)
+                        for sid, pattern in subs.items():
+                            if pattern.fullmatch(reply):
+                                writer.write(f'MSG {reply} {sid} {len(_JS_ERROR)}\r\n'.encode() + _JS_ERROR + b'\r\n')
+                                break
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _pattern(subject: str) -> re.Pattern:
+    """Regex for a NATS subject with ``*`` and ``>`` wildcards."""
+    tokens = [
+        r'[^.]+' if token == '*' else '.+' if token == '>' else re.escape(token)
+        for token in subject.split('.')
+    ]
+    return re.compile(r'\.'.join(tokens))
+
+
+def _publish_args(op: str, args: list) -> Tuple[Optional[str], int]:
+    """Reply subject and total payload size of a PUB/HPUB line."""
+    # PUB <subject> [reply] <size> / HPUB <subject> [reply] <header size> <total size>
+    fixed = 2 if op == 'PUB' else 3
+    reply = args[1] if len(args) > fixed else None
+    return reply, int(args[-1])
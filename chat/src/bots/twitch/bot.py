@@ -1,6 +1,8 @@
 import asqlite
+import asyncio
 import logging
 import os
+import signal
 from typing import TYPE_CHECKING
 from twitchio import eventsub
 if TYPE_CHECKING:
@@ -9,6 +11,9 @@ if TYPE_CHECKING:
 from config.settings import settings
 from bots.streaming_bot import StreamingBot
 import bots.twitch.twitchio_autobot as twitchio_autobot
+from bots.twitch.reloader import CommandReloader
+from services.command_bridge import IngestBridge
+from services.container import ServiceContainer
 
 logger = logging.getLogger(__name__)
 BOT_ID = settings.twitch_bot_id  # The Account ID of the bot user...
@@ -20,11 +25,20 @@ class Bot(StreamingBot):
     Implements StreamingBot interface and sets up token database for Twitchio token management.
     """
     
-    def __init__(self) -> None:
-        
+    def __init__(self, services: ServiceContainer | None = None, bridge: IngestBridge | None = None) -> None:
+        """
+        Initialize the bot.
+
+        Args:
+            services: Shared connections, usually already warming up; created when omitted
+            bridge: Set in the ingest process (PROCESS_MODE=split): commands are forwarded
+                to the execution process and NATS and the MIDI API are not used here
+        """
         self._shutdown = False
-        self._connected = False
         self._bot = None
+        self.services = services or ServiceContainer()
+        self.bridge = bridge
+        self._reloader = CommandReloader(self._install_component, services=self.services, bridge=bridge)
     
     async def send_message(self, channel_id: str, message: str) -> None:
         if not self._bot:
@@ -40,37 +54,98 @@ class Bot(StreamingBot):
             logger.exception("Failed to send message")
 
     async def start(self) -> None:
-        """Start the bot and connect to Twitch."""
+        """
+        Start the bot and connect to Twitch.
+
+        The token database is read while NATS connects and the MIDI client
+        authenticates, and the stored tokens are validated concurrently, so the
+        bot only joins chat once every dependency is warm.
+        """
+        remote = self.bridge is not None
+        if not remote:
+            self.services.start()
+
         async def runner() -> None:
             db_path = "/app/tokens/tokens.db"
             
             async with asqlite.create_pool(db_path) as tdb:
-                tokens, subs = await self._setup_database(tdb)
+                (tokens, subs), _ = await asyncio.gather(
+                    self._setup_database(tdb),
+                    asyncio.sleep(0) if remote else self.services.wait_started(settings.startup_timeout)
+                )
                 logger.info(f"Loaded {len(tokens)} tokens and {len(subs)} subscriptions from the database")
 
-                async with twitchio_autobot.TwitchioAutoBot(token_database=tdb, subs=subs) as bot:
+                async with twitchio_autobot.TwitchioAutoBot(
+                    token_database=tdb, subs=subs, services=self.services, bridge=self.bridge,
+                    reload_commands=self.request_reload
+                ) as bot:
 
                     self._bot = bot
 
-                    for pair in tokens:
-                        await bot.add_token(*pair)
+                    await asyncio.gather(*(bot.add_token(*pair) for pair in tokens))
 
                     await bot.start(load_tokens=False)
 
         await runner()
 
+    async def reload_commands(self) -> bool:
+        """
+        Hot-reload the command catalog in this process (SIGHUP).
+
+        The component and its CommandRegistry are rebuilt from freshly imported modules and
+        swapped in on the running TwitchIO bot; the EventSub session, the token database pool
+        and the NATS and MIDI connections stay up. Before the bot has connected only the
+        modules are reloaded, and the component built on connect uses them.
+
+        Returns:
+            False if the reload failed and the previous commands are still in place
+        """
+        return await self._reloader.reload()
+
+    async def request_reload(self) -> bool:
+        """
+        Reload requested from chat (!reload).
+
+        In the ingest process (PROCESS_MODE=split) the parent is sent SIGHUP instead, and
+        reloads both processes.
+        """
+        if self.bridge is not None:
+            os.kill(os.getppid(), signal.SIGHUP)
+            return True
+        return await self.reload_commands()
+
+    async def _install_component(self, component) -> None:
+        if self._bot is not None:
+            await self._bot.replace_component(component)
+
     async def shutdown(self):
         """Graceful shutdown."""
         logger.info('Shutting down bot...')
         self._shutdown = True
-        self._connected = False
         if self._bot:
             await self._bot.close()
+        await self.services.close()
     
     @property
     def is_connected(self) -> bool:
         """Check if the bot is currently connected to Twitch."""
-        return self._connected and not self._shutdown
+        return self._bot is not None and self._bot.ready and not self._shutdown
+    
+    def is_ready(self) -> bool:
+        """Check if the bot is connected and can handle commands."""
+        return self.is_connected
+    
+    async def check_twitch(self) -> None:
+        """Readiness check: raise unless logged in with a loaded bot user token."""
+        if not self.is_connected:
+            raise ConnectionError("Bot not connected to Twitch")
+        # TwitchIO drops tokens it can no longer validate or refresh
+        if str(BOT_ID) not in self._bot.tokens:
+            raise PermissionError("Bot user token missing or invalid")
+    
+    async def check_nats(self) -> None:
+        """Readiness check: raise unless the shared NATS connection answers a ping."""
+        await self.services.check_nats()
     
     @property
     def bot_name(self) -> str:
@@ -1,10 +1,25 @@
+import asyncio
 import logging
+from datetime import datetime
+from time import monotonic
 from twitchio.ext import commands
 import twitchio
 
 from commands.command_registry import CommandRegistry
 from commands.handlers.errors import CommandError
-from services.nats_publisher import NatsPublisher
+from config.logging_config import (
+    deadline_scope,
+    finish_command_logs,
+    format_latency_budget,
+    within_deadline,
+)
+from config.settings import settings
+from services.command_bridge import RESTARTING_MESSAGE, TIMEOUT_MESSAGE, IngestBridge
+from services.container import ServiceContainer
+from services.metrics import COMMAND_LATENCY, ERRORS
+from services.tasks import name_current_task, spawn
+from services.telemetry import telemetry
+from services.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
@@ -18,62 +33,138 @@ OVERLAY_SUBJECTS: dict[str, str] = {
     "dial2":  "overlay.dial2",
 }
 
+
+def _received_at(ctx) -> datetime | None:
+    """EventSub timestamp of the chat message that triggered a command, if known."""
+    timestamp = getattr(getattr(ctx, 'message', None), 'timestamp', None)
+    return timestamp if isinstance(timestamp, datetime) else None
+
+
 class EightBitSaxLoungeComponent(commands.Component):
     """Main component for the EightBitSaxLounge Twitch bot."""
 
-    def __init__(self, **kwargs) -> None:
+    def __init__(
+        self,
+        services: ServiceContainer | None = None,
+        bridge: IngestBridge | None = None,
+        **kwargs
+    ) -> None:
+        """
+        Initialize the component.
+
+        Args:
+            services: Shared connections and state; a new container is created when omitted
+            bridge: In the ingest process (PROCESS_MODE=split), forwards commands to the execution process
+        """
         super().__init__()
-        self._nats = NatsPublisher()
-        self._nats_connected = False
+        self._bridge = bridge
+        self._services = services or ServiceContainer()
+        self._nats = self._services.nats
+        self._state_cache = self._services.state_cache
+        self._midi_state = self._services.midi_state
+        self._effect_state = self._services.effect_state
+        self._midi_limiter = self._services.midi_limiter
+        self._in_flight = self._services.in_flight
+        # Built once: handlers share the MIDI client's pooled connection and token
+        self._registry = CommandRegistry(
+            nats_publisher=self._nats,
+            state_cache=self._state_cache,
+            midi_limiter=self._midi_limiter,
+            midi_client=self._services.midi_client
+        )
 
-    async def _ensure_nats(self) -> None:
-        """Lazily connect to NATS on first use."""
-        if not self._nats_connected:
-            try:
-                await self._nats.connect()
-                self._nats_connected = True
-            except Exception as e:
-                logger.error("Failed to connect to NATS: %s", e)
+    async def _ensure_services(self) -> None:
+        """
+        Make sure the services are warming up.
+
+        Normally they were started before the bot joined chat. Commands never
+        wait for the connection, so a slow or unreachable NATS server cannot
+        eat into a command's deadline; publishes are skipped until it is up.
+        The ingest process has no use for them: its commands run elsewhere.
+        """
+        if self._bridge is None:
+            self._services.start()
+
+    async def check_nats(self) -> None:
+        """Readiness check: raise unless the NATS connection answers a ping."""
+        await self._services.check_nats()
+
+    async def component_load(self) -> None:
+        """Start the services if the bot did not already when the component is added."""
+        await self._ensure_services()
+
+    async def component_teardown(self) -> None:
+        """Nothing to release: the services outlive the component and are closed with the bot."""
 
     # TwitchIO event listener for incoming chat messages
     @commands.Component.listener()
     async def event_message(self, payload: twitchio.ChatMessage) -> None:
-        logger.info(f"[{payload.broadcaster.name}] - chat from {payload.chatter.name}: {payload.text}")
+        logger.info("[%s] - chat from %s: %s", payload.broadcaster.name, payload.chatter.name, payload.text)
 
     # TwitchIO commands
     @commands.command()
     async def engine(self, ctx: commands.Context, *args) -> None:
         """Handle !engine commands."""
-        await self._execute_command('engine', list(args), ctx)
+        await self.dispatch('engine', list(args), ctx)
 
     @commands.command()
     async def time(self, ctx: commands.Context, *args) -> None:
         """Handle !time commands."""
-        await self._execute_command('time', list(args), ctx)
+        await self.dispatch('time', list(args), ctx)
     
     @commands.command()
     async def delay(self, ctx: commands.Context, *args) -> None:
         """Handle !delay commands."""
-        await self._execute_command('delay', list(args), ctx)
+        await self.dispatch('delay', list(args), ctx)
     
     @commands.command()
     async def dial1(self, ctx: commands.Context, *args) -> None:
         """Handle !dial1 commands."""
-        await self._execute_command('dial1', list(args), ctx)
+        await self.dispatch('dial1', list(args), ctx)
     
     @commands.command()
     async def dial2(self, ctx: commands.Context, *args) -> None:
         """Handle !dial2 commands."""
-        await self._execute_command('dial2', list(args), ctx)
+        await self.dispatch('dial2', list(args), ctx)
     
     @commands.command()
     async def help(self, ctx: commands.Context, *args) -> None:
         """Handle !help command."""
-        await self._execute_command('help', list(args), ctx)
+        await self.dispatch('help', list(args), ctx)
 
     @commands.command()
     async def player(self, ctx: commands.Context, *args) -> None:
         """Handle !player <3-char-string> command. Updates the player panel on the overlay."""
+        await self.dispatch('player', list(args), ctx)
+
+    @commands.command()
+    @commands.is_owner()
+    async def reload(self, ctx: commands.Context, *args) -> None:
+        """Handle !reload (bot owner only). Reloads the command catalog without reconnecting."""
+        reload_commands = getattr(ctx.bot, 'reload_commands', None)
+        if reload_commands is None:
+            await ctx.send("❌ Reloading is not available.")
+            return
+        if await reload_commands():
+            await ctx.send("🔄 Commands reloaded.")
+        else:
+            await ctx.send("❌ Reload failed, the previous commands are still active.")
+
+    async def dispatch(self, command: str, args: list, ctx) -> None:
+        """
+        Run a chat command, or forward it to the execution process in split mode.
+
+        The execution process calls this with a ``RemoteContext`` for the commands it receives.
+        """
+        if self._bridge is not None:
+            await self._bridge.submit(command, args, ctx)
+        elif command == 'player':
+            await self._execute_player(args, ctx)
+        else:
+            await self._execute_command(command, args, ctx)
+
+    async def _execute_player(self, args: list, ctx) -> None:
+        """Update the player panel on the overlay with a 3-character name."""
         if not args:
             await ctx.send("❌ Usage: !player <name> (3 characters)")
             return
@@ -81,54 +172,200 @@ class EightBitSaxLoungeComponent(commands.Component):
         if len(value) != 3:
             await ctx.send(f"❌ Player name must be exactly 3 characters, got {len(value)}: '{value}'")
             return
-        await self._ensure_nats()
-        try:
-            await self._nats.publish("overlay.player", value.upper())
-            await ctx.send(f"🎵 Player updated: {value.upper()}")
-            logger.info(f"Player overlay updated to '{value.upper()}' by {ctx.author.name}")
-        except Exception as e:
-            logger.error(f"Failed to publish player overlay event: {e}")
-            await ctx.send("❌ An error occurred while updating the player.")
+        if not self._in_flight.accepting:
+            await self._reject_draining('player', ctx)
+            return
+        name_current_task('command-player')
+        with deadline_scope(settings.command_deadline), self._in_flight.track(), \
+                tracer.start_trace('command player', received_at=_received_at(ctx), command='player'):
+            try:
+                await self._ensure_services()
+                await self._nats.publish("overlay.player", value.upper())
+                await within_deadline('reply', ctx.send(f"🎵 Player updated: {value.upper()}"))
+                logger.info("Player overlay updated to '%s' by %s", value.upper(), ctx.author.name)
+            except Exception as e:
+                logger.error("Failed to publish player overlay event: %s", e)
+                await ctx.send("❌ An error occurred while updating the player.")
 
     async def _execute_command(self, command: str, args: list, ctx):
-        """Execute a command through the command registry and emit overlay event on success."""
-        try:
-            import asyncio
-            user = ctx.author.name if hasattr(ctx, 'author') else 'unknown'
-            logger.info(f'Executing !{command} command from {user} with args: {args}')
-
-            if command == 'help':
-                await self._ensure_nats()
-            command_registry = CommandRegistry(nats_publisher=self._nats)
-            
+        """
+        Execute a command through the command registry and emit overlay event on success.
+
+        The whole command runs under ``settings.command_deadline``; each stage is
+        bounded by what is left of it and the time spent per stage is logged.
+        Commands are refused while the bot drains for shutdown.
+        """
+        if not self._in_flight.accepting:
+            await self._reject_draining(command, ctx)
+            return
+        name_current_task(f'command-{command}')
+        start = monotonic()
+        outcome = 'ok'
+        user = ctx.author.name if hasattr(ctx, 'author') else 'unknown'
+        received_at = _received_at(ctx)
+        with deadline_scope(settings.command_deadline), self._in_flight.track(), \
+                tracer.start_trace(f'command {command}', received_at=received_at, command=command, user=user) as trace, \
+                telemetry.command(command, received_at):
             try:
-                response = await command_registry.execute_command(command, args, ctx)
-            except CommandError as e:
-                await ctx.send(str(e))
-                logger.info(f'Command !{command} rejected (invalid input): {e}')
-                return
+                logger.info('Executing !%s command from %s with args: %s', command, user, args)
 
+                await self._ensure_services()
+
+                if settings.optimistic_overlay and command in OVERLAY_SUBJECTS and args:
+                    outcome = await self._execute_optimistic(self._registry, command, args, ctx)
+                    return
+
+                try:
+                    with tracer.span('handler'):
+                        response = await within_deadline('handler', self._registry.execute_command(command, args, ctx))
+                except CommandError as e:
+                    outcome = 'rejected'
+                    await ctx.send(str(e))
+                    logger.info('Command !%s rejected (invalid input): %s', command, e)
+                    return
+
+                await self._send_response(command, response, ctx)
+
+                # Emit overlay event if this command has a subject mapping
+                if command in OVERLAY_SUBJECTS and args:
+                    await self._publish_overlay(command, args[0])
+                    await self._store_state(command, args[0])
+
+            except asyncio.TimeoutError:
+                outcome = 'timeout'
+                logger.warning('Command !%s ran out of its %ss deadline', command, settings.command_deadline)
+                await self._send_error(ctx, TIMEOUT_MESSAGE)
+            except Exception as e:
+                outcome = 'error'
+                logger.error('Error executing command %s: %s', command, e)
+                await self._send_error(ctx, '❌ An error occurred while processing your command.')
+            except asyncio.CancelledError:
+                # Only cancelled when a shutdown drain runs out of time
+                outcome = 'cancelled'
+                logger.warning('Command !%s cancelled during shutdown', command)
+                await self._send_error(ctx, RESTARTING_MESSAGE)
+                raise
+            finally:
+                trace.set_attribute('outcome', outcome)
+                failed = outcome in ('timeout', 'error', 'cancelled')
+                if failed:
+                    trace.set_error(outcome)
+                COMMAND_LATENCY.labels(command, outcome).observe(monotonic() - start)
+                if outcome == 'error':
+                    ERRORS.labels('command').inc()
+                logger.info('Command !%s latency budget: %s', command, format_latency_budget(settings.command_deadline))
+                telemetry.finish(outcome, monotonic() - start, failed)
+                finish_command_logs(failed=failed)
+
+    async def _execute_optimistic(self, command_registry: CommandRegistry, command: str, args: list, ctx) -> str:
+        """
+        Publish the overlay event and reply while the MIDI call is still in flight.
+
+        Arguments are validated first so invalid input never reaches the overlay.
+        If the command then fails, a compensating overlay event restores the
+        value from the cached device state. A failed reply does not abandon the
+        MIDI call: it is still awaited, and the reply failure is raised once the
+        device state is settled.
+
+        Returns:
+            The command outcome ('ok', 'rejected', 'timeout' or 'error')
+        """
+        try:
+            response = command_registry.optimistic_response(command, args)
+        except CommandError as e:
+            await ctx.send(str(e))
+            logger.info('Command !%s rejected (invalid input): %s', command, e)
+            return 'rejected'
+
+        execution = spawn(command_registry.execute_command(command, args, ctx), name=f'midi-{command}')
+        announce = [self._publish_overlay(command, args[0])]
+        if response is not None:
+            announce.append(self._send_response(command, response, ctx))
+        try:
+            announced = await asyncio.gather(*announce, return_exceptions=True)
+        except asyncio.CancelledError:
+            execution.cancel()
+            raise
+        reply_error = next((r for r in announced if isinstance(r, Exception)), None)
+        if reply_error is not None:
+            logger.warning('Optimistic reply for !%s failed, waiting for the MIDI call: %r', command, reply_error)
+
+        try:
+            with tracer.span('handler'):
+                result = await within_deadline('handler', execution)
+        except Exception as e:
+            # The cache holds the value the device is actually on: unchanged after a
+            # failed MIDI call, or the winning value when the change was overridden
+            restore = self._state_cache.get(command)
+            if restore is not None:
+                # Fresh budget: the compensation must go out even if the command timed out
+                with deadline_scope(settings.command_deadline):
+                    await self._publish_overlay(command, restore)
+                logger.info('Restored overlay for !%s to %s after failure', command, restore)
+            else:
+                logger.warning('No cached state to restore overlay for !%s after failure', command)
+            if isinstance(e, asyncio.TimeoutError):
+                outcome, message = 'timeout', TIMEOUT_MESSAGE
+            elif isinstance(e, CommandError):
+                outcome, message = 'rejected', str(e)
+            else:
+                outcome, message = 'error', '❌ An error occurred while processing your command.'
+            await self._send_error(ctx, message)
+            logger.info('Command !%s failed after optimistic update: %r', command, e)
+            return outcome
+
+        if response is None:
+            await self._send_response(command, result, ctx)
+        await self._store_state(command, args[0])
+        if reply_error is not None:
+            # The device did change, so the overlay stays; only the reply is reported as failed
+            raise reply_error
+        return 'ok'
+
+    async def _send_response(self, command: str, response, ctx) -> None:
+        """Send a command response to chat, pacing multi-message responses."""
+        with tracer.span('reply'):
             # Handle both single string responses and list of messages
             if isinstance(response, list):
-                logger.info(f'Sending {len(response)} messages for !{command} command')
+                logger.info('Sending %d messages for !%s command', len(response), command)
                 for i, message in enumerate(response):
-                    logger.debug(f'Sending message {i+1}/{len(response)}: {message[:50]}...')
-                    await ctx.send(message)
+                    logger.debug('Sending message %d/%d: %.50s...', i + 1, len(response), message)
+                    await within_deadline('reply', ctx.send(message))
                     if i < len(response) - 1:
                         await asyncio.sleep(1.5)
-                logger.info(f'Successfully sent all {len(response)} messages for !{command}')
+                logger.info('Successfully sent all %d messages for !%s', len(response), command)
             else:
-                await ctx.send(response)
-                logger.info(f'Successfully executed !{command} command')
+                await within_deadline('reply', ctx.send(response))
+                logger.info('Successfully executed !%s command', command)
 
-            # Emit overlay event if this command has a subject mapping
-            if command in OVERLAY_SUBJECTS and args:
-                await self._ensure_nats()
-                try:
-                    await self._nats.publish(OVERLAY_SUBJECTS[command], args[0])
-                except Exception as e:
-                    logger.error(f"Failed to publish overlay event for !{command}: {e}")
+    async def _reject_draining(self, command: str, ctx) -> None:
+        """Tell the chatter the bot is shutting down instead of starting a command."""
+        logger.info('Refused !%s from %s: draining for shutdown', command, getattr(ctx.author, 'name', 'unknown'))
+        await self._send_error(ctx, RESTARTING_MESSAGE)
+
+    async def _send_error(self, ctx, message: str) -> None:
+        """
+        Send a failure reply to chat.
 
+        Not bounded by the command deadline, so chatters still hear about a
+        command that ran out of time.
+        """
+        try:
+            with tracer.span('reply', error_reply=True):
+                await ctx.send(message)
+        except Exception as e:
+            logger.error('Failed to send error reply: %s', e)
+
+    async def _publish_overlay(self, command: str, value: str) -> None:
+        """Publish an overlay event for a command, logging rather than raising on failure."""
+        try:
+            await self._nats.publish(OVERLAY_SUBJECTS[command], value)
+        except Exception as e:
+            logger.error("Failed to publish overlay event for !%s: %s", command, e)
+
+    async def _store_state(self, command: str, value: str) -> None:
+        """Record a command's new value in the shared effect state."""
+        try:
+            await self._effect_state.put(command, value)
         except Exception as e:
-            logger.error(f'Error executing command {command}: {e}')
-            await ctx.send('❌ An error occurred while processing your command.')
\ No newline at end of file
+            logger.error("Failed to store shared state for !%s: %s", command, e)
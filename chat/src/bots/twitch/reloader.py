@@ -0,0 +1,98 @@
+"""Hot reload of the chat commands.
+
+``CommandReloader.reload`` picks up a changed command catalog (the engine
+list and help topics in ``COMMAND_CATALOG_FILE``, a ConfigMap volume in the
+cluster) without a restart:
+
+1. the catalog settings (``CATALOG_SETTINGS``) are read, but not applied yet
+2. the handler, registry and component modules are imported again, which
+   only changes code when running from a source tree; the image's code is fixed
+3. a new ``EightBitSaxLoungeComponent``, with its own ``CommandRegistry``,
+   is built on the running services and handed to ``install``, which puts
+   it in place of the running one in a single step
+4. the catalog is applied to the shared ``settings``, which handlers read
+   on every command
+
+The TwitchIO connection (EventSub websocket and subscriptions), the token
+database pool and the NATS and MIDI connections are never touched.
+Commands already running finish on the registry they started with. If
+any step fails, the running commands stay in place and the error is logged.
+
+Triggered by SIGHUP or by the bot owner's ``!reload``.
+"""
+
+import asyncio
+import importlib
+import logging
+import sys
+import time
+from typing import Any, Awaitable, Callable
+
+from config.settings import settings
+from services.metrics import REGISTRY, Counter
+
+logger = logging.getLogger(__name__)
+
+COMPONENT_MODULE = 'bots.twitch.eightbitsaxlounge_component'
+# Dependency order, packages after their modules so their re-exports are current.
+# commands.handlers.errors is kept, so CommandError stays one class
+RELOADED_MODULES = (
+    'commands.handlers.command_handler',
+    'commands.handlers.midi_base',
+    'commands.handlers.value_handler',
+    'commands.handlers.engine',
+    'commands.handlers.help',
+    'commands.handlers',
+    'commands.command_registry',
+    'commands',
+    COMPONENT_MODULE,
+)
+RELOADS = REGISTRY.register(Counter(
+    'chat_command_reloads',
+    'Hot reloads of the command catalog, by outcome (ok, error).',
+    ('outcome',)
+))
+
+
+class CommandReloader:
+    """Rebuilds the command component from freshly imported modules and swaps it in."""
+
+    def __init__(self, install: Callable[[Any], Awaitable[None]], **component_kwargs: Any):
+        """
+        Initialize the reloader.
+
+        Args:
+            install: Replaces the running component with the one passed in
+            component_kwargs: Passed to the new component (``services``, ``bridge``)
+        """
+        self._install = install
+        self._component_kwargs = component_kwargs
+        self._lock = asyncio.Lock()
+
+    async def reload(self) -> bool:
+        """
+        Reload the catalog and swap in a new component; one reload at a time.
+
+        Returns:
+            True if the new component is in place, False if the previous one was kept
+        """
+        async with self._lock:
+            started = time.perf_counter()
+            try:
+                catalog = settings.read_catalog()
+                for name in RELOADED_MODULES:
+                    module = sys.modules.get(name)
+                    if module is not None:
+                        importlib.reload(module)
+                component_module = importlib.import_module(COMPONENT_MODULE)
+                component = component_module.EightBitSaxLoungeComponent(**self._component_kwargs)
+                await self._install(component)
+                # Only once the component is in place, so a failed reload keeps the running catalog too
+                settings.apply_catalog(catalog)
+            except Exception as e:
+                RELOADS.labels('error').inc()
+                logger.error("Command reload failed, keeping the running commands: %s", e)
+                return False
+        RELOADS.labels('ok').inc()
+        logger.info("Reloaded the command catalog in %.0fms", (time.perf_counter() - started) * 1000)
+        return True
@@ -1,11 +1,15 @@
 import asqlite
 import logging
+from typing import Awaitable, Callable
 import twitchio
 from twitchio import eventsub
 from twitchio.ext import commands
 
-from bots.twitch.eightbitsaxlounge_component import EightBitSaxLoungeComponent
+# Looked up through the module, so a hot reload also applies to components built on reconnect
+import bots.twitch.eightbitsaxlounge_component as eightbitsaxlounge_component
 from config.settings import settings
+from services.command_bridge import IngestBridge
+from services.container import ServiceContainer
 
 
 LOGGER: logging.Logger = logging.getLogger("TwitchioAutoBot")
@@ -17,8 +21,22 @@ OWNER_ID: int = settings.twitch_owner_id  # Your personal User ID..
 
 class TwitchioAutoBot(commands.AutoBot):
     """TwitchIO AutoBot with token management and event subscription."""
-    def __init__(self, *, token_database: asqlite.Pool, subs: list[eventsub.SubscriptionPayload]) -> None:
+    def __init__(
+        self,
+        *,
+        token_database: asqlite.Pool,
+        subs: list[eventsub.SubscriptionPayload],
+        services: ServiceContainer | None = None,
+        bridge: IngestBridge | None = None,
+        reload_commands: Callable[[], Awaitable[bool]] | None = None
+    ) -> None:
         self.token_database = token_database
+        self.services = services
+        self.bridge = bridge
+        # Called by !reload
+        self.reload_commands = reload_commands
+        self.component: eightbitsaxlounge_component.EightBitSaxLoungeComponent | None = None
+        self.ready = False
 
         super().__init__(
             client_id=CLIENT_ID,
@@ -33,7 +51,29 @@ class TwitchioAutoBot(commands.AutoBot):
     async def setup_hook(self) -> None:
         """Called after the bot is ready. Add custom components that e.g. define commands."""
         # Add 8bsl component which contains our commands...
-        await self.add_component(EightBitSaxLoungeComponent())
+        self.component = eightbitsaxlounge_component.EightBitSaxLoungeComponent(
+            services=self.services, bridge=self.bridge
+        )
+        await self.add_component(self.component)
+
+    async def replace_component(self, component: eightbitsaxlounge_component.EightBitSaxLoungeComponent) -> None:
+        """
+        Swap in a new command component without touching the connection.
+
+        Removing the old component and adding the new one never suspends (the component's
+        load and teardown do no I/O), so no chat message is dispatched in between. If the
+        new component fails to load, the old one is put back and the error is raised.
+        """
+        previous = self.component
+        if previous is not None:
+            await self.remove_component(previous.__component_name__)
+        try:
+            await self.add_component(component)
+        except Exception:
+            if previous is not None:
+                await self.add_component(previous)
+            raise
+        self.component = component
 
     async def event_oauth_authorized(self, payload: twitchio.authentication.UserTokenPayload) -> None:
         """Called when a user authorizes the bot and provides tokens. Store tokens and subscribe to events for the authorized user."""
@@ -57,6 +97,7 @@ class TwitchioAutoBot(commands.AutoBot):
 
     async def event_ready(self) -> None:
         """Called when the bot is ready."""
+        self.ready = True
         LOGGER.info("Successfully logged in as: %s", self.bot_id)
     
     async def _add_token(self, token: str, refresh: str) -> twitchio.authentication.ValidateTokenPayload:
@@ -4,8 +4,9 @@ Maps command names to their handler methods.
 """
 
 import logging
-from typing import Dict, Tuple, Callable, List, Any, Union
+from typing import Dict, Tuple, Callable, List, Any, Optional, Union
 
+from commands.handlers.command_handler import CommandHandler
 from config.settings import settings
 from services.midi_client import MidiClient
 
@@ -15,20 +16,28 @@ logger = logging.getLogger(__name__)
 class CommandRegistry:
     """Registry for managing and executing bot commands."""
     
-    def __init__(self, nats_publisher=None):
-        """Initialize the command registry with all available commands."""
+    def __init__(self, nats_publisher=None, state_cache=None, midi_limiter=None, midi_client=None):
+        """Initialize the command registry with all available commands.
+        
+        Args:
+            nats_publisher: NatsPublisher used by handlers that emit overlay events
+            state_cache: DeviceStateCache with confirmed device state (optional)
+            midi_limiter: AdaptiveConcurrencyLimiter shared across registries (optional)
+            midi_client: Shared MidiClient; a new one is built from settings when omitted
+        """
         from .handlers.engine import EngineHandler
         from .handlers.help import HelpHandler
         from .handlers.value_handler import ValueHandler
         
-        self._midi_client = MidiClient(
+        self._midi_client = midi_client or MidiClient(
             base_url=settings.midi_device_url,
             client_id=settings.midi_client_id,
             client_secret=settings.midi_client_secret,
-            timeout=settings.midi_api_timeout
+            timeout=settings.midi_api_timeout,
+            limiter=midi_limiter
         )
         
-        self._engine_handler = EngineHandler(self._midi_client)
+        self._engine_handler = EngineHandler(self._midi_client, state_cache=state_cache)
         self._help_handler = HelpHandler(nats_publisher=nats_publisher)
         
         # Value-based commands using ValueHandler
@@ -43,7 +52,8 @@ class CommandRegistry:
             device_effect_name="ReverbEngineA",
             device_effect_setting_name="Time",
             min_value=0,
-            max_value=10
+            max_value=10,
+            state_cache=state_cache
         )
         
         self._delay_handler = ValueHandler(
@@ -53,7 +63,8 @@ class CommandRegistry:
             device_effect_name="ReverbEngineA",
             device_effect_setting_name="PreDelay",
             min_value=0,
-            max_value=10
+            max_value=10,
+            state_cache=state_cache
         )
         
         self._dial1_handler = ValueHandler(
@@ -63,7 +74,8 @@ class CommandRegistry:
             device_effect_name="ReverbEngineA",
             device_effect_setting_name="Control1",
             min_value=0,
-            max_value=10
+            max_value=10,
+            state_cache=state_cache
         )
         
         self._dial2_handler = ValueHandler(
@@ -73,34 +85,22 @@ class CommandRegistry:
             device_effect_name="ReverbEngineA",
             device_effect_setting_name="Control2",
             min_value=0,
-            max_value=10
+            max_value=10,
+            state_cache=state_cache
         )
         
+        self._handlers: Dict[str, CommandHandler] = {
+            'engine': self._engine_handler,
+            'time': self._time_handler,
+            'delay': self._delay_handler,
+            'dial1': self._dial1_handler,
+            'dial2': self._dial2_handler,
+            'help': self._help_handler,
+        }
+        
         self._commands: Dict[str, Tuple[Callable, str]] = {
-            'engine': (
-                self._engine_handler.handle,
-                self._engine_handler.description
-            ),
-            'time': (
-                self._time_handler.handle,
-                self._time_handler.description
-            ),
-            'delay': (
-                self._delay_handler.handle,
-                self._delay_handler.description
-            ),
-            'dial1': (
-                self._dial1_handler.handle,
-                self._dial1_handler.description
-            ),
-            'dial2': (
-                self._dial2_handler.handle,
-                self._dial2_handler.description
-            ),
-            'help': (
-                self._help_handler.handle,
-                self._help_handler.description
-            ),
+            name: (handler.handle, handler.description)
+            for name, handler in self._handlers.items()
         }
     
     async def execute_command(self, command_name: str, args: List[str], context: Any) -> Union[str, List[str]]:
@@ -124,6 +124,27 @@ class CommandRegistry:
         handler_method, _ = self._commands[command_name]
         return await handler_method(args, context)
     
+    def optimistic_response(self, command_name: str, args: List[str]) -> Optional[str]:
+        """
+        Validate a command and get its success reply without executing it.
+        
+        Args:
+            command_name: The name of the command
+            args: List of arguments passed to the command
+            
+        Returns:
+            The reply to send if the command succeeds, or None if the command
+            cannot reply before it has completed
+            
+        Raises:
+            CommandError: If the arguments are invalid
+        """
+        handler = self._handlers.get(command_name)
+        if handler is None:
+            return None
+        handler.validate(args)
+        return handler.success_response(args)
+    
     def get_all_commands(self) -> Dict[str, str]:
         """
         Get all available commands and their descriptions.
@@ -143,4 +164,5 @@ class CommandRegistry:
             description: Description of what the command does
         """
         self._commands[name] = (handler, description)
+        self._handlers.pop(name, None)
         logger.info(f"Registered new command: {name}")
@@ -1,7 +1,7 @@
 """Base interface for command handlers."""
 
 from abc import ABC, abstractmethod
-from typing import Any, List, Union
+from typing import Any, List, Optional, Union
 
 from commands.handlers.errors import CommandError  # noqa: F401 - re-exported for backwards compat
 
@@ -24,6 +24,31 @@ class CommandHandler(ABC):
         """
         pass
     
+    def validate(self, args: List[str]) -> None:
+        """
+        Check command arguments without side effects.
+        
+        Args:
+            args: Command arguments
+            
+        Raises:
+            CommandError: If the arguments are invalid
+        """
+    
+    def success_response(self, args: List[str]) -> Optional[str]:
+        """
+        Get the reply for a successful command without executing it.
+        
+        Used in optimistic mode to reply while the command is still running.
+        
+        Args:
+            args: Command arguments, already validated
+            
+        Returns:
+            The success reply, or None if it depends on the command's result
+        """
+        return None
+    
     @property
     @abstractmethod
     def command_name(self) -> str:
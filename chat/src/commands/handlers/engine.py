@@ -1,12 +1,13 @@
 """Engine command handler for changing MIDI engine types."""
 
 import logging
-from typing import Any
+from typing import Any, Optional
 
 from commands.handlers.errors import CommandError
 from commands.handlers.midi_base import MidiBaseHandler
 from config.settings import settings
 from services.midi_client import MidiClient
+from services.state_cache import DeviceStateCache
 
 logger = logging.getLogger(__name__)
 
@@ -14,13 +15,14 @@ logger = logging.getLogger(__name__)
 class EngineHandler(MidiBaseHandler):
     """Handler for engine-related commands."""
     
-    def __init__(self, midi_client: MidiClient):
+    def __init__(self, midi_client: MidiClient, state_cache: Optional[DeviceStateCache] = None):
         """Initialize engine handler with MIDI client.
         
         Args:
             midi_client: Shared MidiClient instance for API requests
+            state_cache: Optional cache of confirmed device state
         """
-        super().__init__(midi_client)
+        super().__init__(midi_client, state_cache)
     
     @property
     def command_name(self) -> str:
@@ -30,41 +32,65 @@ class EngineHandler(MidiBaseHandler):
     @property
     def description(self) -> str:
         """Get the command description."""
-        # Convert engine names to lowercase for display
-        available = ', '.join([e.lower() for e in settings.valid_engines])
+        available = ', '.join(settings.engine_names)
         return f"Change MIDI engine. Usage: !engine <type>. Available: {available}"
     
-    async def handle(self, args: list[str], context: Any) -> str:
+    def validate(self, args: list[str]) -> None:
+        """Check that an engine type was given and is valid."""
+        self._resolve_engine(args)
+    
+    def success_response(self, args: list[str]) -> str:
+        """Get the reply for a successful engine change."""
+        return f"🎵 Engine set to '{args[0].lower()}' mode! 🎵"
+    
+    def _resolve_engine(self, args: list[str]) -> str:
         """
-        Handle !engine commands.
+        Map the requested engine type to its configured name.
         
         Args:
             args: Command arguments (expects engine type as first arg)
-            context: Command context (Twitch context)
             
         Returns:
-            Response message for chat
+            Engine name with the casing the MIDI API expects
+            
+        Raises:
+            CommandError: If no engine type was given or it is not valid
         """
-        # Convert valid engines to lowercase for comparison
-        valid_engines_lower = [e.lower() for e in settings.valid_engines]
+        available = ', '.join(settings.engine_names)
         
         if not args:
-            raise CommandError(f"Usage: !engine <type>. Available engines: {', '.join(valid_engines_lower)}")
+            usage = f"Usage: !engine <type>. Available engines: {available}"
+            current = self.current_value(self.command_name)
+            if current:
+                usage = f"Current engine: {current.lower()}. {usage}"
+            raise CommandError(usage)
         
         engine_type = args[0].lower()
         
-        # Find the matching engine name (case-insensitive)
-        matching_engine = None
-        for valid_engine in settings.valid_engines:
-            if valid_engine.lower() == engine_type:
-                matching_engine = valid_engine
-                break
+        # Case-insensitive lookup in the shared engine map
+        engine = settings.engine_names.get(engine_type)
+        if engine is not None:
+            return engine
+        
+        raise CommandError(f"Invalid engine type: {engine_type}. Available engines: {available}")
+    
+    async def handle(self, args: list[str], context: Any) -> str:
+        """
+        Handle !engine commands.
         
-        if not matching_engine:
-            raise CommandError(f"Invalid engine type: {engine_type}. Available engines: {', '.join(valid_engines_lower)}")
+        Args:
+            args: Command arguments (expects engine type as first arg)
+            context: Command context (Twitch context)
+            
+        Returns:
+            Response message for chat
+        """
+        matching_engine = self._resolve_engine(args)
+        engine_type = args[0].lower()
         
         try:
             requester = context.author.name if hasattr(context, 'author') else "chatbot"
+            since_revision = self.state_revision()
             
             # Call SetEffect endpoint with static values except for selection
             await self.midi_client.set_effect(
@@ -74,9 +100,12 @@ class EngineHandler(MidiBaseHandler):
                 selection=matching_engine
             )
             
-            logger.info(f"Engine changed to {matching_engine} by {requester}")
-            return f"🎵 Engine set to '{engine_type}' mode! 🎵"
-            
+            logger.info("Engine changed to %s by %s", matching_engine, requester)
         except Exception as e:
-            logger.error(f"Failed to set engine to {engine_type}: {e}")
+            logger.error("Failed to set engine to %s: %s", engine_type, e)
             raise CommandError(f"❌ Failed to set engine to '{engine_type}'. Please try again later.")
+
+        actual = await self.confirm_change(self.command_name, matching_engine, since_revision)
+        if actual is not None:
+            raise CommandError(f"⚠️ Engine change to '{engine_type}' was overridden, device is on '{actual.lower()}'.")
+        return self.success_response(args)
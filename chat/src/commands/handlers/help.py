@@ -4,12 +4,10 @@ import logging
 from typing import Any, Optional
 
 from commands.handlers.command_handler import CommandHandler
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
-# Topics that have a corresponding popup image in /images/popups/<topic>.png
-HELP_TOPICS: list[str] = ['engine', 'lofi']
-
 
 class HelpHandler(CommandHandler):
     """Handler for !help commands.
@@ -18,7 +16,7 @@ class HelpHandler(CommandHandler):
                        image cycle on the overlay).
     - !help <topic>  → publishes the topic value to overlay.popup so the matching popup
                        image is shown immediately (e.g. !help engine shows engine.png).
-                       Responds with an error if the topic is not in HELP_TOPICS.
+                       Responds with an error if the topic is not in settings.help_topics.
     """
 
     def __init__(self, nats_publisher=None):
@@ -37,7 +35,7 @@ class HelpHandler(CommandHandler):
 
     @property
     def description(self) -> str:
-        topics = ', '.join(HELP_TOPICS)
+        topics = ', '.join(settings.help_topics)
         return f"Show overlay help screens. Usage: !help or !help <topic>. Topics: {topics}"
 
     async def handle(self, args: list[str], context: Any) -> str:
@@ -59,8 +57,8 @@ class HelpHandler(CommandHandler):
             return '🎵 Showing help on the overlay!'
 
         topic = args[0].lower()
-        if topic not in HELP_TOPICS:
-            valid = ', '.join(HELP_TOPICS)
+        if topic not in settings.help_topics:
+            valid = ', '.join(settings.help_topics)
             return f"❌ No help topic '{topic}'. Available topics: {valid}"
 
         # Valid topic — show the matching popup image.
@@ -1,29 +1,83 @@
 """Base handler for command handlers that require MIDI API integration."""
 
 import logging
+from typing import Optional
 
 from services.midi_client import MidiClient
+from services.state_cache import DeviceStateCache
 from commands.handlers.command_handler import CommandHandler
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
 
+def values_match(a: str, b: str) -> bool:
+    """Compare two setting values ignoring case and numeric formatting ('5' == '5.0')."""
+    try:
+        return float(a) == float(b)
+    except (TypeError, ValueError):
+        return str(a).lower() == str(b).lower()
+
+
 class MidiBaseHandler(CommandHandler):
     """Base class for command handlers that need MIDI API integration.
-    
+
     Provides shared access to a MidiClient instance via dependency injection.
     Handlers that don't need MIDI should extend CommandHandler directly.
     """
-    
-    def __init__(self, midi_client: MidiClient):
+
+    def __init__(self, midi_client: MidiClient, state_cache: Optional[DeviceStateCache] = None):
         """Initialize the handler with a MIDI client.
-        
+
         Args:
             midi_client: Shared MidiClient instance for making requests to MIDI services
+            state_cache: Optional cache of confirmed device state fed from MIDI_STATE
         """
         self._midi_client = midi_client
-    
+        self._state_cache = state_cache
+
     @property
     def midi_client(self) -> MidiClient:
         """Get the MIDI client instance."""
         return self._midi_client
+
+    @property
+    def state_cache(self) -> Optional[DeviceStateCache]:
+        """Get the device state cache, if configured."""
+        return self._state_cache
+
+    def current_value(self, key: str) -> Optional[str]:
+        """Get the last confirmed value of a setting from the local cache."""
+        return self._state_cache.get(key) if self._state_cache else None
+
+    def state_revision(self) -> int:
+        """Get the cache revision to pass to confirm_change (0 without a cache)."""
+        return self._state_cache.revision if self._state_cache else 0
+
+    async def confirm_change(self, key: str, expected: str, since_revision: int) -> Optional[str]:
+        """
+        Wait for the MIDI layer to confirm a setting change.
+
+        Args:
+            key: Setting key (command name)
+            expected: Value the command requested
+            since_revision: Cache revision recorded before the change was sent
+
+        Returns:
+            None if the change was confirmed or confirmation is disabled/timed out,
+            otherwise the value the device actually reports (the change was overridden).
+        """
+        timeout = settings.midi_state_confirm_timeout
+        if not self._state_cache or timeout <= 0:
+            return None
+
+        entry = await self._state_cache.wait_for_update(key, since_revision, timeout, source='midi')
+        if entry is None:
+            logger.warning("No MIDI state confirmation for %s=%s within %ss", key, expected, timeout)
+            return None
+        if values_match(entry.value, expected):
+            logger.debug("MIDI state confirmed %s=%s", key, expected)
+            return None
+
+        logger.info("%s change to %s was overridden, device reports %s", key, expected, entry.value)
+        return entry.value
@@ -1,11 +1,12 @@
 """Generic value command handler for MIDI parameters that accept numeric values."""
 
 import logging
-from typing import Any
+from typing import Any, Optional
 
 from commands.handlers.errors import CommandError
 from commands.handlers.midi_base import MidiBaseHandler
 from services.midi_client import MidiClient
+from services.state_cache import DeviceStateCache
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +49,8 @@ class ValueHandler(MidiBaseHandler):
         device_effect_name: str,
         device_effect_setting_name: str,
         min_value: int = 0,
-        max_value: int = 10
+        max_value: int = 10,
+        state_cache: Optional[DeviceStateCache] = None
     ):
         """Initialize value handler with MIDI client and effect configuration.
         
@@ -60,8 +62,9 @@ class ValueHandler(MidiBaseHandler):
             device_effect_setting_name: Name of the specific effect setting
             min_value: Minimum allowed input value (default: 0)
             max_value: Maximum allowed input value (default: 10)
+            state_cache: Optional cache of confirmed device state
         """
-        super().__init__(midi_client)
+        super().__init__(midi_client, state_cache)
         self._command_name = command_name
         self._device_name = device_name
         self._device_effect_name = device_effect_name
@@ -79,32 +82,69 @@ class ValueHandler(MidiBaseHandler):
         """Get the command description."""
         return f"Set {self._command_name}. Usage: !{self._command_name} <value> (range: {self._min_value}-{self._max_value})"
     
-    async def handle(self, args: list[str], context: Any) -> str:
+    def validate(self, args: list[str]) -> None:
+        """Check that a value was given and is within range."""
+        self._parse_value(args)
+    
+    def success_response(self, args: list[str]) -> str:
+        """Get the reply for a successful value change."""
+        return f"🎵 {self._command_name.capitalize()} set to {self._display_value(float(args[0]))}! 🎵"
+    
+    @staticmethod
+    def _display_value(value: float):
+        """Format a value to show integers without decimal point."""
+        return int(value) if value == int(value) else value
+    
+    def _parse_value(self, args: list[str]) -> float:
         """
-        Handle value-based commands.
+        Parse and range-check the requested value.
         
         Args:
             args: Command arguments (expects numeric value as first arg)
-            context: Command context (Twitch context)
             
         Returns:
-            Response message for chat
+            The input value
+            
+        Raises:
+            CommandError: If no value was given, it is not a number or it is out of range
         """
         if not args:
-            raise CommandError(f"Usage: !{self._command_name} <value>. Range: {self._min_value}-{self._max_value}")
+            usage = f"Usage: !{self._command_name} <value>. Range: {self._min_value}-{self._max_value}"
+            current = self.current_value(self._command_name)
+            if current:
+                usage = f"Current {self._command_name}: {current}. {usage}"
+            raise CommandError(usage)
         
         try:
-            # Parse the input value
             input_value = float(args[0])
-            
-            # Validate range
-            if input_value < self._min_value or input_value > self._max_value:
+            # Scaling range-checks the value and rejects NaN
+            scale_value_to_midi(input_value, self._min_value, self._max_value)
+        except ValueError as e:
+            if "outside the range" in str(e):
                 raise CommandError(f"❌ Value must be between {self._min_value} and {self._max_value}")
+            raise CommandError(f"❌ Invalid value. Please provide a number between {self._min_value} and {self._max_value}")
+        
+        return input_value
+    
+    async def handle(self, args: list[str], context: Any) -> str:
+        """
+        Handle value-based commands.
+        
+        Args:
+            args: Command arguments (expects numeric value as first arg)
+            context: Command context (Twitch context)
             
+        Returns:
+            Response message for chat
+        """
+        input_value = self._parse_value(args)
+        
+        try:
             # Scale to MIDI range (0-127)
             midi_value = scale_value_to_midi(input_value, self._min_value, self._max_value)
             
             requester = context.author.name if hasattr(context, 'author') else "chatbot"
+            since_revision = self.state_revision()
             
             # Call SetEffect endpoint with the scaled value
             await self.midi_client.set_effect(
@@ -114,18 +154,15 @@ class ValueHandler(MidiBaseHandler):
                 value=midi_value
             )
             
-            logger.info(f"{self._command_name} set to {input_value} (MIDI: {midi_value}) by {requester}")
-            
-            # Format display value to show integers without decimal point
-            display_value = int(input_value) if input_value == int(input_value) else input_value
-            return f"🎵 {self._command_name.capitalize()} set to {display_value}! 🎵"
+            logger.info("%s set to %s (MIDI: %s) by %s", self._command_name, input_value, midi_value, requester)
             
-        except CommandError:
-            raise
-        except ValueError as e:
-            if "outside the range" in str(e):
-                raise CommandError(f"❌ Value must be between {self._min_value} and {self._max_value}")
-            raise CommandError(f"❌ Invalid value. Please provide a number between {self._min_value} and {self._max_value}")
         except Exception as e:
-            logger.error(f"Failed to set {self._command_name} to {args[0]}: {e}")
+            logger.error("Failed to set %s to %s: %s", self._command_name, args[0], e)
             raise CommandError(f"❌ Failed to set {self._command_name}. Please try again later.")
+
+        display_value = self._display_value(input_value)
+
+        actual = await self.confirm_change(self._command_name, str(display_value), since_revision)
+        if actual is not None:
+            raise CommandError(f"⚠️ {self._command_name.capitalize()} change to {display_value} was overridden, device is at {actual}.")
+        return self.success_response(args)
@@ -4,44 +4,350 @@ Centralized logging configuration for the Chat layer.
 Provides:
 - Automatic [chat] prefix for all log messages
 - Correlation ID support via context variables
-- Structured log formatting
+- Per-command deadline and latency budget via context variables
+- Text (default) or JSON line output, formatted and written off the event loop
+- Rate-limited sampling of repetitive records, with summaries and full logs for failed commands
+- A flight recorder keeping recent DEBUG records in memory, dumped when a command fails
+
+Records are put on a queue by the root logger's only handler; a
+``QueueListener`` thread formats them and writes to stderr, so a slow log
+pipe never blocks the event loop. Call sites should pass arguments
+(``logger.info("... %s", value)``) rather than f-strings so records below
+the configured level cost nothing to build.
 """
 
+import asyncio
+import atexit
+import json
 import logging
+import queue
+import threading
+import time
 import uuid
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
 from contextvars import ContextVar
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
 
 # Context variable to store correlation ID per async context
 correlation_id_var: ContextVar[Optional[str]] = ContextVar('correlation_id', default=None)
 
+# Context variables for the current command's deadline (time.monotonic() value)
+# and the stages its latency budget was spent on
+deadline_var: ContextVar[Optional[float]] = ContextVar('deadline', default=None)
+latency_budget_var: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar('latency_budget', default=None)
+
+
+# Level names computed once rather than per record
+_TEXT_LEVELS = {
+    logging.DEBUG: '[Debug]',
+    logging.INFO: '[Information]',
+    logging.WARNING: '[Warning]',
+    logging.ERROR: '[Error]',
+    logging.CRITICAL: '[Critical]',
+}
+_JSON_LEVELS = {
+    logging.DEBUG: 'debug',
+    logging.INFO: 'info',
+    logging.WARNING: 'warning',
+    logging.ERROR: 'error',
+    logging.CRITICAL: 'critical',
+}
+
+# Attributes every LogRecord has; anything else was passed with extra=
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {
+    'message', 'asctime', 'correlation_id'
+}
+
 
 class ChatLogFilter(logging.Filter):
-    """Filter that adds [chat] prefix and correlation ID to all log records."""
+    """Stamps each record with the correlation ID of the context that logged it."""
     
     def filter(self, record: logging.LogRecord) -> bool:
-        """Add chat prefix and correlation ID to the log record."""
-        correlation_id = correlation_id_var.get()
-        
-        # Map Python log levels to standard names
-        level_map = {
-            'DEBUG': '[Debug]',
-            'INFO': '[Information]',
-            'WARNING': '[Warning]',
-            'ERROR': '[Error]',
-            'CRITICAL': '[Critical]'
+        """Attach ``record.correlation_id`` (None outside a command)."""
+        if not hasattr(record, 'correlation_id'):
+            record.correlation_id = correlation_id_var.get()
+        return True
+
+
+class ChatQueueHandler(QueueHandler):
+    """Queue handler that leaves formatting to the listener thread."""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merge the message arguments now, since they may change once this returns.
+        Timestamps, level names, JSON encoding and tracebacks are rendered by the listener.
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class ChatTextFormatter(logging.Formatter):
+    """Formats records as ``<time> [Level] [chat] <message> correlationID=<id>``."""
+    
+    def __init__(self):
+        super().__init__(datefmt='%Y-%m-%d %H:%M:%S')
+    
+    def format(self, record: logging.LogRecord) -> str:
+        level = _TEXT_LEVELS.get(record.levelno) or f'[{record.levelname}]'
+        line = f"{self.formatTime(record, self.datefmt)} {level} [chat] {record.getMessage()}"
+        correlation_id = getattr(record, 'correlation_id', None)
+        if correlation_id:
+            line = f"{line} correlationID={correlation_id}"
+        if record.exc_info:
+            line = f"{line}\n{self.formatException(record.exc_info)}"
+        if record.stack_info:
+            line = f"{line}\n{self.formatStack(record.stack_info)}"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line for Loki/Alloy."""
+    
+    def __init__(self):
+        super().__init__()
+        self._second = -1
+        self._second_text = ''
+    
+    def _timestamp(self, created: float) -> str:
+        """RFC 3339 UTC timestamp with milliseconds; the date part is reused within a second."""
+        second = int(created)
+        if second != self._second:
+            self._second = second
+            self._second_text = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        return f"{self._second_text}.{int((created - second) * 1000):03d}Z"
+    
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(self.to_dict(record), default=str, ensure_ascii=False)
+    
+    def to_dict(self, record: logging.LogRecord) -> Dict[str, Any]:
+        """Fields of the JSON line for ``record``."""
+        entry: Dict[str, Any] = {
+            'time': self._timestamp(record.created),
+            'level': _JSON_LEVELS.get(record.levelno) or record.levelname.lower(),
+            'service': 'chat',
+            'logger': record.name,
+            'message': record.getMessage(),
         }
+        correlation_id = getattr(record, 'correlation_id', None)
+        if correlation_id:
+            entry['correlation_id'] = correlation_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return entry
+
+
+class LogSampler(logging.Filter):
+    """
+    Rate-limits repetitive records per logger and per event.
+    
+    An event is a logger plus its unformatted message template, so
+    ``logger.info("chat from %s", user)`` is one event however many users chat.
+    In each ``interval`` the first ``event_limit`` records of an event (and
+    ``logger_limit`` of a logger) pass; the rest are counted and reported in a
+    summary record when the interval ends. ERROR and above always pass.
+    
+    Sampled-out records that belong to a command (have a correlation ID) are
+    parked until ``finish_command`` says whether the command failed; a failed
+    command's records are written in full.
+    """
+    
+    def __init__(
+        self,
+        emit: Callable[[logging.LogRecord], Any],
+        interval: float = 10.0,
+        event_limit: int = 20,
+        logger_limit: int = 100,
+        max_commands: int = 256,
+        max_parked: int = 50
+    ):
+        """
+        Initialize the sampler.
         
-        # Replace levelname with bracketed version
-        record.levelname = level_map.get(record.levelname, f'[{record.levelname}]')
+        Args:
+            emit: Handles records the sampler lets through later (summaries, released records)
+            interval: Sampling window in seconds
+            event_limit: Records per event passed in full per window
+            logger_limit: Records per logger passed in full per window
+            max_commands: Commands with parked records kept; the oldest are dropped beyond this
+            max_parked: Parked records kept per command
+        """
+        super().__init__()
+        self._emit = emit
+        self._interval = interval
+        self._event_limit = event_limit
+        self._logger_limit = logger_limit
+        self._max_commands = max_commands
+        self._max_parked = max_parked
+        self._lock = threading.Lock()
+        self._window_end = time.monotonic() + interval
+        self._events: Counter = Counter()
+        self._loggers: Counter = Counter()
+        self._dropped: Counter = Counter()
+        self._parked: 'OrderedDict[str, List[logging.LogRecord]]' = OrderedDict()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Pass, or count (and park) the record."""
+        if record.levelno >= logging.ERROR or getattr(record, 'sampling_exempt', False):
+            return True
+        summaries = None
+        with self._lock:
+            if time.monotonic() >= self._window_end:
+                summaries = self._roll_window()
+            event = (record.name, record.msg if isinstance(record.msg, str) else type(record.msg).__name__)
+            self._events[event] += 1
+            self._loggers[record.name] += 1
+            keep = self._events[event] <= self._event_limit and self._loggers[record.name] <= self._logger_limit
+            if not keep:
+                self._dropped[event] += 1
+                self._park(record)
+        if summaries:
+            for summary in summaries:
+                self._emit(summary)
+        return keep
+    
+    def finish_command(self, correlation_id: str, failed: bool) -> None:
+        """
+        Release a finished command's parked records if it failed, otherwise drop them.
         
-        # Format the message with [chat] prefix and correlation ID at end
-        if correlation_id:
-            record.msg = f"[chat] {record.msg} correlationID={correlation_id}"
-        else:
-            record.msg = f"[chat] {record.msg}"
+        Args:
+            correlation_id: The command's correlation ID
+            failed: Whether the command timed out or errored
+        """
+        with self._lock:
+            parked = self._parked.pop(correlation_id, None)
+        if failed and parked:
+            for record in parked:
+                record.sampling_exempt = True
+                self._emit(record)
+    
+    def _park(self, record: logging.LogRecord) -> None:
+        correlation_id = getattr(record, 'correlation_id', None) or correlation_id_var.get()
+        if not correlation_id:
+            return
+        parked = self._parked.get(correlation_id)
+        if parked is None:
+            parked = self._parked[correlation_id] = []
+            if len(self._parked) > self._max_commands:
+                self._parked.popitem(last=False)
+        if len(parked) < self._max_parked:
+            parked.append(record)
+    
+    def _roll_window(self) -> List[logging.LogRecord]:
+        """Start a new window and build one summary record per event that was sampled out."""
+        summaries = []
+        for (name, template), dropped in self._dropped.items():
+            summary = logging.LogRecord(
+                name, logging.INFO, __file__, 0,
+                "Sampled out %d of %d records like '%s' in the last %.0fs",
+                (dropped, self._events[(name, template)], template, self._interval), None
+            )
+            summary.sampling_exempt = True
+            summary.correlation_id = None
+            summary.sampled_out = dropped
+            summaries.append(summary)
+        self._events.clear()
+        self._loggers.clear()
+        self._dropped.clear()
+        self._window_end = time.monotonic() + self._interval
+        return summaries
+
+
+# Top-level packages of the chat layer, recorded at DEBUG by the flight recorder
+CHAT_LOGGERS = ('__main__', 'bots', 'commands', 'config', 'services')
+
+
+class FlightRecorder(logging.Handler):
+    """
+    Keeps the most recent records, including DEBUG, in a ring buffer.
+    
+    Records are stored as they are (message arguments are not merged and
+    nothing is formatted), so recording costs a deque append. When an ERROR
+    record carries a correlation ID, or ``dump`` is called for a failed
+    command, the buffered records for that correlation ID that are below the
+    output level are written through ``emit`` so the failure comes with its
+    debug-level context.
+    """
+    
+    def __init__(self, capacity: int, emit: Callable[[logging.LogRecord], Any], output_level: int):
+        """
+        Initialize the recorder.
         
+        Args:
+            capacity: Records kept
+            emit: Writes dumped records (bypassing level checks)
+            output_level: Level of the normal log output; only records below it are dumped
+        """
+        super().__init__(logging.DEBUG)
+        self._records: Deque[logging.LogRecord] = deque(maxlen=capacity)
+        self._emit = emit
+        self._output_level = output_level
+        self._dumped: 'OrderedDict[str, None]' = OrderedDict()
+    
+    def handle(self, record: logging.LogRecord) -> bool:
+        """Record without taking the handler lock; deque appends are atomic."""
+        if not hasattr(record, 'correlation_id'):
+            record.correlation_id = correlation_id_var.get()
+        self._records.append(record)
+        if record.levelno >= logging.ERROR and record.correlation_id:
+            self.dump(record.correlation_id)
         return True
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        self.handle(record)
+    
+    def records(self, correlation_id: Optional[str] = None, limit: int = 200) -> List[logging.LogRecord]:
+        """
+        Buffered records, oldest first.
+        
+        Args:
+            correlation_id: Only records logged under this correlation ID
+            limit: Most recent records returned
+        """
+        records = list(self._records)
+        if correlation_id:
+            records = [r for r in records if r.correlation_id == correlation_id]
+        return records[-limit:]
+    
+    def dump(self, correlation_id: str, limit: int = 200) -> int:
+        """
+        Write the buffered records for ``correlation_id`` that the log output filtered out.
+        Each correlation ID is dumped at most once.
+        
+        Returns:
+            Number of records written
+        """
+        if correlation_id in self._dumped:
+            return 0
+        self._dumped[correlation_id] = None
+        if len(self._dumped) > 256:
+            self._dumped.popitem(last=False)
+        hidden = [r for r in self.records(correlation_id, limit) if r.levelno < self._output_level]
+        if not hidden:
+            return 0
+        header = logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            "Flight recorder: %d debug records leading up to the failure follow", (len(hidden),), None
+        )
+        header.correlation_id = correlation_id
+        for record in [header] + hidden:
+            record.sampling_exempt = True
+            self._emit(record)
+        return len(hidden)
+
+
+_listener: Optional[QueueListener] = None
+_sampler: Optional[LogSampler] = None
+_recorder: Optional[FlightRecorder] = None
 
 
 def get_correlation_id() -> str:
@@ -63,26 +369,179 @@ def clear_correlation_id() -> None:
     correlation_id_var.set(None)
 
 
-def configure_logging(log_level: str = "INFO") -> None:
+@contextmanager
+def deadline_scope(timeout: float) -> Iterator[None]:
+    """
+    Run the enclosed block under a deadline of ``timeout`` seconds from now.
+    
+    Tasks created inside the block inherit the deadline and share its latency budget.
+    
+    Args:
+        timeout: Total time budget in seconds
+    """
+    deadline_token = deadline_var.set(time.monotonic() + timeout)
+    budget_token = latency_budget_var.set([])
+    try:
+        yield
+    finally:
+        deadline_var.reset(deadline_token)
+        latency_budget_var.reset(budget_token)
+
+
+def get_remaining_time() -> Optional[float]:
+    """Get the seconds left before the current deadline, or None if there is no deadline."""
+    deadline = deadline_var.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Record time spent on a stage against the current latency budget (no-op outside a deadline)."""
+    budget = latency_budget_var.get()
+    if budget is not None:
+        budget.append((stage, seconds))
+
+
+def get_latency_budget() -> List[Tuple[str, float]]:
+    """Get the (stage, seconds) entries recorded for the current deadline."""
+    return list(latency_budget_var.get() or ())
+
+
+def format_latency_budget(timeout: float) -> str:
+    """Format the recorded stages as e.g. 'handler=120ms reply=40ms (165ms of 10000ms)'."""
+    deadline = deadline_var.get()
+    stages = ' '.join(f"{stage}={seconds * 1000:.0f}ms" for stage, seconds in get_latency_budget())
+    if deadline is None:
+        return stages
+    spent = timeout - (deadline - time.monotonic())
+    return f"{stages} ({spent * 1000:.0f}ms of {timeout * 1000:.0f}ms)"
+
+
+async def within_deadline(stage: str, awaitable: Awaitable[T]) -> T:
+    """
+    Await ``awaitable`` for no longer than the current deadline allows.
+    
+    The time taken is recorded against the latency budget under ``stage``.
+    When the deadline runs out the awaitable is cancelled.
+    
+    Args:
+        stage: Name of the stage for latency reporting (e.g. 'midi_http', 'reply')
+        awaitable: Coroutine, task or future to await
+        
+    Returns:
+        The awaitable's result
+        
+    Raises:
+        asyncio.TimeoutError: If the deadline expires first
+    """
+    remaining = get_remaining_time()
+    start = time.monotonic()
+    try:
+        if remaining is None:
+            return await awaitable
+        if remaining <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            elif isinstance(awaitable, asyncio.Future):
+                awaitable.cancel()
+            raise asyncio.TimeoutError(f"Deadline exceeded before {stage}")
+        return await asyncio.wait_for(awaitable, remaining)
+    finally:
+        record_stage(stage, time.monotonic() - start)
+
+
+def configure_logging(
+    log_level: str = "INFO",
+    log_format: str = "text",
+    sample_interval: float = 0.0,
+    sample_event_limit: int = 20,
+    sample_logger_limit: int = 100,
+    flight_recorder_size: int = 0
+) -> QueueListener:
     """
     Configure logging for the Chat service with centralized formatting.
     
+    Replaces the root logger's handlers with a queue handler; a background
+    listener thread formats records and writes them to stderr. The listener
+    is stopped (draining the queue) by ``shutdown_logging`` at interpreter exit.
+    
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        log_format: 'text' for the bracketed line format, 'json' for one JSON object per line
+        sample_interval: Sampling window in seconds; 0 disables sampling
+        sample_event_limit: Records per event (logger + message template) written per window
+        sample_logger_limit: Records per logger written per window
+        flight_recorder_size: DEBUG records of the chat loggers kept in memory; 0 disables the recorder
+        
+    Returns:
+        The started listener
     """
-    # Create root logger configuration
-    logging.basicConfig(
-        level=getattr(logging, log_level.upper()),
-        format='%(asctime)s %(levelname)s %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S',
-        force=True  # Override any existing configuration
-    )
-    
-    # Add Chat filter to all handlers
-    chat_filter = ChatLogFilter()
+    global _listener, _sampler, _recorder
+    level = getattr(logging, log_level.upper())
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter() if log_format.lower() == 'json' else ChatTextFormatter())
+    
+    log_queue: 'queue.SimpleQueue[logging.LogRecord]' = queue.SimpleQueue()
+    queue_handler = ChatQueueHandler(log_queue)
+    queue_handler.addFilter(ChatLogFilter())
+    _sampler = None
+    if sample_interval > 0:
+        _sampler = LogSampler(queue_handler.handle, sample_interval, sample_event_limit, sample_logger_limit)
+        queue_handler.addFilter(_sampler)
+    
     root_logger = logging.getLogger()
-    for handler in root_logger.handlers:
-        handler.addFilter(chat_filter)
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+        handler.close()
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(level)
+    
+    _recorder = None
+    if flight_recorder_size > 0:
+        # The chat loggers create DEBUG records for the recorder; the output keeps its level
+        queue_handler.setLevel(level)
+        _recorder = FlightRecorder(flight_recorder_size, queue_handler.handle, level)
+        root_logger.addHandler(_recorder)
+        for name in CHAT_LOGGERS:
+            logging.getLogger(name).setLevel(logging.DEBUG)
     
-    # Also add to any logger that's created later
-    logging.getLogger().addFilter(chat_filter)
+    shutdown_logging()
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+    return _listener
+
+
+def finish_command_logs(failed: bool) -> None:
+    """
+    Tell the log sampler and flight recorder the current command is done.
+    
+    Records of a failed command that were sampled out are written in full,
+    followed by its DEBUG records from the flight recorder; otherwise the
+    sampled-out records are dropped.
+    
+    Args:
+        failed: Whether the command timed out or errored
+    """
+    correlation_id = correlation_id_var.get()
+    if not correlation_id:
+        return
+    if _sampler is not None:
+        _sampler.finish_command(correlation_id, failed)
+    if failed and _recorder is not None:
+        _recorder.dump(correlation_id)
+
+
+def get_flight_recorder() -> Optional[FlightRecorder]:
+    """The flight recorder installed by ``configure_logging``, if enabled."""
+    return _recorder
+
+
+@atexit.register
+def shutdown_logging() -> None:
+    """Write out queued records and stop the listener thread. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
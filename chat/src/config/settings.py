@@ -1,8 +1,25 @@
 """Application configuration settings loaded from environment variables."""
 
-from pydantic import ConfigDict
+import json
+from functools import cached_property
+from typing import Any
+
+from pydantic import ConfigDict, TypeAdapter, model_validator
 from pydantic_settings import BaseSettings
 
+# Applied by LOW_FOOTPRINT=true to the settings that are not set explicitly. The budget is the
+# steady-state resident memory measured by benchmarks/bench_memory.py, plus headroom
+LOW_FOOTPRINT_DEFAULTS = {
+    'flight_recorder_size': 200,
+    'trace_buffer_size': 256,
+    'telemetry_max_pending': 200,
+    'heap_max_snapshots': 2,
+    'memory_budget_mb': 80.0,
+}
+
+# Settings the command catalog is built from; a hot reload re-reads only these
+CATALOG_SETTINGS = ('valid_engines', 'help_topics')
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -48,16 +65,177 @@ class Settings(BaseSettings):
         "OutboardSpring",
         "MetalBox"
     ]
+
+    # !help topics; each has a popup image in /images/popups/<topic>.png on the overlay
+    help_topics: list[str] = ['engine', 'lofi']
+
+    # JSON file with CATALOG_SETTINGS values (e.g. {"valid_engines": [...]}), typically a ConfigMap
+    # volume. Its values win over the environment, and it is re-read by a hot reload
+    command_catalog_file: str = ""
     
     # Bot Configuration
     bot_name: str = "EightBitSaxBot"
     log_level: str = "INFO"
+    log_format: str = "text"  # "text" or "json" (one object per line)
+    # Log sampling: per window (seconds; 0 disables) each event (logger + message template)
+    # and each logger writes this many records in full, the rest are summarised
+    log_sample_interval: float = 10.0
+    log_sample_event_limit: int = 20
+    log_sample_logger_limit: int = 100
+    # DEBUG records of the chat loggers kept in memory and written out when a command fails (0 disables)
+    flight_recorder_size: int = 1000
 
     # NATS Configuration
     nats_url: str = "nats://eightbitsaxlounge-state-client:4222"
     nats_user: str = "chat"
     nats_pass: str = ""
 
+    # MIDI state subscription (MIDI_STATE stream provisioned by the state layer)
+    midi_state_subject: str = "midi.*"
+    midi_state_stream: str = "MIDI_STATE"
+    midi_state_confirm_timeout: float = 0.0  # Seconds to wait for a midi.* confirmation, 0 disables
+
+    # Shared effect state (JetStream KV bucket provisioned by the state layer)
+    effect_state_bucket: str = "EFFECT_STATE"
+
+    # Total time budget for a chat command across MIDI, NATS and the chat reply (seconds)
+    command_deadline: float = 10.0
+
+    # Longest the bot waits for NATS and the MIDI API to warm up before joining chat (seconds)
+    startup_timeout: float = 10.0
+
+    # Shutdown: seconds in-flight commands get to finish before they are cancelled.
+    # Keep below the pod's terminationGracePeriodSeconds
+    shutdown_drain_timeout: float = 20.0
+
+    # Publish overlay events and reply while the MIDI call is in flight, restoring on failure
+    optimistic_overlay: bool = False
+
+    # Adaptive (AIMD) concurrency limit for MIDI API requests
+    midi_concurrency_initial: int = 4
+    midi_concurrency_min: int = 1
+    midi_concurrency_max: int = 16
+    midi_concurrency_queue: int = 32  # Requests waiting for a slot before new ones are shed
+    midi_latency_threshold: float = 1.0  # Slower requests (seconds) shrink the limit
+
+    # Command lifecycle telemetry batched to NATS (empty subject disables it)
+    telemetry_subject: str = "chat.telemetry.commands"
+    telemetry_interval: float = 1.0  # Seconds between publishes of a partial batch
+    telemetry_batch_size: int = 50
+    telemetry_sample_rate: float = 1.0  # Fraction of commands reported; failures are always sent
+    telemetry_max_pending: int = 1000
+
+    # Tracing: spans are kept in an in-process ring buffer and, when an OTLP/HTTP
+    # collector is configured (e.g. http://alloy-receiver:4318), exported to it
+    otlp_endpoint: str = ""
+    otlp_export_interval: float = 5.0
+    trace_buffer_size: int = 2048
+
+    # Bearer token for the /debug/* endpoints on the health server; empty disables them
+    debug_token: str = ""
+
+    # Event loop implementation: "auto" (uvloop when installed), "uvloop" or "asyncio"
+    event_loop: str = "auto"
+
+    # Garbage collector: "default" only times collections; "low_pause" freezes startup objects once
+    # the bot is ready, applies gc_thresholds and defers collections while commands run, for at
+    # most gc_defer_max seconds (0 disables deferral)
+    gc_mode: str = "default"
+    gc_thresholds: list[int] = [10000, 20, 20]
+    gc_defer_max: float = 5.0
+
+    # Event loop lag monitor: measurement interval and the lag that counts as a stall (seconds)
+    loop_lag_interval: float = 0.25
+    loop_stall_threshold: float = 0.1
+
+    # Supervised tasks (Twitch connection, NATS reconnects, background loops): restarts allowed
+    # per task within the window before escalating, and the restart backoff (seconds)
+    supervisor_max_restarts: int = 5
+    supervisor_window: float = 300.0
+    supervisor_backoff_initial: float = 1.0
+    supervisor_backoff_max: float = 60.0
+
+    # /health fails once the bot's event loop has been blocked this long (seconds)
+    liveness_max_lag: float = 10.0
+
+    # Background dependency probes behind /ready (seconds)
+    readiness_interval: float = 10.0
+    readiness_timeout: float = 2.0
+
+    # Task leak detector: sample interval (seconds), growing samples before flagging, minimum live tasks
+    task_leak_interval: float = 60.0
+    task_leak_window: int = 5
+    task_leak_min_count: int = 10
+
+    # Heap tracing (off until started via /debug/heap/start): default frames per
+    # allocation and named snapshots kept
+    heap_trace_frames: int = 1
+    heap_max_snapshots: int = 8
+
+    # Low-footprint mode for small nodes: LOW_FOOTPRINT_DEFAULTS shrink the in-memory buffers and
+    # set a resident memory budget, checked every memory_check_interval seconds (0 MiB: no budget)
+    low_footprint: bool = False
+    memory_budget_mb: float = 0.0
+    memory_check_interval: float = 60.0
+
+    # Process layout: "single", or "split" to run the Twitch connection (ingest) and command
+    # execution in two supervised processes joined by shared memory rings of bridge_capacity
+    # records. /health and /ready stay on 8080 (ingest); the execution process serves its own
+    # metrics and debug endpoints on execution_health_port
+    process_mode: str = "single"
+    bridge_capacity: int = 1024
+    execution_health_port: int = 8081
+
+    @cached_property
+    def engine_names(self) -> dict[str, str]:
+        """Valid engine names keyed by their lowercase form; built once and shared by every handler."""
+        return {engine.lower(): engine for engine in self.valid_engines}
+
+    def read_catalog(self) -> dict[str, Any]:
+        """
+        Read the current catalog settings without applying them.
+
+        The process environment is fixed at startup, so new values come from
+        ``command_catalog_file`` (or .env when running locally).
+
+        Raises:
+            OSError: If the catalog file cannot be read
+            ValidationError: If the configuration or the catalog file is invalid
+        """
+        fresh = type(self)()
+        return {name: getattr(fresh, name) for name in CATALOG_SETTINGS}
+
+    def apply_catalog(self, catalog: dict[str, Any]) -> None:
+        """
+        Replace the catalog settings in place; ``engine_names`` is rebuilt on next use.
+
+        Every module imports this one instance, so it is updated rather than replaced.
+        """
+        for name, value in catalog.items():
+            setattr(self, name, value)
+        self.__dict__.pop('engine_names', None)
+
+    @model_validator(mode='after')
+    def _load_command_catalog(self) -> 'Settings':
+        """Apply the values in ``command_catalog_file``, when set."""
+        if self.command_catalog_file:
+            with open(self.command_catalog_file, encoding='utf-8') as f:
+                catalog = json.load(f)
+            for name in CATALOG_SETTINGS:
+                if name in catalog:
+                    field = type(self).model_fields[name]
+                    setattr(self, name, TypeAdapter(field.annotation).validate_python(catalog[name]))
+        return self
+
+    @model_validator(mode='after')
+    def _apply_low_footprint(self) -> 'Settings':
+        """Use the low-footprint defaults for settings that were not set explicitly."""
+        if self.low_footprint:
+            for name, value in LOW_FOOTPRINT_DEFAULTS.items():
+                if name not in self.model_fields_set:
+                    setattr(self, name, value)
+        return self
+
 
 # Global settings instance
 settings = Settings()
@@ -1,40 +1,340 @@
 import asyncio
+import importlib
 import logging
+import multiprocessing
+import signal
 import sys
+import time
+from typing import Awaitable, Callable
 
-from bots.twitch.bot import Bot as StreamingBot
-from config.logging_config import configure_logging
+from bots.twitch.reloader import CommandReloader
+from config.logging_config import configure_logging, get_flight_recorder
 from config.settings import settings
+from services import event_loop
+from services.command_bridge import BridgeChannels, ExecutionBridge, IngestBridge
+from services.container import ServiceContainer
+from services.gc_monitor import GcMonitor
 from services.health_server import HealthServer
+from services.loop_monitor import LoopLagMonitor
+from services.memory import MemoryBudget
+from services.readiness import ReadinessMonitor, http_check
+from services.supervisor import ChildProcess, Supervisor
+from services.tasks import TaskLeakDetector, install_task_factory, spawn
 
-configure_logging(settings.log_level)
+configure_logging(
+    settings.log_level,
+    settings.log_format,
+    sample_interval=settings.log_sample_interval,
+    sample_event_limit=settings.log_sample_event_limit,
+    sample_logger_limit=settings.log_sample_logger_limit,
+    flight_recorder_size=settings.flight_recorder_size
+)
 logger = logging.getLogger(__name__)
 
-async def main() -> None:
+# TwitchIO and everything built on it; imported while the services warm up
+BOT_MODULE = 'bots.twitch.bot'
+COMPONENT_MODULE = 'bots.twitch.eightbitsaxlounge_component'
+PROCESS_MODES = ('single', 'split')
+
+async def main(bridge: IngestBridge | None = None) -> None:
     """
     Main function to run the bot and health server.
     - Starts the health server first, then the implementation of StreamingBot
+    - NATS, the MIDI API and the TwitchIO imports are warmed up concurrently
+    - SIGTERM/SIGINT drain in-flight commands before shutting down
+    - The Twitch connection, NATS and background loops run under a supervisor tree;
+      the process only exits when a restart budget is exhausted
+    - Garbage collections are timed; GC_MODE=low_pause keeps them out of command bursts
+    - LOW_FOOTPRINT=true shrinks in-memory buffers and checks resident memory against a budget
+    - With a bridge this is the ingest process of PROCESS_MODE=split: commands are forwarded to
+      the execution process and /ready checks it instead of NATS and the MIDI API
+    - SIGHUP hot-reloads the command catalog without reconnecting
     """
 
+    install_task_factory()
+    bot = None
+    run = None
+    loop_monitor = readiness = leak_detector = health_server = None
+    exit_code = 0
+    services = ServiceContainer()
+    supervisor = new_supervisor('chat')
+    gc_monitor = GcMonitor(settings.gc_mode, settings.gc_thresholds, settings.gc_defer_max)
+    stop = stop_on_signals()
+
+    async def check_twitch() -> None:
+        if bot is None:
+            raise ConnectionError("Bot not started")
+        await bot.check_twitch()
+
     try:
-        bot = StreamingBot()
-        health_server = HealthServer(port=8080, bot_instance=bot)
+        loop_monitor = LoopLagMonitor(settings.loop_lag_interval, settings.loop_stall_threshold)
+        if bridge is None:
+            checks = {
+                'twitch': check_twitch,
+                'nats': services.check_nats,
+                'midi': http_check(f"{settings.midi_device_url.rstrip('/')}/health"),
+            }
+        else:
+            checks = {'twitch': check_twitch, 'execution': bridge.check_execution}
+        readiness = ReadinessMonitor(checks, interval=settings.readiness_interval, timeout=settings.readiness_timeout)
+        leak_detector = TaskLeakDetector(
+            settings.task_leak_interval, settings.task_leak_window, settings.task_leak_min_count
+        )
+        health_server = HealthServer(
+            port=8080, loop_monitor=loop_monitor,
+            readiness=readiness, leak_detector=leak_detector,
+            flight_recorder=get_flight_recorder()
+        )
+        monitors = new_monitors(readiness, leak_detector)
 
+        gc_monitor.install()
+        services.in_flight.on_busy = gc_monitor.busy
+        services.in_flight.on_idle = gc_monitor.idle
+        loop_monitor.start()
         await health_server.start()
-        await bot.start()
+
+        if bridge is None:
+            services.start()
+        started = time.perf_counter()
+        # Importing TwitchIO is CPU bound; a thread lets the NATS and MIDI handshakes proceed meanwhile
+        bot_module = await asyncio.to_thread(importlib.import_module, BOT_MODULE)
+        logger.info("Imported %s in %.0fms while services warmed up", BOT_MODULE, (time.perf_counter() - started) * 1000)
+        bot = bot_module.Bot(services=services, bridge=bridge)
+        health_server.bot = bot
+        reload_on_sighup(bot.reload_commands)
+
+        supervisor.add('twitch-bot', bot.start)
+        if bridge is None:
+            supervisor.add_supervisor(services.supervisor)
+        else:
+            supervisor.add('command-bridge', bridge.run)
+        supervisor.add_supervisor(monitors)
+        run = spawn(supervisor.run(), name='supervisor-root')
+        # Everything built up to the first login is long-lived
+        spawn(gc_monitor.freeze_when(bot.is_ready), name='gc-freeze')
+        stopping = spawn(stop.wait(), name='shutdown-signal')
+        await asyncio.wait({run, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+        if run.done():
+            run.result()
+        else:
+            logger.info("Shutdown requested, draining in-flight commands")
     except KeyboardInterrupt:
         logger.warning("Shutting down due to KeyboardInterrupt")
     except Exception as e:
-        logger.error(f'Fatal error: {e}')
-        await shutdown_all(bot, health_server)
-        sys.exit(1)
+        logger.error('Fatal error: %s', e)
+        exit_code = 1
+    finally:
+        supervisor.shutdown()
+        await shutdown_all(bot, services, health_server, loop_monitor, readiness, leak_detector, gc_monitor, bridge)
+        if run is not None and not run.done():
+            run.cancel()
+            await asyncio.wait({run}, timeout=5)
+    if exit_code:
+        sys.exit(exit_code)
+
+async def execute(bridge: ExecutionBridge) -> None:
+    """
+    Execution process of PROCESS_MODE=split: runs the commands the ingest process forwards.
+    - Owns NATS, the MIDI API client and the shared state; never connects to Twitch
+    - Serves its own metrics and debug endpoints on EXECUTION_HEALTH_PORT and reports
+      readiness to the ingest process through the bridge heartbeat
+    - SIGTERM drains in-flight commands; their replies still go out through the ingest process
+    - SIGHUP hot-reloads the command catalog
+    """
+
+    install_task_factory()
+    run = None
+    loop_monitor = readiness = leak_detector = health_server = None
+    exit_code = 0
+    services = ServiceContainer()
+    supervisor = new_supervisor('chat-execution')
+    gc_monitor = GcMonitor(settings.gc_mode, settings.gc_thresholds, settings.gc_defer_max)
+    stop = stop_on_signals()
+
+    try:
+        loop_monitor = LoopLagMonitor(settings.loop_lag_interval, settings.loop_stall_threshold)
+        readiness = ReadinessMonitor(
+            {
+                'nats': services.check_nats,
+                'midi': http_check(f"{settings.midi_device_url.rstrip('/')}/health"),
+            },
+            interval=settings.readiness_interval,
+            timeout=settings.readiness_timeout
+        )
+        leak_detector = TaskLeakDetector(
+            settings.task_leak_interval, settings.task_leak_window, settings.task_leak_min_count
+        )
+        health_server = HealthServer(
+            port=settings.execution_health_port, loop_monitor=loop_monitor,
+            readiness=readiness, leak_detector=leak_detector,
+            flight_recorder=get_flight_recorder()
+        )
+        monitors = new_monitors(readiness, leak_detector)
+        bridge.ready = lambda: services.in_flight.accepting and readiness.is_ready
+
+        gc_monitor.install()
+        services.in_flight.on_busy = gc_monitor.busy
+        services.in_flight.on_idle = gc_monitor.idle
+        loop_monitor.start()
+        await health_server.start()
+
+        services.start()
+        component_module = await asyncio.to_thread(importlib.import_module, COMPONENT_MODULE)
+        component = component_module.EightBitSaxLoungeComponent(services=services)
+        await services.wait_started(settings.startup_timeout)
+
+        async def install(reloaded) -> None:
+            nonlocal component
+            component = reloaded
+        reload_on_sighup(CommandReloader(install, services=services).reload)
+
+        # Looked up per command, so a reload applies to the next one
+        supervisor.add('command-bridge', lambda: bridge.run(lambda *request: component.dispatch(*request)))
+        supervisor.add_supervisor(services.supervisor)
+        supervisor.add_supervisor(monitors)
+        run = spawn(supervisor.run(), name='supervisor-root')
+        # Everything built up to the first passing probes is long-lived
+        spawn(gc_monitor.freeze_when(lambda: readiness.is_ready), name='gc-freeze')
+        stopping = spawn(stop.wait(), name='shutdown-signal')
+        await asyncio.wait({run, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+        if run.done():
+            run.result()
+        else:
+            logger.info("Shutdown requested, draining in-flight commands")
+    except Exception as e:
+        logger.error('Fatal error: %s', e)
+        exit_code = 1
     finally:
-        await shutdown_all(bot, health_server)
+        bridge.stop()
+        supervisor.shutdown()
+        await shutdown_all(None, services, health_server, loop_monitor, readiness, leak_detector, gc_monitor)
+        if run is not None and not run.done():
+            run.cancel()
+            await asyncio.wait({run}, timeout=5)
+        bridge.close()
+    if exit_code:
+        sys.exit(exit_code)
 
-async def shutdown_all(bot, health_server):
-    """Gracefully shutdown bot and health server."""
-    await bot.shutdown()
-    await health_server.stop()
+async def supervise_processes() -> None:
+    """
+    Parent process of PROCESS_MODE=split.
+    - Creates the shared memory rings, then starts the ingest and execution processes under a
+      supervisor that restarts either one when it crashes
+    - SIGTERM stops the execution process first, so the commands it drains still have their
+      replies relayed, then the ingest process
+    - SIGHUP is passed on to both, which hot-reload their commands
+    """
+
+    run = None
+    exit_code = 0
+    context = multiprocessing.get_context('spawn')
+    channels, rings = BridgeChannels.create(context, settings.bridge_capacity)
+    execution = ChildProcess('chat-execution', execution_process, channels, context=context)
+    ingest = ChildProcess('chat-ingest', ingest_process, channels, context=context)
+    processes = new_supervisor('processes')
+    processes.add('process-execution', execution.run)
+    processes.add('process-ingest', ingest.run)
+    stop = stop_on_signals()
+    asyncio.get_running_loop().add_signal_handler(
+        signal.SIGHUP, lambda: [child.send_signal(signal.SIGHUP) for child in (execution, ingest)]
+    )
+
+    try:
+        run = spawn(processes.run(), name='supervisor-processes')
+        stopping = spawn(stop.wait(), name='shutdown-signal')
+        await asyncio.wait({run, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        stopping.cancel()
+        if run.done():
+            run.result()
+        else:
+            logger.info("Shutdown requested, stopping the execution and ingest processes")
+    except Exception as e:
+        logger.error('Fatal error: %s', e)
+        exit_code = 1
+    finally:
+        processes.shutdown()
+        # Grace for the drain plus closing connections
+        grace = settings.shutdown_drain_timeout + 10
+        await execution.stop(grace)
+        await ingest.stop(grace)
+        if run is not None and not run.done():
+            run.cancel()
+            await asyncio.wait({run}, timeout=5)
+        for ring in rings:
+            ring.close()
+    if exit_code:
+        sys.exit(exit_code)
+
+def ingest_process(channels: BridgeChannels) -> None:
+    """Entry point of the ingest process."""
+    bridge = IngestBridge(channels, reply_timeout=settings.command_deadline * 2)
+    try:
+        event_loop.run(main(bridge), settings.event_loop)
+    finally:
+        bridge.close()
+
+def execution_process(channels: BridgeChannels) -> None:
+    """Entry point of the execution process."""
+    event_loop.run(execute(ExecutionBridge(channels)), settings.event_loop)
+
+def new_supervisor(name: str) -> Supervisor:
+    """Supervisor with the restart budget and backoff from settings."""
+    return Supervisor(
+        name,
+        max_restarts=settings.supervisor_max_restarts,
+        window=settings.supervisor_window,
+        backoff_initial=settings.supervisor_backoff_initial,
+        backoff_max=settings.supervisor_backoff_max
+    )
+
+def new_monitors(readiness: ReadinessMonitor, leak_detector: TaskLeakDetector) -> Supervisor:
+    """Supervisor for the readiness probes, task leak detector and, when budgeted, the memory check."""
+    monitors = new_supervisor('monitors')
+    monitors.add('readiness-probes', readiness.run)
+    monitors.add('task-leak-detector', leak_detector.run)
+    memory_budget = MemoryBudget(settings.memory_budget_mb, settings.memory_check_interval)
+    if memory_budget.budget_bytes:
+        monitors.add('memory-budget', memory_budget.run)
+    return monitors
+
+def stop_on_signals() -> asyncio.Event:
+    """Event set when the process receives SIGTERM (Kubernetes) or SIGINT."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    return stop
+
+def reload_on_sighup(reload: Callable[[], Awaitable[bool]]) -> None:
+    """Run ``reload`` (a command hot-reload) when the process receives SIGHUP."""
+    asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, lambda: spawn(reload(), name='commands-reload'))
+
+async def shutdown_all(bot, services, health_server, loop_monitor, readiness, leak_detector, gc_monitor, bridge=None):
+    """
+    Gracefully shutdown bot, health server and background monitors.
+    - /ready fails and new commands are refused while in-flight commands finish;
+      those still running after SHUTDOWN_DRAIN_TIMEOUT are cancelled
+    - In the ingest process, commands forwarded to the execution process get their replies first
+    - Then Twitch is disconnected, telemetry and NATS are flushed and connections closed
+    - Monitors that were never created (startup failed first) are None and skipped
+    """
+    if health_server is not None:
+        health_server.draining = True
+    if bridge is not None:
+        await bridge.drain(settings.shutdown_drain_timeout)
+    await services.drain(settings.shutdown_drain_timeout)
+    if bot is not None:
+        await bot.shutdown()
+    else:
+        await services.close()
+    for monitor in (health_server, leak_detector, readiness, loop_monitor):
+        if monitor is not None:
+            await monitor.stop()
+    gc_monitor.uninstall()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if settings.process_mode not in PROCESS_MODES:
+        sys.exit(f"PROCESS_MODE must be one of {', '.join(PROCESS_MODES)}, got {settings.process_mode!r}")
+    event_loop.run(supervise_processes() if settings.process_mode == 'split' else main(), settings.event_loop)
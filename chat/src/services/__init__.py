@@ -1,6 +1,21 @@
-"""External services integration."""
+"""External services integration.
 
-from .midi_client import MidiClient
-from .health_server import HealthServer
+Submodules are imported on first use, so importing one service (e.g.
+``services.metrics``) does not load the HTTP server and MIDI client.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'MidiClient': 'services.midi_client',
+    'HealthServer': 'services.health_server',
+}
 
 __all__ = ['MidiClient', 'HealthServer']
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'services' has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
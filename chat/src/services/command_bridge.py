@@ -0,0 +1,344 @@
+"""Command hand-off between the ingest and execution processes.
+
+With ``PROCESS_MODE=split`` the Twitch connection (EventSub, command
+parsing) runs in an ingest process and the commands themselves (MIDI calls,
+overlay publishes, state) in an execution process, so a burst of chat
+parsing never delays a MIDI call and vice versa. Two ``SharedRingBuffer``
+rings connect them:
+
+- requests, ingest → execution: request id, the EventSub receive time,
+  command name, chatter and arguments in a 512-byte record
+- replies, execution → ingest: request id, kind and text in a 2048-byte
+  record; the ingest process sends the text to chat with the context of the
+  original message. A ``DONE`` record ends each command.
+
+The execution process reports a heartbeat and whether it takes commands
+in the request ring's header; the ingest process's ``/ready`` fails when
+it goes stale. Commands that get no ``DONE`` within ``reply_timeout`` (the
+execution process crashed or restarted) are answered with a timeout reply.
+"""
+
+import asyncio
+import itertools
+import logging
+import struct
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.metrics import REGISTRY, Counter, Gauge
+from services.ring_buffer import SLOT_HEADER_SIZE, Doorbell, RingHandle, SharedRingBuffer
+from services.tasks import spawn
+
+logger = logging.getLogger(__name__)
+
+REQUEST_RECORD_SIZE = 512
+# Twitch chat messages are at most 500 characters
+REPLY_RECORD_SIZE = 2048
+# request id, received_at (epoch seconds, 0 when unknown), command, user; arguments follow
+_REQUEST = struct.Struct('<Qd16s64s')
+# request id, kind; text follows
+_REPLY = struct.Struct('<QB')
+REPLY, DONE = 1, 2
+ARG_SEPARATOR = '\x1f'
+
+# Seconds between execution heartbeats, and the age at which the ingest side stops trusting them
+HEARTBEAT_INTERVAL = 1.0
+HEARTBEAT_TIMEOUT = 5.0
+
+BUSY_MESSAGE = '⏳ The bot is busy. Please try again in a moment.'
+# Shared with the component, which sends them for commands it runs itself
+TIMEOUT_MESSAGE = '⏱️ Your command timed out. Please try again.'
+RESTARTING_MESSAGE = '🔄 The bot is restarting. Please try again in a moment.'
+
+DROPPED_RECORDS = REGISTRY.register(Counter(
+    'chat_bridge_dropped_records',
+    'Records not passed between the ingest and execution processes because the ring was full, by ring.',
+    ('ring',)
+))
+PENDING_COMMANDS = REGISTRY.register(Gauge(
+    'chat_bridge_pending_commands',
+    'Commands forwarded to the execution process that have not finished yet.'
+))
+
+
+def _fit(text: str, size: int) -> bytes:
+    """UTF-8 encode ``text``, truncated to ``size`` bytes on a character boundary."""
+    encoded = text.encode()
+    if len(encoded) <= size:
+        return encoded
+    return encoded[:size].decode(errors='ignore').encode()
+
+
+def _text(field: bytes) -> str:
+    return field.rstrip(b'\0').decode(errors='replace')
+
+
+def encode_request(request_id: int, command: str, args: List[str], user: str,
+                   received_at: Optional[datetime]) -> bytes:
+    """Request record; arguments are truncated to what fits in the slot."""
+    header = _REQUEST.pack(
+        request_id,
+        received_at.timestamp() if received_at is not None else 0.0,
+        _fit(command, 16),
+        _fit(user, 64)
+    )
+    room = REQUEST_RECORD_SIZE - SLOT_HEADER_SIZE - _REQUEST.size
+    return header + _fit(ARG_SEPARATOR.join(args), room)
+
+
+def decode_request(record: bytes) -> Tuple[int, str, List[str], str, Optional[datetime]]:
+    """(request id, command, args, user, received_at) from a request record."""
+    request_id, received_at, command, user = _REQUEST.unpack_from(record)
+    args = record[_REQUEST.size:].decode(errors='replace')
+    return (
+        request_id,
+        _text(command),
+        args.split(ARG_SEPARATOR) if args else [],
+        _text(user),
+        datetime.fromtimestamp(received_at, timezone.utc) if received_at else None
+    )
+
+
+def encode_reply(request_id: int, kind: int, text: str = '') -> bytes:
+    """Reply record; text is truncated to what fits in the slot."""
+    return _REPLY.pack(request_id, kind) + _fit(text, REPLY_RECORD_SIZE - SLOT_HEADER_SIZE - _REPLY.size)
+
+
+def decode_reply(record: bytes) -> Tuple[int, int, str]:
+    """(request id, kind, text) from a reply record."""
+    request_id, kind = _REPLY.unpack_from(record)
+    return request_id, kind, record[_REPLY.size:].decode(errors='replace')
+
+
+@dataclass
+class BridgeChannels:
+    """Ring handles and doorbell pipes, created by the parent and handed to both processes."""
+
+    requests: RingHandle
+    replies: RingHandle
+    # (reader, writer) ends of one-way pipes
+    request_bell: Tuple[Any, Any]
+    reply_bell: Tuple[Any, Any]
+
+    @classmethod
+    def create(cls, context, capacity: int) -> Tuple['BridgeChannels', List[SharedRingBuffer]]:
+        """
+        Allocate both rings and doorbells.
+
+        Args:
+            context: multiprocessing context the processes are started from
+            capacity: Records per ring
+
+        Returns:
+            The channels, and the rings the caller owns and closes after both processes exit
+        """
+        requests = SharedRingBuffer.create(capacity, REQUEST_RECORD_SIZE, context)
+        replies = SharedRingBuffer.create(capacity, REPLY_RECORD_SIZE, context)
+        channels = cls(
+            requests=requests.handle,
+            replies=replies.handle,
+            request_bell=context.Pipe(duplex=False),
+            reply_bell=context.Pipe(duplex=False)
+        )
+        return channels, [requests, replies]
+
+
+class _Pending:
+    """A forwarded command waiting for its replies."""
+
+    __slots__ = ('ctx', 'expires', 'sending')
+
+    def __init__(self, ctx, expires: float):
+        self.ctx = ctx
+        self.expires = expires
+        # Last reply being sent, so replies go out in order
+        self.sending: Optional[asyncio.Task] = None
+
+
+class IngestBridge:
+    """Ingest side: forwards commands and relays their replies to chat."""
+
+    def __init__(self, channels: BridgeChannels, reply_timeout: float = 30.0):
+        """
+        Attach to the rings.
+
+        Args:
+            channels: Created by the parent process
+            reply_timeout: Seconds a command may go without finishing before the chatter is told it timed out
+        """
+        self._requests = SharedRingBuffer.attach(channels.requests)
+        self._replies = SharedRingBuffer.attach(channels.replies)
+        # Receiving end of the requests doorbell is the execution process's, and vice versa
+        self._request_bell = Doorbell(writer=channels.request_bell[1])
+        self._reply_bell = Doorbell(reader=channels.reply_bell[0])
+        self._reply_timeout = reply_timeout
+        self._pending: Dict[int, _Pending] = {}
+        # CLOCK_MONOTONIC is system wide, so ids stay unique across ingest restarts
+        self._ids = itertools.count(time.monotonic_ns())
+        self._accepting = True
+
+    @property
+    def pending(self) -> int:
+        """Forwarded commands that have not finished."""
+        return len(self._pending)
+
+    async def submit(self, command: str, args: List[str], ctx) -> None:
+        """Forward a command to the execution process; its replies go to ``ctx``."""
+        if not self._accepting:
+            await self._send(None, ctx, RESTARTING_MESSAGE)
+            return
+        request_id = next(self._ids)
+        user = ctx.author.name if hasattr(ctx, 'author') else 'unknown'
+        timestamp = getattr(getattr(ctx, 'message', None), 'timestamp', None)
+        record = encode_request(request_id, command, args, user,
+                                timestamp if isinstance(timestamp, datetime) else None)
+        if not self._requests.push(record):
+            DROPPED_RECORDS.labels('requests').inc()
+            logger.warning("Request ring full, refused !%s from %s", command, user)
+            await self._send(None, ctx, BUSY_MESSAGE)
+            return
+        self._pending[request_id] = _Pending(ctx, time.monotonic() + self._reply_timeout)
+        PENDING_COMMANDS.set(len(self._pending))
+        self._request_bell.ring()
+
+    async def check_execution(self) -> None:
+        """Readiness check: raise unless the execution process is alive and taking commands."""
+        age, ready = self._requests.consumer_status()
+        if age > HEARTBEAT_TIMEOUT:
+            raise ConnectionError("Execution process not responding")
+        if not ready:
+            raise ConnectionError("Execution process not ready")
+
+    async def run(self) -> None:
+        """Relay replies until cancelled; run under a Supervisor."""
+        while True:
+            await self._reply_bell.wait(HEARTBEAT_INTERVAL)
+            self._relay()
+            self._expire()
+
+    async def drain(self, timeout: float) -> None:
+        """
+        Refuse new commands and wait for the forwarded ones to finish.
+
+        Does not wait when the execution process is already gone; commands
+        still pending at the end are told the bot is restarting.
+        """
+        self._accepting = False
+        deadline = time.monotonic() + timeout
+        while self._pending and time.monotonic() < deadline:
+            if self._requests.consumer_status()[0] > HEARTBEAT_TIMEOUT:
+                break
+            await asyncio.sleep(0.05)
+            self._relay()
+        for pending in self._pending.values():
+            pending.sending = spawn(self._send(pending.sending, pending.ctx, RESTARTING_MESSAGE), name='bridge-reply')
+        sending = [p.sending for p in self._pending.values()]
+        self._pending.clear()
+        PENDING_COMMANDS.set(0)
+        await asyncio.gather(*sending, return_exceptions=True)
+
+    def close(self) -> None:
+        """Detach from the rings."""
+        self._requests.close()
+        self._replies.close()
+
+    def _relay(self) -> None:
+        while (record := self._replies.pop()) is not None:
+            request_id, kind, text = decode_reply(record)
+            pending = self._pending.get(request_id)
+            if pending is None:
+                logger.debug("Dropped reply for unknown request %d", request_id)
+            elif kind == DONE:
+                del self._pending[request_id]
+                PENDING_COMMANDS.set(len(self._pending))
+            else:
+                pending.sending = spawn(self._send(pending.sending, pending.ctx, text), name='bridge-reply')
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        expired = [request_id for request_id, pending in self._pending.items() if pending.expires < now]
+        for request_id in expired:
+            pending = self._pending.pop(request_id)
+            logger.warning("No reply from the execution process within %.0fs", self._reply_timeout)
+            spawn(self._send(pending.sending, pending.ctx, TIMEOUT_MESSAGE), name='bridge-reply')
+        if expired:
+            PENDING_COMMANDS.set(len(self._pending))
+
+    @staticmethod
+    async def _send(previous: Optional[asyncio.Task], ctx, text: str) -> None:
+        if previous is not None:
+            await asyncio.wait({previous})
+        try:
+            await ctx.send(text)
+        except Exception as e:
+            logger.error("Failed to send reply to chat: %s", e)
+
+
+class RemoteContext:
+    """The parts of a TwitchIO command context a command uses, with replies sent back over the bridge."""
+
+    __slots__ = ('author', 'message', '_bridge', '_request_id')
+
+    def __init__(self, bridge: 'ExecutionBridge', request_id: int, user: str, received_at: Optional[datetime]):
+        self.author = SimpleNamespace(name=user)
+        self.message = SimpleNamespace(timestamp=received_at)
+        self._bridge = bridge
+        self._request_id = request_id
+
+    async def send(self, content: str) -> None:
+        """Queue a chat reply; the ingest process sends it."""
+        self._bridge.reply(self._request_id, REPLY, content)
+
+
+class ExecutionBridge:
+    """Execution side: takes forwarded commands and sends back their replies."""
+
+    def __init__(self, channels: BridgeChannels):
+        """Attach to the rings created by the parent process."""
+        self._requests = SharedRingBuffer.attach(channels.requests)
+        self._replies = SharedRingBuffer.attach(channels.replies)
+        self._request_bell = Doorbell(reader=channels.request_bell[0])
+        self._reply_bell = Doorbell(writer=channels.reply_bell[1])
+        # Reported in the heartbeat; set to e.g. the readiness monitor's verdict
+        self.ready: Callable[[], bool] = lambda: True
+
+    async def run(self, dispatch: Callable[[str, List[str], Any], Awaitable[None]]) -> None:
+        """
+        Run forwarded commands until cancelled; run under a Supervisor.
+
+        Args:
+            dispatch: Runs one command, e.g. ``EightBitSaxLoungeComponent.dispatch``
+        """
+        while True:
+            self._requests.beat(self.ready())
+            await self._request_bell.wait(HEARTBEAT_INTERVAL)
+            while (record := self._requests.pop()) is not None:
+                request_id, command, args, user, received_at = decode_request(record)
+                ctx = RemoteContext(self, request_id, user, received_at)
+                spawn(self._execute(dispatch, request_id, command, args, ctx), name=f'command-{command}')
+
+    def reply(self, request_id: int, kind: int, text: str = '') -> None:
+        """Push a reply record and wake the ingest process."""
+        if not self._replies.push(encode_reply(request_id, kind, text)):
+            DROPPED_RECORDS.labels('replies').inc()
+            logger.warning("Reply ring full, dropped a reply")
+        self._reply_bell.ring()
+
+    def stop(self) -> None:
+        """Report that no more commands are taken (shutdown)."""
+        self.ready = lambda: False
+        self._requests.beat(False)
+
+    def close(self) -> None:
+        """Detach from the rings."""
+        self._requests.close()
+        self._replies.close()
+
+    async def _execute(self, dispatch, request_id: int, command: str, args: List[str], ctx: RemoteContext) -> None:
+        try:
+            await dispatch(command, args, ctx)
+        finally:
+            self.reply(request_id, DONE)
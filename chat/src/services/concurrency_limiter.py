@@ -0,0 +1,178 @@
+"""Adaptive concurrency limit for calls to a single downstream service.
+
+The MIDI API runs on one node and drives one physical device, so it can only
+serve a handful of requests at once. The limiter discovers that number with
+AIMD (additive increase, multiplicative decrease): every fast, successful
+request that used the current limit raises it by one, every slow or failed
+request cuts it by ``backoff``. Requests over the limit wait in a bounded
+FIFO queue; once the queue is full further requests are shed immediately.
+Time spent queued is recorded as the ``midi_queue`` stage and a ``queued``
+telemetry event.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque
+
+from config.logging_config import record_stage
+from services.telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyLimitExceeded(Exception):
+    """Raised when a request is shed because the wait queue is full."""
+
+
+def _is_overload(exc: BaseException) -> bool:
+    """Check whether a failure indicates the downstream service is overloaded."""
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, 'status', None)
+    return isinstance(status, int) and status >= 500
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limiter with a bounded wait queue."""
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        max_queue: int = 32,
+        latency_threshold: float = 1.0,
+        backoff: float = 0.9
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial_limit: Concurrency allowed before any latency has been observed
+            min_limit: Lowest the limit can be cut to
+            max_limit: Highest the limit can grow to
+            max_queue: Requests allowed to wait for a slot before new ones are shed
+            latency_threshold: Requests slower than this (seconds) count as overload
+            backoff: Factor applied to the limit on overload
+        """
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._max_queue = max_queue
+        self._latency_threshold = latency_threshold
+        self._backoff = backoff
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._shed = 0
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a slot."""
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    @property
+    def shed(self) -> int:
+        """Total number of requests rejected because the queue was full."""
+        return self._shed
+
+    async def acquire(self) -> None:
+        """
+        Take a slot, waiting in the queue if the limit is reached.
+
+        Raises:
+            ConcurrencyLimitExceeded: If the queue is full
+        """
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return
+
+        if len(self._waiters) >= self._max_queue:
+            self._shed += 1
+            logger.warning(
+                "Shedding request: %d in flight, %d queued (limit %d)",
+                self._in_flight, len(self._waiters), self.limit
+            )
+            raise ConcurrencyLimitExceeded(
+                f"Too many concurrent requests ({self._in_flight} in flight, {len(self._waiters)} queued)"
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        queued_at = time.monotonic()
+        try:
+            await waiter
+            waited = time.monotonic() - queued_at
+            record_stage('midi_queue', waited)
+            telemetry.emit('queued', wait_ms=round(waited * 1000, 1))
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled: pass it on
+                self._in_flight -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, latency: float, overloaded: bool = False) -> None:
+        """
+        Return a slot and adjust the limit from the request's outcome.
+
+        Args:
+            latency: How long the request held its slot (seconds)
+            overloaded: Whether the request failed in a way that indicates overload
+        """
+        used = self._in_flight
+        self._in_flight -= 1
+
+        previous = self.limit
+        if overloaded or latency > self._latency_threshold:
+            self._limit = max(self._min_limit, self._limit * self._backoff)
+        elif used >= previous:
+            # Only grow when the current limit was actually being used
+            self._limit = min(self._max_limit, self._limit + 1)
+        if self.limit != previous:
+            logger.debug("Concurrency limit %d -> %d (latency %.0fms)", previous, self.limit, latency * 1000)
+
+        self._wake()
+
+    def discard(self) -> None:
+        """Return a slot without adjusting the limit (e.g. the caller was cancelled)."""
+        self._in_flight -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block, timing it to adjust the limit."""
+        await self.acquire()
+        start = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            self.discard()
+            raise
+        except BaseException as e:
+            self.release(time.monotonic() - start, _is_overload(e))
+            raise
+        else:
+            self.release(time.monotonic() - start)
+
+    def _wake(self) -> None:
+        """Hand free slots to waiting requests in arrival order."""
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
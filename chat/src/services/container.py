@@ -0,0 +1,197 @@
+"""Connections and shared state used by the chat commands.
+
+The container owns one NATS connection, one MIDI API client (with its pooled
+keep-alive session and token) and the state built on them. ``start`` warms
+all of them up concurrently in the background: NATS connects and rehydrates
+the shared effect state while the MIDI client authenticates, and the Twitch
+side (token database, TwitchIO imports) can get ready at the same time. The
+bot waits for ``wait_started`` before joining chat, so the first command does
+not pay for any of it.
+
+``supervisor`` keeps the NATS connection up afterwards: nats-py reconnects
+on its own, and once it gives up (or the first connect failed) the
+supervisor reconnects with backoff and restores the state subscriptions.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from config.settings import settings
+from services.concurrency_limiter import AdaptiveConcurrencyLimiter
+from services.drain import InFlightCommands
+from services.effect_state_store import EffectStateStore
+from services.metrics import COMMANDS_IN_FLIGHT, MIDI_CONCURRENCY_LIMIT, MIDI_IN_FLIGHT, MIDI_QUEUE_DEPTH
+from services.midi_client import MidiClient
+from services.midi_state_subscriber import MidiStateSubscriber
+from services.nats_publisher import NatsPublisher
+from services.state_cache import DeviceStateCache
+from services.supervisor import Supervisor
+from services.tasks import spawn
+from services.telemetry import telemetry
+from services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """Shared NATS, MIDI and state services, started once per process."""
+
+    def __init__(self, midi_client: Optional[MidiClient] = None):
+        """
+        Initialize the services without connecting.
+
+        Args:
+            midi_client: MIDI API client; built from settings when omitted
+        """
+        self.nats = NatsPublisher()
+        self.state_cache = DeviceStateCache()
+        self.midi_state = MidiStateSubscriber(self.nats, self.state_cache)
+        self.effect_state = EffectStateStore(self.nats, self.state_cache)
+        # One limiter for every command so concurrency is bounded across the whole bot
+        self.midi_limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=settings.midi_concurrency_initial,
+            min_limit=settings.midi_concurrency_min,
+            max_limit=settings.midi_concurrency_max,
+            max_queue=settings.midi_concurrency_queue,
+            latency_threshold=settings.midi_latency_threshold
+        )
+        MIDI_QUEUE_DEPTH.set_function(lambda: self.midi_limiter.queued)
+        MIDI_IN_FLIGHT.set_function(lambda: self.midi_limiter.in_flight)
+        MIDI_CONCURRENCY_LIMIT.set_function(lambda: self.midi_limiter.limit)
+        self.midi_client = midi_client or MidiClient(
+            base_url=settings.midi_device_url,
+            client_id=settings.midi_client_id,
+            client_secret=settings.midi_client_secret,
+            timeout=settings.midi_api_timeout,
+            limiter=self.midi_limiter
+        )
+        self.in_flight = InFlightCommands()
+        COMMANDS_IN_FLIGHT.set_function(lambda: self.in_flight.count)
+        self.nats_connected = False
+        self.startup_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self.supervisor = Supervisor(
+            'services',
+            max_restarts=settings.supervisor_max_restarts,
+            window=settings.supervisor_window,
+            backoff_initial=settings.supervisor_backoff_initial,
+            backoff_max=settings.supervisor_backoff_max
+        )
+        self.supervisor.add('nats-connection', self._keep_nats)
+
+    @property
+    def started(self) -> bool:
+        """Check if the warm-up has finished, successfully or not."""
+        return self._task is not None and self._task.done()
+
+    def start(self) -> None:
+        """Start warming up every connection in the background. Safe to call repeatedly."""
+        if self._task is None:
+            self._task = spawn(self._start(), name='services-start')
+
+    async def wait_started(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the warm-up started by ``start``.
+
+        Args:
+            timeout: Seconds to wait; the warm-up keeps running in the background after it
+
+        Returns:
+            True if the warm-up finished within the timeout
+        """
+        self.start()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning("Service warm-up still running after %.1fs, continuing without it", timeout)
+            return False
+
+    async def check_nats(self) -> None:
+        """Readiness check: raise unless the NATS connection answers a ping."""
+        await self.nats.ping()
+
+    async def drain(self, timeout: float) -> None:
+        """
+        Stop accepting commands and let the running ones finish.
+
+        Args:
+            timeout: Seconds before the remaining commands are cancelled
+        """
+        finished, cancelled = await self.in_flight.drain(timeout)
+        if finished or cancelled:
+            logger.info("Drain complete: %d commands finished, %d cancelled", finished, cancelled)
+
+    async def close(self) -> None:
+        """Stop consuming state, flush telemetry and NATS and close every connection."""
+        self.supervisor.shutdown()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        await self.midi_state.stop()
+        await self.effect_state.stop()
+        await telemetry.stop()
+        await self.nats.close()
+        await self.midi_client.close()
+        if tracer.otlp is not None:
+            await tracer.otlp.stop()
+
+    async def _start(self) -> None:
+        start = time.monotonic()
+        await asyncio.gather(self._connect_nats(), self._warm_up_midi())
+        telemetry.start(self.nats)
+        if tracer.otlp is not None:
+            tracer.otlp.start()
+        self.startup_seconds = time.monotonic() - start
+        logger.info("Services warmed up in %.0fms", self.startup_seconds * 1000)
+
+    async def _connect_nats(self) -> None:
+        """Connect to NATS, warm the shared effect state and consume MIDI state."""
+        try:
+            await self.nats.connect()
+            self.nats_connected = True
+        except Exception as e:
+            logger.error("Failed to connect to NATS: %s", e)
+            return
+        await self._start_state()
+
+    async def _keep_nats(self) -> None:
+        """
+        Supervised child: reconnect if the connection is down, then wait for it to close.
+
+        Raises:
+            ConnectionError: When the connection closes, so the supervisor reconnects with backoff
+        """
+        await self.wait_started()
+        if not self.nats_connected:
+            # Bindings on a dead connection never recover; drop them before rebinding
+            await self.midi_state.stop()
+            await self.effect_state.stop()
+            await self.nats.connect()
+            self.nats_connected = True
+            logger.info("Reconnected to NATS")
+            await self._start_state()
+        await self.nats.wait_closed()
+        self.nats_connected = False
+        raise ConnectionError("NATS connection closed")
+
+    async def _start_state(self) -> None:
+        """Load the shared effect state and subscribe to MIDI state on the current connection."""
+        # In this order: confirmed device state from MIDI_STATE must win over the KV warm start
+        try:
+            await self.effect_state.start()
+        except Exception as e:
+            logger.error("Failed to load shared effect state: %s", e)
+        try:
+            await self.midi_state.start()
+        except Exception as e:
+            logger.error("Failed to subscribe to MIDI state: %s", e)
+
+    async def _warm_up_midi(self) -> None:
+        """Authenticate and open a keep-alive connection to the MIDI API."""
+        try:
+            await self.midi_client.warm_up()
+        except Exception as e:
+            # Commands authenticate on demand, so this only costs the first command
+            logger.warning("MIDI API warm-up failed: %s", e)
@@ -0,0 +1,93 @@
+"""In-flight command tracking for graceful shutdown.
+
+Every command runs inside ``InFlightCommands.track``. On shutdown ``drain``
+stops new commands from starting, waits for the running ones (including those
+queued for a MIDI concurrency slot) until a deadline and cancels whatever is
+left, so chatters get their reply and overlay events go out before the
+connections are closed.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class InFlightCommands:
+    """Tracks running command tasks and drains them on shutdown."""
+
+    def __init__(self, cancel_grace: float = 2.0):
+        """
+        Initialize the tracker.
+
+        Args:
+            cancel_grace: Seconds cancelled commands get to send their reply and unwind
+        """
+        self._tasks: Set[asyncio.Task] = set()
+        self._accepting = True
+        self._cancel_grace = cancel_grace
+        self._idle = asyncio.Event()
+        self._idle.set()
+        # Called when the first command starts and when the last one finishes (e.g. GcMonitor.busy/idle)
+        self.on_busy: Optional[Callable[[], None]] = None
+        self.on_idle: Optional[Callable[[], None]] = None
+
+    @property
+    def accepting(self) -> bool:
+        """Check if new commands may start."""
+        return self._accepting
+
+    @property
+    def count(self) -> int:
+        """Commands currently running."""
+        return len(self._tasks)
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Register the current task as a running command for the duration of the block."""
+        task = asyncio.current_task()
+        if not self._tasks and self.on_busy is not None:
+            self.on_busy()
+        self._tasks.add(task)
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._tasks.discard(task)
+            if not self._tasks:
+                self._idle.set()
+                if self.on_idle is not None:
+                    self.on_idle()
+
+    async def drain(self, timeout: float) -> Tuple[int, int]:
+        """
+        Stop accepting commands and wait for the running ones.
+
+        Args:
+            timeout: Seconds to wait before cancelling the remaining commands
+
+        Returns:
+            (commands that finished, commands that were cancelled)
+        """
+        self._accepting = False
+        running = len(self._tasks)
+        if not running:
+            return 0, 0
+        logger.info("Draining %d in-flight commands (up to %.0fs)", running, timeout)
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            logger.info("Drained %d commands in %.0fms", running, (time.monotonic() - start) * 1000)
+            return running, 0
+        except asyncio.TimeoutError:
+            pass
+
+        remaining = list(self._tasks)
+        logger.warning("Cancelling %d commands still running after %.0fs", len(remaining), timeout)
+        for task in remaining:
+            task.cancel()
+        await asyncio.wait(remaining, timeout=self._cancel_grace)
+        return running - len(remaining), len(remaining)
@@ -0,0 +1,145 @@
+"""Shared effect state backed by a NATS JetStream key-value bucket."""
+
+import asyncio
+import logging
+from typing import Optional
+
+from nats.js.errors import KeyNotFoundError
+
+from config.settings import settings
+from services.state_cache import DeviceStateCache
+from services.tasks import spawn
+
+logger = logging.getLogger(__name__)
+
+# KV operations that remove a key rather than set it
+_DELETE_OPERATIONS = ('DEL', 'PURGE')
+
+
+class EffectStateStore:
+    """Current value of each device setting, shared between chat replicas.
+
+    Successful commands write to the KV bucket. Every replica watches the
+    bucket and mirrors it into its local DeviceStateCache, which is rehydrated
+    from the latest values in one bulk read when the store starts.
+    """
+
+    def __init__(self, nats_publisher, state_cache: DeviceStateCache):
+        """
+        Initialize the store.
+
+        Args:
+            nats_publisher: Connected NatsPublisher whose connection is shared
+            state_cache: Local read-through copy of the bucket
+        """
+        self._nats = nats_publisher
+        self._cache = state_cache
+        self._kv = None
+        self._watcher = None
+        self._watch_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the bucket is bound and being watched."""
+        return self._kv is not None
+
+    async def start(self) -> int:
+        """
+        Bind the bucket, rehydrate the local cache and start watching for changes.
+
+        Returns:
+            Number of values loaded during the warm start
+        """
+        if self._kv is not None:
+            return 0
+
+        nc = self._nats.client
+        if nc is None or nc.is_closed:
+            logger.warning("NATS not connected, cannot open KV bucket %s", settings.effect_state_bucket)
+            return 0
+
+        self._kv = await nc.jetstream().key_value(settings.effect_state_bucket)
+        self._watcher = await self._kv.watchall()
+
+        # The watcher delivers the latest value of every key, then a None marker
+        loaded = 0
+        async for entry in self._watcher:
+            if entry is None:
+                break
+            if self._apply(entry):
+                loaded += 1
+
+        self._watch_task = spawn(self._watch(), name='effect-state-watch')
+        logger.info("Loaded %d effect values from KV bucket %s", loaded, settings.effect_state_bucket)
+        return loaded
+
+    async def stop(self) -> None:
+        """Stop watching the bucket."""
+        stopped = True
+        if self._watcher is not None:
+            try:
+                await self._watcher.stop()
+            except Exception as e:
+                # e.g. the connection is already closed; the watch task would never see the end
+                logger.warning("Failed to stop KV watcher: %s", e)
+                stopped = False
+            self._watcher = None
+        if self._watch_task is not None:
+            if not stopped:
+                self._watch_task.cancel()
+            await asyncio.gather(self._watch_task, return_exceptions=True)
+            self._watch_task = None
+        self._kv = None
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Get the current value of a setting.
+
+        Served from the local cache; falls back to the bucket on a miss.
+
+        Args:
+            key: Setting key (command name)
+
+        Returns:
+            The value, or None if it is not known anywhere
+        """
+        value = self._cache.get(key)
+        if value is not None or self._kv is None:
+            return value
+
+        try:
+            entry = await self._kv.get(key)
+        except KeyNotFoundError:
+            return None
+        self._apply(entry)
+        return self._cache.get(key)
+
+    async def put(self, key: str, value: str) -> None:
+        """
+        Record the new value of a setting after a successful command.
+
+        Args:
+            key: Setting key (command name)
+            value: Value set by the command
+        """
+        if self._kv is None:
+            logger.debug("KV bucket not open, skipping write of %s", key)
+            return
+        await self._kv.put(key, value.encode())
+        logger.debug("Stored %s = %s in KV bucket %s", key, value, settings.effect_state_bucket)
+
+    async def _watch(self) -> None:
+        """Mirror bucket changes made by any replica into the local cache."""
+        try:
+            async for entry in self._watcher:
+                if entry is not None:
+                    self._apply(entry)
+        except Exception as e:
+            logger.error("KV watcher for %s stopped: %s", settings.effect_state_bucket, e)
+
+    def _apply(self, entry) -> bool:
+        """Copy a KV entry into the cache. Returns False for deletes and empty values."""
+        if entry.operation in _DELETE_OPERATIONS or not entry.value:
+            return False
+        self._cache.update(entry.key, entry.value.decode(), source='kv')
+        return True
@@ -0,0 +1,75 @@
+"""Event loop backend for the chat service.
+
+``EVENT_LOOP`` selects the loop ``main.py`` runs on:
+
+- ``auto`` (default): uvloop when it is installed, the stdlib loop otherwise
+- ``uvloop``: uvloop, falling back to the stdlib loop with a warning when it is missing
+- ``asyncio``: always the stdlib loop
+
+uvloop runs the loop on libuv and lowers the per-callback and per-socket
+overhead, which adds up on the Raspberry Pi nodes. ``benchmarks/bench_loop.py``
+compares both backends on the command path.
+"""
+
+import asyncio
+import logging
+from typing import Callable, Coroutine, Tuple, TypeVar
+
+from services.metrics import REGISTRY, Gauge
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('auto', 'uvloop', 'asyncio')
+
+LOOP_BACKEND = REGISTRY.register(Gauge(
+    'chat_event_loop_backend',
+    'Event loop implementation in use (1 for the active backend).',
+    ('backend',)
+))
+
+T = TypeVar('T')
+LoopFactory = Callable[[], asyncio.AbstractEventLoop]
+
+
+def loop_factory(backend: str = 'auto') -> Tuple[str, LoopFactory]:
+    """
+    Resolve a backend setting to the loop implementation to use.
+
+    Args:
+        backend: One of ``BACKENDS``
+
+    Returns:
+        (name of the backend used, factory creating a new loop)
+
+    Raises:
+        ValueError: If ``backend`` is not one of ``BACKENDS``
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"EVENT_LOOP must be one of {', '.join(BACKENDS)}, got {backend!r}")
+    if backend != 'asyncio':
+        try:
+            import uvloop
+        except ImportError:
+            if backend == 'uvloop':
+                logger.warning("EVENT_LOOP=uvloop but uvloop is not installed; using asyncio")
+        else:
+            return 'uvloop', uvloop.new_event_loop
+    return 'asyncio', asyncio.new_event_loop
+
+
+def run(main: Coroutine[None, None, T], backend: str = 'auto') -> T:
+    """
+    Run ``main`` to completion on a new loop of the selected backend.
+
+    Args:
+        main: Coroutine to run
+        backend: One of ``BACKENDS``
+
+    Returns:
+        The coroutine's result
+    """
+    name, factory = loop_factory(backend)
+    LOOP_BACKEND.labels(name).set(1)
+    logger.info("Event loop: %s", name)
+    with asyncio.Runner(loop_factory=factory) as runner:
+        return runner.run(main)
@@ -0,0 +1,165 @@
+"""Garbage collector pause instrumentation and low-pause tuning.
+
+``GcMonitor.install`` registers a ``gc.callbacks`` hook that times every
+collection into ``chat_gc_pause_seconds{generation}``. A collection runs on
+whichever thread allocated, usually the event loop's, so each pause is a
+stall of every command in flight.
+
+``GC_MODE=low_pause`` additionally:
+
+- freezes everything allocated during startup (settings, the command
+  registry and handlers, TwitchIO models) once the bot is ready, so later
+  full collections no longer traverse it
+- applies ``GC_THRESHOLDS``
+- defers automatic collections while commands are running: the collector is
+  disabled when the first command starts and re-enabled when the last one
+  finishes, so pending collections run between commands. A busy period
+  longer than ``GC_DEFER_MAX`` re-enables it early, bounding the garbage a
+  raid can pile up.
+"""
+
+import asyncio
+import gc
+import logging
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+from services.metrics import REGISTRY, Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+MODES = ('default', 'low_pause')
+
+GC_PAUSE = REGISTRY.register(Histogram(
+    'chat_gc_pause_seconds',
+    'Duration of garbage collections, by generation.',
+    ('generation',),
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+))
+GC_COLLECTED = REGISTRY.register(Counter(
+    'chat_gc_collected_objects',
+    'Unreachable objects freed by the garbage collector, by generation.',
+    ('generation',)
+))
+GC_UNCOLLECTABLE = REGISTRY.register(Counter(
+    'chat_gc_uncollectable_objects',
+    'Unreachable objects the garbage collector could not free, by generation.',
+    ('generation',)
+))
+GC_FROZEN = REGISTRY.register(Gauge(
+    'chat_gc_frozen_objects',
+    'Objects moved to the permanent generation by gc.freeze().'
+))
+GC_DEFERRALS_CUT_SHORT = REGISTRY.register(Counter(
+    'chat_gc_deferrals_cut_short',
+    'Busy periods that outlasted GC_DEFER_MAX, re-enabling collections while commands ran.'
+))
+GC_FROZEN.set_function(gc.get_freeze_count)
+
+
+class GcMonitor:
+    """Times garbage collections and optionally keeps them out of command bursts."""
+
+    def __init__(
+        self,
+        mode: str = 'default',
+        thresholds: Sequence[int] = (),
+        defer_max: float = 5.0
+    ):
+        """
+        Initialize the monitor.
+
+        Args:
+            mode: 'default' (instrumentation only) or 'low_pause'
+            thresholds: gc.set_threshold values applied in low_pause mode; empty keeps Python's
+            defer_max: Longest a busy period may defer collections in low_pause mode (seconds; 0 disables deferral)
+
+        Raises:
+            ValueError: If ``mode`` is not one of ``MODES``
+        """
+        if mode not in MODES:
+            raise ValueError(f"GC_MODE must be one of {', '.join(MODES)}, got {mode!r}")
+        self.mode = mode
+        self._thresholds = tuple(thresholds)
+        self._defer_max = defer_max
+        self._started = 0.0
+        # Series per generation, resolved up front so the callback is a few additions
+        self._pause = [GC_PAUSE.labels(str(g)) for g in range(3)]
+        self._collected = [GC_COLLECTED.labels(str(g)) for g in range(3)]
+        self._uncollectable = [GC_UNCOLLECTABLE.labels(str(g)) for g in range(3)]
+        self._deferring = False
+        self._cut_short: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def low_pause(self) -> bool:
+        """Check if the low-pause mode is on."""
+        return self.mode == 'low_pause'
+
+    def install(self) -> None:
+        """Start timing collections and, in low_pause mode, apply the thresholds."""
+        if self._callback not in gc.callbacks:
+            gc.callbacks.append(self._callback)
+        if self.low_pause and self._thresholds:
+            gc.set_threshold(*self._thresholds)
+        logger.info("GC monitor installed (mode=%s, thresholds=%s)", self.mode, gc.get_threshold())
+
+    def uninstall(self) -> None:
+        """Stop timing collections and hand collection back to the interpreter."""
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+        self.idle()
+
+    def _callback(self, phase: str, info: Dict[str, int]) -> None:
+        if phase == 'start':
+            self._started = time.perf_counter()
+            return
+        generation = info['generation']
+        self._pause[generation].observe(time.perf_counter() - self._started)
+        self._collected[generation].inc(info['collected'])
+        if info['uncollectable']:
+            self._uncollectable[generation].inc(info['uncollectable'])
+
+    def freeze(self) -> int:
+        """
+        Collect once, then move every surviving object to the permanent generation.
+
+        Returns:
+            Number of frozen objects
+        """
+        started = time.perf_counter()
+        gc.collect()
+        gc.freeze()
+        frozen = gc.get_freeze_count()
+        logger.info("Froze %d startup objects in %.0fms", frozen, (time.perf_counter() - started) * 1000)
+        return frozen
+
+    async def freeze_when(self, ready: Callable[[], bool], poll: float = 1.0) -> None:
+        """Freeze the startup objects once ``ready()`` is true (low_pause mode only)."""
+        if not self.low_pause:
+            return
+        while not ready():
+            await asyncio.sleep(poll)
+        self.freeze()
+
+    def busy(self) -> None:
+        """First command started: defer automatic collections (low_pause mode only)."""
+        if not self.low_pause or self._defer_max <= 0 or self._deferring:
+            return
+        self._deferring = True
+        gc.disable()
+        self._cut_short = asyncio.get_running_loop().call_later(self._defer_max, self._stop_deferring)
+
+    def idle(self) -> None:
+        """Last command finished: let pending collections run."""
+        if self._cut_short is not None:
+            self._cut_short.cancel()
+            self._cut_short = None
+        if self._deferring:
+            self._deferring = False
+            gc.enable()
+
+    def _stop_deferring(self) -> None:
+        self._cut_short = None
+        if self._deferring:
+            GC_DEFERRALS_CUT_SHORT.inc()
+            gc.enable()
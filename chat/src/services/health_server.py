@@ -1,53 +1,156 @@
 """
 Lightweight HTTP health check server for Kubernetes probes.
 Runs alongside the Twitch bot to provide liveness and readiness endpoints.
+
+The server runs on its own thread and event loop, so probes and scrapes are
+answered even while the bot's loop is blocked or overloaded. Handlers only
+read state the bot's loop publishes (cached probe results, copied buffers,
+metric values); liveness is judged from the bot loop's heartbeat.
 """
 
 import asyncio
+import concurrent.futures
+import hmac
+import json
 import logging
+import threading
+import time
+from typing import Optional
 from aiohttp import web
 
+from config.logging_config import JsonFormatter
+from config.settings import settings
+from services.heap_profiler import GROUP_BY, HeapProfiler, HeapProfilerError
+from services.metrics import CONTENT_TYPE, REGISTRY
+from services.profiler import DEFAULT_RATE, ProfilerBusy, SamplingProfiler
+from services.tasks import describe_tasks
+from services.tracing import tracer
+
 logger = logging.getLogger(__name__)
 
 
+def _dumps(body) -> str:
+    """JSON encoder for bodies that may hold arbitrary log record fields."""
+    return json.dumps(body, default=str)
+
+
+@web.middleware
+async def debug_auth(request, handler):
+    """
+    Guard /debug/* endpoints with the DEBUG_TOKEN bearer token.
+    The endpoints do not exist (404) while no token is configured.
+    """
+    if not request.path.startswith('/debug/'):
+        return await handler(request)
+    if not settings.debug_token:
+        raise web.HTTPNotFound()
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f'Bearer {settings.debug_token}'.encode()):
+        return web.json_response({'error': 'unauthorized'}, status=401)
+    return await handler(request)
+
+
 class HealthServer:
     """Simple HTTP server for health checks."""
     
-    def __init__(self, port: int = 8080, bot_instance=None):
+    def __init__(
+        self,
+        port: int = 8080,
+        bot_instance=None,
+        loop_monitor=None,
+        readiness=None,
+        leak_detector=None,
+        flight_recorder=None
+    ):
         """
         Initialize health server.
         
         Args:
             port: Port to listen on (default 8080)
             bot_instance: Reference to bot for health status checks
+            loop_monitor: LoopLagMonitor whose stalls are served on /debug/loop
+            readiness: ReadinessMonitor whose cached dependency probes back /ready
+            leak_detector: TaskLeakDetector whose suspects are reported on /debug/tasks
+            flight_recorder: FlightRecorder whose buffered records are served on /debug/flight
         """
         self.port = port
         self.bot = bot_instance
-        self.app = web.Application()
+        self.loop_monitor = loop_monitor
+        self.readiness = readiness
+        self.leak_detector = leak_detector
+        self.flight_recorder = flight_recorder
+        # Set on shutdown so the pod is taken out of rotation while commands drain
+        self.draining = False
+        # The bot's loop and thread, recorded by start(); None when serving on the bot's loop
+        self._main_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._main_thread_id: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.app = web.Application(middlewares=[debug_auth])
         self.runner = None
+        self.profiler = SamplingProfiler()
+        self.heap = HeapProfiler(settings.heap_trace_frames, settings.heap_max_snapshots)
         self._setup_routes()
     
     def _setup_routes(self):
         """Configure health check routes."""
         self.app.router.add_get('/health', self.health_check)
         self.app.router.add_get('/ready', self.readiness_check)
+        self.app.router.add_get('/metrics', self.metrics)
+        self.app.router.add_get('/debug/traces', self.traces)
+        self.app.router.add_get('/debug/profile', self.profile)
+        self.app.router.add_get('/debug/loop', self.loop_stalls)
+        self.app.router.add_get('/debug/tasks', self.tasks)
+        self.app.router.add_get('/debug/flight', self.flight)
+        self.app.router.add_get('/debug/heap', self.heap_status)
+        self.app.router.add_post('/debug/heap/start', self.heap_start)
+        self.app.router.add_post('/debug/heap/stop', self.heap_stop)
+        self.app.router.add_post('/debug/heap/snapshot', self.heap_snapshot)
+        self.app.router.add_get('/debug/heap/diff', self.heap_diff)
     
     async def health_check(self, request):
         """
         Liveness probe endpoint.
-        Returns 200 if the server is running.
+        Returns 200 while the bot's event loop keeps running, 503 once it has been
+        blocked for longer than LIVENESS_MAX_LAG. Short stalls under load do not fail it.
         """
-        return web.json_response({
+        body = {
             'status': 'healthy',
             'service': 'eightbitsaxlounge-chat'
-        })
+        }
+        if self.loop_monitor is None:
+            return web.json_response(body)
+        blocked = self.loop_monitor.heartbeat_age
+        body['loop_lag_ms'] = round(self.loop_monitor.last_lag * 1000, 3)
+        body['loop_blocked_s'] = round(blocked, 3)
+        if blocked > settings.liveness_max_lag:
+            body['status'] = 'unhealthy'
+            return web.json_response(body, status=503)
+        return web.json_response(body)
     
-    #TODO: review
     async def readiness_check(self, request):
         """
         Readiness probe endpoint.
-        Returns 200 if bot is connected and ready, 503 otherwise.
+        Returns 200 if every dependency passed its latest background probe, 503 otherwise.
+        Answers from cached probe results; ?verbose=1 adds per-dependency status and latency.
+        Always 503 once the bot has started draining for shutdown.
         """
+        if self.draining:
+            return web.json_response(
+                {'status': 'draining', 'service': 'eightbitsaxlounge-chat'},
+                status=503
+            )
+        
+        if self.readiness is not None:
+            ready = self.readiness.is_ready
+            body = {
+                'status': 'ready' if ready else 'not_ready',
+                'service': 'eightbitsaxlounge-chat'
+            }
+            if request.query.get('verbose') in ('1', 'true'):
+                body['dependencies'] = self.readiness.snapshot()
+            return web.json_response(body, status=200 if ready else 503)
+        
         if self.bot and hasattr(self.bot, 'is_ready') and not self.bot.is_ready():
             return web.json_response(
                 {'status': 'not_ready', 'message': 'bot not connected'},
@@ -59,16 +162,177 @@ class HealthServer:
             'service': 'eightbitsaxlounge-chat'
         })
     
+    async def metrics(self, request):
+        """
+        Prometheus scrape endpoint.
+        Returns all chat metrics in the text exposition format.
+        """
+        return web.Response(text=REGISTRY.render(), content_type=CONTENT_TYPE)
+    
+    async def traces(self, request):
+        """
+        Recent command traces from the in-process span buffer.
+        Accepts ?trace_id= (or a correlation ID) and ?limit=.
+        """
+        try:
+            limit = int(request.query.get('limit', 20))
+        except ValueError:
+            return web.json_response({'error': 'limit must be an integer'}, status=400)
+        return web.json_response({
+            'traces': tracer.buffer.traces(request.query.get('trace_id'), limit)
+        })
+    
+    async def profile(self, request):
+        """
+        Sample the event loop for ?seconds=N (default 10) at ?rate= samples/s.
+        Returns collapsed stacks for flame graph tools.
+        """
+        try:
+            seconds = float(request.query.get('seconds', 10))
+            rate = int(request.query.get('rate', DEFAULT_RATE))
+        except ValueError:
+            return web.json_response({'error': 'seconds and rate must be numbers'}, status=400)
+        try:
+            stacks = await self.profiler.profile(seconds, rate, self._main_thread_id, self._main_loop)
+        except ProfilerBusy as e:
+            return web.json_response({'error': str(e)}, status=409)
+        return web.Response(text=stacks, content_type='text/plain')
+    
+    async def loop_stalls(self, request):
+        """
+        Recent event loop stalls with the stack and task that blocked the loop.
+        """
+        if self.loop_monitor is None:
+            return web.json_response({'error': 'loop monitor not running'}, status=404)
+        return web.json_response({
+            'last_lag_ms': round(self.loop_monitor.last_lag * 1000, 3),
+            'stalls': self.loop_monitor.stalls()
+        })
+    
+    async def tasks(self, request):
+        """
+        Live asyncio tasks, oldest first, with age, creating call site and await point.
+        ?kind= filters by task kind (name without trailing number).
+        """
+        tasks = describe_tasks(self._main_loop)
+        kind = request.query.get('kind')
+        if kind:
+            tasks = [t for t in tasks if t['kind'] == kind]
+        return web.json_response({
+            'count': len(tasks),
+            'leak_suspects': self.leak_detector.suspects if self.leak_detector else {},
+            'tasks': tasks
+        })
+    
+    async def flight(self, request):
+        """
+        Recent log records, DEBUG included, from the flight recorder.
+        Accepts ?correlation_id= and ?limit=.
+        """
+        if self.flight_recorder is None:
+            return web.json_response({'error': 'flight recorder disabled'}, status=404)
+        try:
+            limit = int(request.query.get('limit', 200))
+        except ValueError:
+            return web.json_response({'error': 'limit must be an integer'}, status=400)
+        records = self.flight_recorder.records(request.query.get('correlation_id'), limit)
+        formatter = JsonFormatter()
+        return web.json_response({'records': [formatter.to_dict(r) for r in records]}, dumps=_dumps)
+    
+    async def heap_status(self, request):
+        """
+        Heap tracing state, traced memory and stored snapshots.
+        """
+        return web.json_response(self.heap.status())
+    
+    async def heap_start(self, request):
+        """
+        Start tracing allocations with ?frames=N stack frames per allocation.
+        """
+        try:
+            frames = int(request.query['frames']) if 'frames' in request.query else None
+        except ValueError:
+            return web.json_response({'error': 'frames must be an integer'}, status=400)
+        self.heap.start(frames)
+        return web.json_response(self.heap.status())
+    
+    async def heap_stop(self, request):
+        """
+        Stop tracing allocations and discard stored snapshots.
+        """
+        self.heap.stop()
+        return web.json_response(self.heap.status())
+    
+    async def heap_snapshot(self, request):
+        """
+        Take a snapshot named ?name= (default: current UTC time).
+        """
+        name = request.query.get('name') or time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())
+        try:
+            return web.json_response(self.heap.snapshot(name))
+        except HeapProfilerError as e:
+            return web.json_response({'error': str(e)}, status=409)
+    
+    async def heap_diff(self, request):
+        """
+        Top allocation growth since snapshot ?base=, against snapshot ?name= or the live heap.
+        Accepts ?group_by=module|lineno|traceback (default module) and ?limit=.
+        """
+        base = request.query.get('base')
+        if not base:
+            return web.json_response({'error': 'base is required'}, status=400)
+        group_by = request.query.get('group_by', 'module')
+        if group_by not in GROUP_BY:
+            return web.json_response({'error': f"group_by must be one of {', '.join(GROUP_BY)}"}, status=400)
+        try:
+            limit = int(request.query.get('limit', 25))
+        except ValueError:
+            return web.json_response({'error': 'limit must be an integer'}, status=400)
+        try:
+            diff = await self.heap.diff(base, request.query.get('name'), group_by, limit)
+        except HeapProfilerError as e:
+            return web.json_response({'error': str(e)}, status=409)
+        return web.json_response(diff)
+    
     async def start(self):
-        """Start the health check server."""
-        self.runner = web.AppRunner(self.app)
-        await self.runner.setup()
-        site = web.TCPSite(self.runner, '0.0.0.0', self.port)
-        await site.start()
-        logger.info(f'Health server started on port {self.port}')
+        """
+        Start the health check server on a dedicated thread with its own event loop.
+        Must be called from the bot's loop, whose thread is the one profiled and inspected.
+        """
+        self._main_loop = asyncio.get_running_loop()
+        self._main_thread_id = threading.get_ident()
+        started: concurrent.futures.Future = concurrent.futures.Future()
+        self._thread = threading.Thread(target=self._serve, args=(started,), name='health-server', daemon=True)
+        self._thread.start()
+        await asyncio.wrap_future(started)
+        logger.info('Health server started on port %s', self.port)
     
     async def stop(self):
-        """Stop the health check server."""
-        if self.runner:
-            await self.runner.cleanup()
+        """Stop the health check server and join its thread."""
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
             logger.info('Health server stopped')
+    
+    def _serve(self, started: concurrent.futures.Future) -> None:
+        """Health server thread: run the site on a private loop until stop()."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self.runner = web.AppRunner(self.app)
+            loop.run_until_complete(self.runner.setup())
+            site = web.TCPSite(self.runner, '0.0.0.0', self.port)
+            loop.run_until_complete(site.start())
+        except BaseException as e:
+            started.set_exception(e)
+            loop.close()
+            return
+        self._loop = loop
+        started.set_result(None)
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(self.runner.cleanup())
+            loop.close()
+            self._loop = None
@@ -0,0 +1,213 @@
+"""On-demand heap allocation tracing with named snapshots.
+
+``tracemalloc`` is off by default because it slows every allocation and
+costs memory per traced block. The ``/debug/heap/*`` endpoints switch it on
+and off at runtime, take named snapshots and diff two snapshots (or a
+snapshot against the live heap) grouped by module, so growth across a long
+stream can be pinned to a chat-layer structure without restarting the bot.
+
+Snapshots only cover allocations made while tracing was on; start tracing
+before taking the baseline snapshot.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_FRAMES = 25
+GROUP_BY = ('module', 'lineno', 'traceback')
+
+# Allocations made by tracemalloc itself are noise in every diff
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+class HeapProfilerError(Exception):
+    """Raised when a heap operation is not possible in the current state."""
+
+
+# Source file -> dotted module name
+_module_names: Dict[str, str] = {}
+
+
+def module_name(filename: str) -> str:
+    """
+    Dotted module name for a source file ('.../src/services/tracing.py' -> 'services.tracing').
+
+    Resolved against the longest matching ``sys.path`` entry; files outside
+    ``sys.path`` fall back to their base name.
+    """
+    name = _module_names.get(filename)
+    if name is not None:
+        return name
+    best = ''
+    for entry in sys.path:
+        entry = os.path.abspath(entry or '.') + os.sep
+        if filename.startswith(entry) and len(entry) > len(best):
+            best = entry
+    relative = filename[len(best):] if best else os.path.basename(filename)
+    root, _ = os.path.splitext(relative)
+    parts = [p for p in root.split(os.sep) if p]
+    if parts and parts[-1] == '__init__':
+        parts.pop()
+    name = _module_names[filename] = '.'.join(parts) or filename
+    return name
+
+
+class HeapProfiler:
+    """Controls tracemalloc and keeps a bounded set of named snapshots."""
+
+    def __init__(self, frames: int = 1, max_snapshots: int = 8):
+        """
+        Initialize the profiler.
+
+        Args:
+            frames: Default stack depth recorded per allocation
+            max_snapshots: Named snapshots kept; the oldest is dropped beyond this
+        """
+        self._frames = frames
+        self._max_snapshots = max_snapshots
+        self._snapshots: 'OrderedDict[str, Tuple[float, tracemalloc.Snapshot]]' = OrderedDict()
+
+    @property
+    def is_tracing(self) -> bool:
+        """Check if allocations are being traced."""
+        return tracemalloc.is_tracing()
+
+    def status(self) -> Dict[str, Any]:
+        """Tracing state, traced memory and the names of the stored snapshots."""
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'tracing': self.is_tracing,
+            'frames': tracemalloc.get_traceback_limit() if self.is_tracing else self._frames,
+            'traced_bytes': current,
+            'peak_traced_bytes': peak,
+            'overhead_bytes': tracemalloc.get_tracemalloc_memory(),
+            'snapshots': [
+                {'name': name, 'taken_at': taken_at, 'traces': len(snapshot.traces)}
+                for name, (taken_at, snapshot) in self._snapshots.items()
+            ],
+        }
+
+    def start(self, frames: Optional[int] = None) -> None:
+        """
+        Start tracing allocations.
+
+        Args:
+            frames: Stack depth per allocation (capped at MAX_FRAMES); deeper
+                stacks allow 'traceback' grouping at a higher cost
+        """
+        frames = min(max(frames or self._frames, 1), MAX_FRAMES)
+        if self.is_tracing:
+            if tracemalloc.get_traceback_limit() == frames:
+                return
+            tracemalloc.stop()
+        tracemalloc.start(frames)
+        logger.info("Heap allocation tracing started (%d frames)", frames)
+
+    def stop(self) -> None:
+        """Stop tracing and drop stored snapshots; they cannot be diffed against a later tracing session."""
+        if not self.is_tracing:
+            return
+        tracemalloc.stop()
+        self._snapshots.clear()
+        logger.info("Heap allocation tracing stopped")
+
+    def snapshot(self, name: str) -> Dict[str, Any]:
+        """
+        Take and store a named snapshot, replacing any snapshot with the same name.
+
+        Raises:
+            HeapProfilerError: If tracing is off
+        """
+        snapshot = self._take()
+        self._snapshots.pop(name, None)
+        self._snapshots[name] = (time.time(), snapshot)
+        while len(self._snapshots) > self._max_snapshots:
+            dropped, _ = self._snapshots.popitem(last=False)
+            logger.info("Dropped heap snapshot %s (limit %d)", dropped, self._max_snapshots)
+        total = sum(stat.size for stat in snapshot.statistics('filename'))
+        return {'name': name, 'traces': len(snapshot.traces), 'traced_bytes': total}
+
+    async def diff(
+        self,
+        base: str,
+        name: Optional[str] = None,
+        group_by: str = 'module',
+        limit: int = 25
+    ) -> Dict[str, Any]:
+        """
+        Top allocation sites that grew between two snapshots.
+
+        Args:
+            base: Earlier snapshot to compare against
+            name: Later snapshot; a fresh snapshot of the live heap when omitted
+            group_by: 'module', 'lineno' or 'traceback'
+            limit: Number of entries returned, largest growth first
+
+        Raises:
+            HeapProfilerError: On an unknown snapshot, grouping, or if tracing is off
+        """
+        if group_by not in GROUP_BY:
+            raise HeapProfilerError(f"group_by must be one of {', '.join(GROUP_BY)}")
+        earlier = self._get(base)
+        later = self._get(name) if name else self._take()
+        # Comparing is pure Python over every trace; keep it off the event loop thread
+        entries = await asyncio.to_thread(_compare, later, earlier, group_by, limit)
+        return {'base': base, 'name': name or '<live>', 'group_by': group_by, 'top': entries}
+
+    def _get(self, name: str) -> tracemalloc.Snapshot:
+        entry = self._snapshots.get(name)
+        if entry is None:
+            raise HeapProfilerError(f"No heap snapshot named '{name}'")
+        return entry[1]
+
+    def _take(self) -> tracemalloc.Snapshot:
+        if not self.is_tracing:
+            raise HeapProfilerError("Heap tracing is off; start it first")
+        return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+
+def _compare(
+    later: tracemalloc.Snapshot,
+    earlier: tracemalloc.Snapshot,
+    group_by: str,
+    limit: int
+) -> List[Dict[str, Any]]:
+    """Diff two snapshots, largest growth first."""
+    if group_by != 'module':
+        stats = later.compare_to(earlier, group_by)[:limit]
+        return [
+            {
+                'site': [f'{frame.filename}:{frame.lineno}' for frame in stat.traceback],
+                'size_diff': stat.size_diff,
+                'size': stat.size,
+                'count_diff': stat.count_diff,
+                'count': stat.count,
+            }
+            for stat in stats
+        ]
+
+    modules: Dict[str, Dict[str, int]] = {}
+    for stat in later.compare_to(earlier, 'filename'):
+        entry = modules.setdefault(
+            module_name(stat.traceback[0].filename),
+            {'size_diff': 0, 'size': 0, 'count_diff': 0, 'count': 0}
+        )
+        entry['size_diff'] += stat.size_diff
+        entry['size'] += stat.size
+        entry['count_diff'] += stat.count_diff
+        entry['count'] += stat.count
+    ranked = sorted(modules.items(), key=lambda item: (abs(item[1]['size_diff']), item[1]['size']), reverse=True)
+    return [{'site': module, **totals} for module, totals in ranked[:limit]]
@@ -0,0 +1,147 @@
+"""Event loop lag monitor with stall attribution.
+
+A coroutine sleeps for ``interval`` in a loop and records how late it woke
+up as the event loop lag histogram. Each wake-up also refreshes a heartbeat.
+A watchdog thread checks the heartbeat; when it is older than
+``interval + threshold`` the loop is blocked right now, so the watchdog grabs
+the loop thread's stack and the running task. That stack is the callback or
+coroutine responsible for the stall, captured without asyncio debug mode.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from services.metrics import LOOP_LAG, LOOP_STALLS
+from services.tasks import spawn
+
+logger = logging.getLogger(__name__)
+
+# Innermost frames kept per captured stall
+_MAX_FRAMES = 25
+
+
+class LoopLagMonitor:
+    """Measures event loop scheduling lag and attributes stalls."""
+
+    def __init__(self, interval: float = 0.25, threshold: float = 0.1, history: int = 50):
+        """
+        Initialize the monitor.
+
+        Args:
+            interval: Seconds between lag measurements
+            threshold: Lag (seconds) above which the loop counts as stalled
+            history: Number of recent stalls kept for /debug/loop
+        """
+        self._interval = interval
+        self._threshold = threshold
+        self._stalls: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id: Optional[int] = None
+        self._heartbeat = 0.0
+        self._last_lag = 0.0
+
+    @property
+    def last_lag(self) -> float:
+        """Most recently measured lag in seconds."""
+        return self._last_lag
+
+    @property
+    def thread_id(self) -> Optional[int]:
+        """Identifier of the thread running the monitored loop."""
+        return self._thread_id
+
+    @property
+    def heartbeat_age(self) -> float:
+        """Seconds since the loop last ran the monitor (grows while it is blocked)."""
+        return max(0.0, time.monotonic() - self._heartbeat - self._interval)
+
+    def start(self) -> None:
+        """Start measuring on the running loop and start the watchdog thread."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = spawn(self._measure(), name='loop-lag-monitor')
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+        logger.info("Event loop monitor started (interval=%.0fms, stall threshold=%.0fms)",
+                    self._interval * 1000, self._threshold * 1000)
+
+    async def stop(self) -> None:
+        """Stop measuring and join the watchdog thread."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    def stalls(self) -> List[Dict[str, Any]]:
+        """Recent stalls, most recent first. Safe to call from another thread."""
+        stalls = list(self._stalls)
+        stalls.reverse()
+        return stalls
+
+    async def _measure(self) -> None:
+        """Sleep for the interval and record how late the wake-up was."""
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self._interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - start - self._interval)
+            self._last_lag = lag
+            LOOP_LAG.observe(lag)
+            if lag > self._threshold:
+                stall = self._stalls[-1] if self._stalls else None
+                if stall is not None and stall['lag'] is None:
+                    stall['lag'] = lag
+                    logger.warning("Event loop blocked for %.0fms in %s",
+                                   lag * 1000, stall['task'] or stall['stack'][-1:])
+                else:
+                    logger.warning("Event loop blocked for %.0fms", lag * 1000)
+
+    def _watch(self) -> None:
+        """Watchdog thread: capture the loop thread's stack while it is stalled."""
+        captured_for = None
+        while not self._stop.wait(self._threshold / 2):
+            heartbeat = self._heartbeat
+            if time.monotonic() - heartbeat > self._interval + self._threshold:
+                if captured_for != heartbeat:
+                    captured_for = heartbeat
+                    self._capture()
+
+    def _capture(self) -> None:
+        """Record the loop thread's current stack and task as a stall."""
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is None:
+            return
+        stack = [
+            f'{summary.filename}:{summary.lineno} in {summary.name}'
+            for summary in traceback.extract_stack(frame, limit=_MAX_FRAMES)
+        ]
+        task = asyncio.current_task(self._loop)
+        self._stalls.append({
+            'at': time.time(),
+            'lag': None,  # Filled in by the monitor once the loop recovers
+            'task': task.get_name() if task is not None else None,
+            'coroutine': getattr(task.get_coro(), '__qualname__', None) if task is not None else None,
+            'stack': stack,
+        })
+        LOOP_STALLS.inc()
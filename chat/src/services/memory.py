@@ -0,0 +1,100 @@
+"""Resident memory reporting and the memory budget.
+
+``chat_process_resident_memory_bytes`` is read from ``/proc/self/statm`` at
+scrape time. With a ``MEMORY_BUDGET_MB`` set, ``MemoryBudget`` samples it
+every ``interval`` and logs a warning when the process grows past the
+budget (and again once it is back under), so a leak shows up well before
+the pod's memory limit kills it. ``LOW_FOOTPRINT=true`` sets a budget and
+shrinks the in-memory buffers; see ``Settings``.
+"""
+
+import asyncio
+import logging
+import os
+import resource
+import sys
+
+from services.metrics import REGISTRY, Gauge
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+# ru_maxrss is in kilobytes on Linux and bytes on macOS
+_MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+RESIDENT_MEMORY = REGISTRY.register(Gauge(
+    'chat_process_resident_memory_bytes',
+    'Resident set size of the chat process.'
+))
+MEMORY_BUDGET = REGISTRY.register(Gauge(
+    'chat_memory_budget_bytes',
+    'Resident memory the process is expected to stay under (0 when no budget is set).'
+))
+OVER_BUDGET = REGISTRY.register(Gauge(
+    'chat_memory_over_budget',
+    'Whether the last sample was over the memory budget (1) or not (0).'
+))
+
+
+def resident_bytes() -> int:
+    """Current resident set size; the peak where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT
+
+
+RESIDENT_MEMORY.set_function(resident_bytes)
+
+
+class MemoryBudget:
+    """Samples resident memory and reports when it exceeds the budget."""
+
+    def __init__(self, budget_mb: float, interval: float = 60.0):
+        """
+        Initialize the budget.
+
+        Args:
+            budget_mb: Budget in MiB; 0 disables the checks
+            interval: Seconds between samples
+        """
+        self._budget = int(budget_mb * 1024 * 1024)
+        self._interval = interval
+        self._over = False
+        MEMORY_BUDGET.set(self._budget)
+
+    @property
+    def budget_bytes(self) -> int:
+        """The budget in bytes (0 when disabled)."""
+        return self._budget
+
+    @property
+    def over_budget(self) -> bool:
+        """Whether the last sample was over the budget."""
+        return self._over
+
+    def check(self) -> int:
+        """
+        Sample resident memory and log a budget crossing.
+
+        Returns:
+            Resident bytes
+        """
+        rss = resident_bytes()
+        over = 0 < self._budget < rss
+        if over and not self._over:
+            logger.warning("Resident memory %.1fMiB is over the %.0fMiB budget",
+                           rss / 2 ** 20, self._budget / 2 ** 20)
+        elif self._over and not over:
+            logger.info("Resident memory %.1fMiB is back under the %.0fMiB budget",
+                        rss / 2 ** 20, self._budget / 2 ** 20)
+        self._over = over
+        OVER_BUDGET.set(1 if over else 0)
+        return rss
+
+    async def run(self) -> None:
+        """Sampling loop, run under a Supervisor."""
+        while True:
+            self.check()
+            await asyncio.sleep(self._interval)
@@ -0,0 +1,282 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+A deliberately small subset of the Prometheus client model: counters, gauges
+and histograms with fixed label names. Labelled series are created once and
+cached, so recording on the command path is a dict lookup plus a few integer
+and float additions: no locks, no string formatting and no per-call objects.
+Label values are only converted to text when ``/metrics`` is scraped.
+
+Series are recorded on the event loop thread, but ``/metrics`` is rendered on
+the health server's thread. A scrape copies each histogram's bucket counts in
+one step and derives ``_count`` and ``+Inf`` from that copy, so they always
+agree. ``_sum`` is read separately and may be missing observations recorded
+during the scrape. That torn read is accepted rather than adding a lock to
+every ``observe``: the next scrape includes those observations.
+"""
+
+import math
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets (seconds) covering chat replies through slow MIDI calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    """Escape a label value for the exposition format."""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = '') -> str:
+    """Render ``{name="value",...}`` for a series, or an empty string if unlabelled."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value."""
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    """Base class for a metric family with fixed label names."""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple, object] = {}
+        if not self.labelnames:
+            self._default = self._new_child()
+            self._children[()] = self._default
+
+    def labels(self, *values):
+        """
+        Get the series for a set of label values, creating it on first use.
+
+        Callers on hot paths can keep the returned series to skip the lookup.
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def collect(self) -> List[str]:
+        """Render the family's samples as exposition lines."""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for values, child in list(self._children.items()):
+            lines.extend(self._samples(values, child))
+        return lines
+
+    def _samples(self, values: Tuple, child) -> List[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        """Increment an unlabelled counter."""
+        self._default.value += amount
+
+    def _samples(self, values, child):
+        return [f'{self.name}_total{_format_labels(self.labelnames, values)} {_format_value(child.value)}']
+
+
+class _GaugeChild:
+    __slots__ = ('value', 'function')
+
+    def __init__(self):
+        self.value = 0
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """Read the value from ``function`` at scrape time instead."""
+        self.function = function
+
+    def get(self) -> float:
+        return self.function() if self.function is not None else self.value
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be read from a callback when scraped."""
+
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        """Set an unlabelled gauge."""
+        self._default.value = value
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """Read an unlabelled gauge from ``function`` at scrape time."""
+        self._default.function = function
+
+    def _samples(self, values, child):
+        return [f'{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.get())}']
+
+
+class _HistogramChild:
+    __slots__ = ('upper_bounds', 'counts', 'sum')
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # One slot per bucket plus +Inf; cumulated only when rendered
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record a value in an unlabelled histogram."""
+        self._default.observe(value)
+
+    def _samples(self, values, child):
+        lines = []
+        cumulative = 0
+        # Copied in one step (atomic under the GIL) so the buckets and _count agree
+        counts = child.counts.copy()
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f'{self.name}_sum{labels} {_format_value(child.sum)}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Registry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric family. Returns it so definitions can be one-liners."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render every family in the Prometheus text exposition format (0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# Content type served on /metrics
+CONTENT_TYPE = 'text/plain; version=0.0.4'
+
+COMMAND_LATENCY = REGISTRY.register(Histogram(
+    'chat_command_duration_seconds',
+    'Time to handle a chat command, by command and outcome (ok, rejected, timeout, error, cancelled).',
+    ('command', 'outcome')
+))
+COMMANDS_IN_FLIGHT = REGISTRY.register(Gauge(
+    'chat_commands_in_flight',
+    'Chat commands currently running.'
+))
+MIDI_REQUEST_LATENCY = REGISTRY.register(Histogram(
+    'chat_midi_request_duration_seconds',
+    'MIDI API request latency by endpoint and HTTP status (or error/timeout).',
+    ('endpoint', 'status')
+))
+NATS_PUBLISH_LATENCY = REGISTRY.register(Histogram(
+    'chat_nats_publish_duration_seconds',
+    'Time to publish an event to NATS.'
+))
+MIDI_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    'chat_midi_queue_depth',
+    'MIDI API requests waiting for a concurrency slot.'
+))
+MIDI_IN_FLIGHT = REGISTRY.register(Gauge(
+    'chat_midi_in_flight',
+    'MIDI API requests currently in flight.'
+))
+MIDI_CONCURRENCY_LIMIT = REGISTRY.register(Gauge(
+    'chat_midi_concurrency_limit',
+    'Current adaptive concurrency limit for MIDI API requests.'
+))
+AUTH_REFRESHES = REGISTRY.register(Counter(
+    'chat_midi_auth_refreshes',
+    'MIDI API token refreshes.'
+))
+ERRORS = REGISTRY.register(Counter(
+    'chat_errors',
+    'Errors by source (command, midi, nats).',
+    ('source',)
+))
+LOOP_LAG = REGISTRY.register(Histogram(
+    'chat_event_loop_lag_seconds',
+    'How late the event loop ran a scheduled wake-up.',
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+))
+LOOP_STALLS = REGISTRY.register(Counter(
+    'chat_event_loop_stalls',
+    'Times the event loop was blocked for longer than the stall threshold.'
+))
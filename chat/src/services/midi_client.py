@@ -1,12 +1,20 @@
 """HTTP client for communicating with the MIDI API."""
 
 import aiohttp
+import asyncio
 import logging
+import time
+from contextlib import nullcontext
 from typing import Optional, Dict, Any
-from config.logging_config import get_correlation_id
+from config.logging_config import get_remaining_time, record_stage
+from services.concurrency_limiter import AdaptiveConcurrencyLimiter
+from services.metrics import AUTH_REFRESHES, ERRORS, MIDI_REQUEST_LATENCY
+from services.tracing import inject_headers, tracer
 
 logger = logging.getLogger(__name__)
 
+_MIDI_ERRORS = ERRORS.labels('midi')
+
 
 class MidiClient:
     """
@@ -20,7 +28,8 @@ class MidiClient:
         base_url: str,
         client_id: Optional[str] = None,
         client_secret: Optional[str] = None,
-        timeout: int = 5
+        timeout: int = 5,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None
     ):
         """
         Initialize the MIDI client.
@@ -30,6 +39,7 @@ class MidiClient:
             client_id: Client ID for authentication (optional)
             client_secret: Client secret for authentication (optional)
             timeout: Request timeout in seconds (default: 5)
+            limiter: Concurrency limiter shared by all clients of the same API (optional)
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = aiohttp.ClientTimeout(total=timeout)
@@ -37,6 +47,8 @@ class MidiClient:
         self._client_id = client_id
         self._client_secret = client_secret
         self._authenticating = False
+        self._limiter = limiter
+        self._session: Optional[aiohttp.ClientSession] = None
     
     async def get(self, endpoint: str, authenticated: bool = False, _retry: bool = True) -> Dict[str, Any]:
         """
@@ -53,30 +65,7 @@ class MidiClient:
         Raises:
             Exception: If the request fails
         """
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        
-        headers = {}
-        if authenticated and self._token:
-            headers['Authorization'] = f'Bearer {self._token}'
-        
-        try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.get(url, headers=headers) as response:
-                    # Handle authentication errors with retry
-                    if response.status in (401, 403) and authenticated and _retry:
-                        logger.warning(f"Authentication failed (HTTP {response.status}), refreshing token...")
-                        await self._ensure_authenticated()
-                        return await self.get(endpoint, authenticated=True, _retry=False)
-                    
-                    response.raise_for_status()
-                    return await response.json()
-                    
-        except aiohttp.ClientError as e:
-            logger.error(f"Error making GET request to {url}: {e}")
-            raise Exception(f"Failed to communicate with MIDI service: {str(e)}")
-        except Exception as e:
-            logger.error(f"Unexpected error in GET request to {url}: {e}")
-            raise
+        return await self._request('GET', endpoint, None, authenticated, _retry)
     
     async def post(self, endpoint: str, data: Dict[str, Any], authenticated: bool = False, _retry: bool = True) -> Dict[str, Any]:
         """
@@ -94,32 +83,67 @@ class MidiClient:
         Raises:
             Exception: If the request fails
         """
+        return await self._request('POST', endpoint, data, authenticated, _retry)
+    
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict[str, Any]],
+        authenticated: bool,
+        _retry: bool
+    ) -> Dict[str, Any]:
+        """
+        Make a request to the MIDI API inside its own trace span.
+        
+        The span's trace context and the correlation ID are sent as headers, a
+        concurrency slot is held for the request and its latency is recorded.
+        On 401/403 the token is refreshed and the request retried once.
+        """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        stage = 'midi_auth' if endpoint == 'api/token' else 'midi_http'
         
-        headers = {
-            'X-Correlation-ID': get_correlation_id()
-        }
-        if authenticated and self._token:
-            headers['Authorization'] = f'Bearer {self._token}'
+        with tracer.span(f'midi.http {method}', endpoint=endpoint) as span:
+            headers = inject_headers({})
+            if authenticated and self._token:
+                headers['Authorization'] = f'Bearer {self._token}'
+            
+            start = time.monotonic()
+            status = 'error'
+            try:
+                async with self._slot():
+                    session = self._get_session()
+                    if method == 'GET':
+                        request = session.get(url, headers=headers, timeout=self._request_timeout())
+                    else:
+                        request = session.post(url, json=data, headers=headers, timeout=self._request_timeout())
+                    async with request as response:
+                        status = response.status
+                        # Handle authentication errors with retry (outside this request's timing)
+                        if not (response.status in (401, 403) and authenticated and _retry):
+                            response.raise_for_status()
+                            return await response.json()
+                        logger.warning("Authentication failed (HTTP %s), refreshing token...", response.status)
+                        
+            except aiohttp.ClientError as e:
+                _MIDI_ERRORS.inc()
+                logger.error("Error making %s request to %s: %s", method, url, e)
+                raise Exception(f"Failed to communicate with MIDI service: {str(e)}")
+            except Exception as e:
+                _MIDI_ERRORS.inc()
+                if isinstance(e, asyncio.TimeoutError):
+                    status = 'timeout'
+                logger.error("Unexpected error in %s request to %s: %s", method, url, e)
+                raise
+            finally:
+                elapsed = time.monotonic() - start
+                logger.debug("MIDI %s %s %s -> %s in %.0fms", method, endpoint, data, status, elapsed * 1000)
+                record_stage(stage, elapsed)
+                MIDI_REQUEST_LATENCY.labels(endpoint, status).observe(elapsed)
+                span.set_attribute('http.status_code', status)
         
-        try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.post(url, json=data, headers=headers) as response:
-                    # Handle authentication errors with retry
-                    if response.status in (401, 403) and authenticated and _retry:
-                        logger.warning(f"Authentication failed (HTTP {response.status}), refreshing token...")
-                        await self._ensure_authenticated()
-                        return await self.post(endpoint, data, authenticated=True, _retry=False)
-                    
-                    response.raise_for_status()
-                    return await response.json()
-                    
-        except aiohttp.ClientError as e:
-            logger.error(f"Error making POST request to {url}: {e}")
-            raise Exception(f"Failed to communicate with MIDI service: {str(e)}")
-        except Exception as e:
-            logger.error(f"Unexpected error in POST request to {url}: {e}")
-            raise
+        await self._ensure_authenticated()
+        return await self._request(method, endpoint, data, True, False)
     
     async def authenticate(self, client_id: str, client_secret: str) -> str:
         """
@@ -151,11 +175,11 @@ class MidiClient:
                 raise Exception("No token found in authentication response")
             
             self._token = token
-            logger.info(f"Successfully authenticated as {client_id}")
+            logger.info("Successfully authenticated as %s", client_id)
             return token
             
         except Exception as e:
-            logger.error(f"Authentication failed: {e}")
+            logger.error("Authentication failed: %s", e)
             raise
     
     async def send_control_change_message(
@@ -243,6 +267,48 @@ class MidiClient:
             authenticated=True
         )
     
+    async def warm_up(self) -> None:
+        """
+        Authenticate ahead of the first command.
+        
+        The token request also opens the pooled keep-alive connection that
+        later commands reuse. Without credentials only the connection is opened.
+        """
+        if self._client_id and self._client_secret:
+            await self._ensure_authenticated()
+        else:
+            await self.get('health')
+    
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Session shared by all requests so connections are kept alive and reused."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self.timeout)
+        return self._session
+    
+    def _slot(self):
+        """Hold a concurrency slot for one request, if a limiter is configured."""
+        return self._limiter.slot() if self._limiter else nullcontext()
+    
+    def _request_timeout(self) -> aiohttp.ClientTimeout:
+        """
+        Get the timeout for the next request, capped by the current command's deadline.
+        
+        Raises:
+            asyncio.TimeoutError: If the deadline has already passed
+        """
+        remaining = get_remaining_time()
+        if remaining is None or remaining >= self.timeout.total:
+            return self.timeout
+        if remaining <= 0:
+            raise asyncio.TimeoutError("Command deadline exceeded before MIDI request")
+        return aiohttp.ClientTimeout(total=remaining)
+    
     async def _ensure_authenticated(self) -> None:
         """
         Ensure the client is authenticated, refreshing token if needed.
@@ -252,7 +318,6 @@ class MidiClient:
             Exception: If authentication fails or credentials not available
         """
         if self._authenticating:
-            import asyncio
             while self._authenticating:
                 await asyncio.sleep(0.1)
             return
@@ -261,8 +326,10 @@ class MidiClient:
             raise Exception("Cannot authenticate: client credentials not configured")
         
         self._authenticating = True
+        AUTH_REFRESHES.inc()
         try:
-            await self.authenticate(self._client_id, self._client_secret)
+            with tracer.span('midi.auth'):
+                await self.authenticate(self._client_id, self._client_secret)
         finally:
             self._authenticating = False
 
@@ -0,0 +1,112 @@
+"""NATS JetStream consumer for confirmed MIDI device state."""
+
+import json
+import logging
+from typing import Optional
+
+from nats.js import api
+
+from config.settings import settings
+from services.state_cache import DeviceStateCache
+
+logger = logging.getLogger(__name__)
+
+# MIDI layer setting names (last subject token of midi.<setting>) -> chat command key.
+# The MIDI layer names settings after the device, the chat layer after its commands.
+MIDI_SETTING_KEYS: dict[str, str] = {
+    "reverbengine": "engine",
+    "engine":       "engine",
+    "time":         "time",
+    "predelay":     "delay",
+    "delay":        "delay",
+    "control1":     "dial1",
+    "dial1":        "dial1",
+    "control2":     "dial2",
+    "dial2":        "dial2",
+}
+
+
+class MidiStateSubscriber:
+    """Consumes the MIDI_STATE stream and feeds the device state cache.
+
+    Each replica creates its own ephemeral ordered consumer, delivering the last
+    message per subject first, so every pod (including a new pod next to the old
+    one during a rolling update) receives every ``midi.*`` update and starts from
+    the current device state after a (re)subscribe. Messages are expected on
+    ``midi.<setting>`` with the same ``{"value": ...}`` payload the publishers use
+    for overlay events.
+    """
+
+    def __init__(self, nats_publisher, state_cache: DeviceStateCache):
+        """
+        Initialize the subscriber.
+
+        Args:
+            nats_publisher: Connected NatsPublisher whose connection is shared
+            state_cache: Cache that receives confirmed values
+        """
+        self._nats = nats_publisher
+        self._cache = state_cache
+        self._sub = None
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the consumer subscription is active."""
+        return self._sub is not None
+
+    async def start(self) -> None:
+        """Create this replica's consumer and start receiving state updates."""
+        if self._sub is not None:
+            return
+
+        nc = self._nats.client
+        if nc is None or nc.is_closed:
+            logger.warning("NATS not connected, cannot subscribe to %s", settings.midi_state_subject)
+            return
+
+        js = nc.jetstream()
+        self._sub = await js.subscribe(
+            settings.midi_state_subject,
+            stream=settings.midi_state_stream,
+            cb=self._on_message,
+            ordered_consumer=True,
+            deliver_policy=api.DeliverPolicy.LAST_PER_SUBJECT,
+        )
+        logger.info(
+            "Subscribed to %s on stream %s", settings.midi_state_subject, settings.midi_state_stream
+        )
+
+    async def stop(self) -> None:
+        """Stop receiving state updates; the server removes the ephemeral consumer."""
+        if self._sub is not None:
+            try:
+                await self._sub.unsubscribe()
+            except Exception as e:
+                logger.warning("Failed to unsubscribe from MIDI state: %s", e)
+            self._sub = None
+
+    async def _on_message(self, msg) -> None:
+        """Handle a single MIDI state message."""
+        try:
+            key = self._key_for_subject(msg.subject)
+            value = self._decode_value(msg.data)
+            if key is None or value is None:
+                logger.debug("Ignoring MIDI state message on %s", msg.subject)
+            else:
+                self._cache.update(key, value, source='midi')
+        except Exception as e:
+            logger.error("Failed to process MIDI state message on %s: %s", msg.subject, e)
+
+    @staticmethod
+    def _key_for_subject(subject: str) -> Optional[str]:
+        """Map a midi.<setting> subject to a cache key."""
+        setting = subject.rsplit('.', 1)[-1].lower()
+        return MIDI_SETTING_KEYS.get(setting)
+
+    @staticmethod
+    def _decode_value(data: bytes) -> Optional[str]:
+        """Extract the value from a JSON {"value": ...} payload."""
+        payload = json.loads(data)
+        if not isinstance(payload, dict) or payload.get('value') is None:
+            return None
+        return str(payload['value'])
@@ -1,19 +1,32 @@
 """NATS publisher service for broadcasting overlay events."""
 
+import asyncio
 import json
 import logging
+import time
 import nats
 
+from config.logging_config import within_deadline
 from config.settings import settings
+from services.metrics import ERRORS, NATS_PUBLISH_LATENCY
+from services.tracing import inject_headers, tracer
 
 logger = logging.getLogger(__name__)
 
+_NATS_ERRORS = ERRORS.labels('nats')
+
 
 class NatsPublisher:
     """Publishes events to NATS."""
 
     def __init__(self):
         self._nc = None
+        self._closed: asyncio.Event | None = None
+
+    @property
+    def client(self):
+        """The underlying NATS connection, shared by subscribers. None until connected."""
+        return self._nc
 
     async def connect(self) -> None:
         """Connect to NATS server."""
@@ -22,12 +35,21 @@ class NatsPublisher:
             opts["user"] = settings.nats_user
         if settings.nats_pass:
             opts["password"] = settings.nats_pass
-        self._nc = await nats.connect(**opts)
+        closed = asyncio.Event()
+
+        async def on_closed() -> None:
+            closed.set()
+
+        self._closed = closed
+        self._nc = await nats.connect(closed_cb=on_closed, **opts)
         logger.info(f"Connected to NATS at {settings.nats_url} as '{settings.nats_user}'")
 
     async def publish(self, subject: str, value: str) -> None:
         """Publish a value to a NATS subject.
 
+        Bounded by the current command's deadline, if any. The message carries
+        ``traceparent`` and ``X-Correlation-ID`` headers for the current trace.
+
         Args:
             subject: Full NATS subject e.g. 'overlay.engine'
             value: The value to broadcast
@@ -36,11 +58,46 @@ class NatsPublisher:
             logger.warning("NATS not connected, skipping publish to %s", subject)
             return
         payload = json.dumps({"value": value}).encode()
-        await self._nc.publish(subject, payload)
+        with tracer.span('nats.publish', subject=subject):
+            headers = inject_headers({})
+            start = time.monotonic()
+            try:
+                await within_deadline('nats_publish', self._nc.publish(subject, payload, headers=headers))
+            except Exception:
+                _NATS_ERRORS.inc()
+                raise
+            finally:
+                NATS_PUBLISH_LATENCY.observe(time.monotonic() - start)
         logger.info("Published event %s = %s", subject, value)
 
-    async def close(self) -> None:
-        """Close the NATS connection."""
+    async def wait_closed(self) -> None:
+        """Wait until the connection is closed for good: reconnect attempts exhausted or close() called."""
+        if self._nc is None or self._nc.is_closed:
+            return
+        await self._closed.wait()
+
+    async def ping(self, timeout: float = 2.0) -> None:
+        """Round trip to the NATS server.
+
+        Raises:
+            ConnectionError: If not connected
+            nats.errors.TimeoutError: If the server does not answer in time
+        """
+        if not self._nc or not self._nc.is_connected:
+            raise ConnectionError("NATS not connected")
+        await self._nc.flush(timeout=timeout)
+
+    async def close(self, flush_timeout: float = 2.0) -> None:
+        """Flush buffered messages and close the NATS connection.
+
+        Args:
+            flush_timeout: Seconds to wait for the server to acknowledge the flush
+        """
         if self._nc and not self._nc.is_closed:
+            if self._nc.is_connected:
+                try:
+                    await self._nc.flush(timeout=flush_timeout)
+                except Exception as e:
+                    logger.warning("Failed to flush NATS before closing: %s", e)
             await self._nc.close()
             logger.info("NATS connection closed")
@@ -0,0 +1,135 @@
+"""Dependency readiness probes run on a background schedule.
+
+Each dependency (Twitch, NATS, the MIDI API) has an async check that raises
+when the dependency is unusable. ``ReadinessMonitor`` runs all checks
+concurrently every ``interval`` seconds and caches the results, so the
+``/ready`` probe is a dictionary read rather than network I/O.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import aiohttp
+
+from services.tasks import spawn
+
+logger = logging.getLogger(__name__)
+
+Check = Callable[[], Awaitable[Any]]
+
+
+class ProbeResult:
+    """Outcome of the latest probe of one dependency."""
+
+    __slots__ = ('name', 'healthy', 'latency', 'checked_at', 'error')
+
+    def __init__(self, name: str, healthy: bool, latency: float, checked_at: float, error: Optional[str] = None):
+        self.name = name
+        self.healthy = healthy
+        self.latency = latency
+        self.checked_at = checked_at
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'status': 'up' if self.healthy else 'down',
+            'latency_ms': round(self.latency * 1000, 1),
+            'checked_at': self.checked_at,
+            'error': self.error,
+        }
+
+
+def http_check(url: str) -> Check:
+    """
+    Build a check that GETs ``url`` and fails on a non-2xx response.
+
+    Args:
+        url: Health endpoint of the dependency
+    """
+    async def check() -> None:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url) as response:
+                response.raise_for_status()
+    return check
+
+
+class ReadinessMonitor:
+    """Probes dependencies in the background and caches the results."""
+
+    def __init__(self, checks: Dict[str, Check], interval: float = 10.0, timeout: float = 2.0):
+        """
+        Initialize the monitor.
+
+        Args:
+            checks: Dependency name -> async check that raises when the dependency is down
+            interval: Seconds between probe rounds
+            timeout: Seconds before a single check counts as failed
+        """
+        self._checks = checks
+        self._interval = interval
+        self._timeout = timeout
+        self._results: Dict[str, ProbeResult] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """True once every dependency has been probed and its latest probe passed."""
+        results = self._results
+        return len(results) == len(self._checks) and all(r.healthy for r in results.values())
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-dependency status of the latest probes ('pending' until first probed)."""
+        results = self._results
+        return {
+            name: results[name].to_dict() if name in results else {'status': 'pending'}
+            for name in self._checks
+        }
+
+    def start(self) -> None:
+        """Start probing in the background."""
+        if self._task is None or self._task.done():
+            self._task = spawn(self.run(), name='readiness-probes')
+
+    async def stop(self) -> None:
+        """Stop probing."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def probe_all(self) -> None:
+        """Run every check once, concurrently, and cache the results."""
+        await asyncio.gather(*(self._probe(name, check) for name, check in self._checks.items()))
+
+    async def run(self) -> None:
+        """Probe loop, started by ``start`` or run under a Supervisor."""
+        while True:
+            await self.probe_all()
+            await asyncio.sleep(self._interval)
+
+    async def _probe(self, name: str, check: Check) -> None:
+        start = time.monotonic()
+        error = None
+        try:
+            await asyncio.wait_for(check(), self._timeout)
+        except asyncio.TimeoutError:
+            error = f'timed out after {self._timeout}s'
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        result = ProbeResult(name, error is None, time.monotonic() - start, time.time(), error)
+
+        previous = self._results.get(name)
+        if previous is not None and previous.healthy != result.healthy:
+            if result.healthy:
+                logger.info("Dependency %s recovered", name)
+            else:
+                logger.warning("Dependency %s is down: %s", name, error)
+        elif previous is None and not result.healthy:
+            logger.warning("Dependency %s is down: %s", name, error)
+        # Replaced rather than mutated so other threads always read a consistent dict
+        self._results = {**self._results, name: result}
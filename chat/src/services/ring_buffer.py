@@ -0,0 +1,218 @@
+"""Single-producer, single-consumer ring buffer in shared memory.
+
+Connects the ingest and execution processes in split mode
+(``PROCESS_MODE=split``). Records have a fixed size, so pushing is a
+``struct.pack_into`` and a slice copy into the shared segment and popping is
+one copy out: nothing is pickled and nothing is allocated per record besides
+the returned ``bytes``.
+
+Layout: a 64-byte header (``head``, ``tail``, ``capacity``, ``record_size``,
+the consumer's heartbeat and ready flag), then ``capacity`` slots. Each slot
+starts with the length of the record in it.
+
+Plain stores into shared memory are not ordered across processes: on ARM64
+the consumer could see a new ``tail`` before the record bytes behind it.
+Two process-shared semaphores are the synchronization points. ``published``
+counts records written, ``released`` counts free slots. POSIX semaphore
+operations synchronize memory, so everything the producer wrote before
+posting ``published`` is visible to a consumer that took it, and the same
+holds for a slot handed back through ``released``. Both sides only use the
+non-blocking ``acquire(False)``, so neither can block the event loop, and a
+producer that dies mid-write never exposes a partial record.
+
+``Doorbell`` wakes the consumer's event loop through a pipe instead of
+polling: the producer writes a byte after pushing, the consumer waits for
+the pipe to become readable.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from typing import Any, NamedTuple, Optional
+
+# head, tail, capacity, record_size, consumer heartbeat (wall clock, shared across processes), consumer ready
+_HEADER = struct.Struct('<QQQQdQ')
+_HEADER_SIZE = 64
+# Per-slot payload length
+_SLOT = struct.Struct('<Q')
+_HEAD, _TAIL, _HEARTBEAT = 0, 8, 32
+
+# Bytes of each slot taken by the slot header; the rest is payload
+SLOT_HEADER_SIZE = _SLOT.size
+
+
+class RingHandle(NamedTuple):
+    """What another process needs to attach to a ring; pass it as a process argument."""
+
+    name: str
+    published: Any
+    released: Any
+
+
+class SharedRingBuffer:
+    """Fixed-size records in a shared memory segment, one producer and one consumer."""
+
+    def __init__(self, segment: shared_memory.SharedMemory, published, released, owner: bool = False):
+        """
+        Wrap an existing segment; use ``create`` or ``attach``.
+
+        Args:
+            segment: Shared memory holding the header and slots
+            published: Semaphore counting records ready to pop
+            released: Semaphore counting free slots
+            owner: Whether ``close`` also unlinks the segment
+        """
+        self._segment = segment
+        self._buf = segment.buf
+        self._published = published
+        self._released = released
+        self._owner = owner
+        _, _, self.capacity, self.record_size, _, _ = _HEADER.unpack_from(self._buf, 0)
+        self.max_payload = self.record_size - SLOT_HEADER_SIZE
+
+    @classmethod
+    def create(cls, capacity: int, record_size: int, context=None) -> 'SharedRingBuffer':
+        """
+        Allocate a new ring. The creating process owns it and unlinks it on ``close``.
+
+        Args:
+            capacity: Number of slots
+            record_size: Bytes per slot, including the slot header
+            context: multiprocessing context of the processes that attach; defaults to spawn
+        """
+        if record_size <= SLOT_HEADER_SIZE or record_size % 8:
+            raise ValueError(f"record_size must be a multiple of 8 larger than {SLOT_HEADER_SIZE}")
+        context = context or multiprocessing.get_context('spawn')
+        segment = shared_memory.SharedMemory(create=True, size=_HEADER_SIZE + capacity * record_size)
+        segment.buf[:_HEADER_SIZE] = bytes(_HEADER_SIZE)
+        _HEADER.pack_into(segment.buf, 0, 0, 0, capacity, record_size, 0.0, 0)
+        return cls(segment, context.Semaphore(0), context.Semaphore(capacity), owner=True)
+
+    @classmethod
+    def attach(cls, handle: RingHandle) -> 'SharedRingBuffer':
+        """Open a ring created by another process."""
+        # The creator unlinks the segment; an attaching process must not (Python 3.13+ lets it opt out)
+        untracked = {'track': False} if sys.version_info >= (3, 13) else {}
+        return cls(shared_memory.SharedMemory(name=handle.name, **untracked), handle.published, handle.released)
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory segment."""
+        return self._segment.name
+
+    @property
+    def handle(self) -> RingHandle:
+        """Handle other processes attach with."""
+        return RingHandle(self._segment.name, self._published, self._released)
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    @property
+    def _head(self) -> int:
+        return struct.unpack_from('<Q', self._buf, _HEAD)[0]
+
+    @property
+    def _tail(self) -> int:
+        return struct.unpack_from('<Q', self._buf, _TAIL)[0]
+
+    def push(self, payload: bytes) -> bool:
+        """
+        Append a record (producer only).
+
+        Returns:
+            False if the ring is full and the record was not written
+
+        Raises:
+            ValueError: If the payload does not fit in a slot
+        """
+        if len(payload) > self.max_payload:
+            raise ValueError(f"Record of {len(payload)} bytes exceeds the {self.max_payload}-byte slot")
+        # Taking a free slot also makes the consumer's reads of it happen before these writes
+        if not self._released.acquire(False):
+            return False
+        tail = self._tail
+        offset = _HEADER_SIZE + (tail % self.capacity) * self.record_size
+        start = offset + SLOT_HEADER_SIZE
+        self._buf[start:start + len(payload)] = payload
+        _SLOT.pack_into(self._buf, offset, len(payload))
+        struct.pack_into('<Q', self._buf, _TAIL, tail + 1)
+        self._published.release()
+        return True
+
+    def pop(self) -> Optional[bytes]:
+        """Take the oldest record (consumer only), or None if there is none yet."""
+        # Records are only read after taking a published count: tail alone may be visible too early
+        if not self._published.acquire(False):
+            return None
+        head = self._head
+        offset = _HEADER_SIZE + (head % self.capacity) * self.record_size
+        length, = _SLOT.unpack_from(self._buf, offset)
+        start = offset + SLOT_HEADER_SIZE
+        payload = bytes(self._buf[start:start + length])
+        struct.pack_into('<Q', self._buf, _HEAD, head + 1)
+        self._released.release()
+        return payload
+
+    def beat(self, ready: bool) -> None:
+        """Consumer liveness: record the time and whether it can take records."""
+        struct.pack_into('<dQ', self._buf, _HEARTBEAT, time.time(), 1 if ready else 0)
+
+    def consumer_status(self) -> tuple:
+        """(seconds since the consumer's last beat, its ready flag); age is infinite before the first beat."""
+        heartbeat, ready = struct.unpack_from('<dQ', self._buf, _HEARTBEAT)
+        age = time.time() - heartbeat if heartbeat else float('inf')
+        return age, bool(ready)
+
+    def close(self) -> None:
+        """Detach; the owner also frees the segment."""
+        self._buf.release()
+        self._segment.close()
+        if self._owner:
+            self._segment.unlink()
+
+
+class Doorbell:
+    """Pipe-based wake-up from a producer process to a consumer's event loop."""
+
+    def __init__(self, reader: Optional[Connection] = None, writer: Optional[Connection] = None):
+        """
+        Args:
+            reader: Consumer end of a one-way ``multiprocessing.Pipe``
+            writer: Producer end
+        """
+        self._reader = reader
+        self._writer = writer
+        for end in (reader, writer):
+            if end is not None:
+                os.set_blocking(end.fileno(), False)
+
+    def ring(self) -> None:
+        """Wake the consumer. Never blocks: a full pipe already guarantees a wake-up."""
+        try:
+            os.write(self._writer.fileno(), b'\0')
+        except (BlockingIOError, BrokenPipeError):
+            pass
+
+    async def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait until rung (or ``timeout`` passes), then clear pending rings."""
+        fd = self._reader.fileno()
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(fd)
+        try:
+            while os.read(fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
@@ -0,0 +1,124 @@
+"""In-memory cache of confirmed device state.
+
+Holds the latest known value of each chat-controllable device setting, keyed
+by chat command name (``engine``, ``time``, ``delay``, ``dial1``, ``dial2``).
+Values are fed in by NATS consumers and read locally by command handlers, so
+reads never need a round trip to the MIDI API.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StateEntry:
+    """A single cached setting value."""
+
+    __slots__ = ('key', 'value', 'revision', 'source', 'updated_at')
+
+    def __init__(self, key: str, value: str, revision: int, source: str, updated_at: float):
+        self.key = key
+        self.value = value
+        self.revision = revision
+        self.source = source
+        self.updated_at = updated_at
+
+    def __repr__(self) -> str:
+        return f"StateEntry(key={self.key!r}, value={self.value!r}, revision={self.revision}, source={self.source!r})"
+
+
+class DeviceStateCache:
+    """Latest-value cache for device settings with change notification.
+
+    Every update bumps a cache-wide revision counter. Callers that need to know
+    whether a change was applied record ``revision`` before making the change
+    and then await ``wait_for_update`` for the next confirmed entry.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, StateEntry] = {}
+        self._revision = 0
+        self._waiters: Dict[str, List[Tuple[asyncio.Future, Optional[str]]]] = {}
+
+    @property
+    def revision(self) -> int:
+        """Revision of the most recent update."""
+        return self._revision
+
+    def get(self, key: str) -> Optional[str]:
+        """Get the cached value for a setting, or None if unknown."""
+        entry = self._entries.get(key)
+        return entry.value if entry else None
+
+    def entry(self, key: str) -> Optional[StateEntry]:
+        """Get the full cached entry for a setting, or None if unknown."""
+        return self._entries.get(key)
+
+    def update(self, key: str, value: str, source: str = 'midi') -> StateEntry:
+        """
+        Store a new value for a setting and wake any waiters.
+
+        Args:
+            key: Setting key (chat command name)
+            value: Latest value as reported by the source
+            source: Where the value came from (e.g. 'midi')
+
+        Returns:
+            The stored entry
+        """
+        self._revision += 1
+        entry = StateEntry(key, value, self._revision, source, time.time())
+        self._entries[key] = entry
+
+        waiters = self._waiters.get(key)
+        if waiters:
+            for waiter, wanted_source in waiters:
+                if wanted_source in (None, source) and not waiter.done():
+                    waiter.set_result(entry)
+
+        logger.debug("State %s = %s (source=%s, revision=%d)", key, value, source, entry.revision)
+        return entry
+
+    async def wait_for_update(
+        self,
+        key: str,
+        since_revision: int,
+        timeout: float,
+        source: Optional[str] = None
+    ) -> Optional[StateEntry]:
+        """
+        Wait for an update to a setting newer than ``since_revision``.
+
+        Args:
+            key: Setting key to watch
+            since_revision: Only entries with a higher revision are returned
+            timeout: Maximum time to wait in seconds
+            source: Only accept updates from this source (None accepts any)
+
+        Returns:
+            The new entry, or None if no update arrived in time
+        """
+        entry = self._entries.get(key)
+        if entry and entry.revision > since_revision and source in (None, entry.source):
+            return entry
+
+        waiter = asyncio.get_running_loop().create_future()
+        registration = (waiter, source)
+        self._waiters.setdefault(key, []).append(registration)
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters and registration in waiters:
+                waiters.remove(registration)
+                if not waiters:
+                    del self._waiters[key]
+
+    def snapshot(self) -> Dict[str, str]:
+        """Get a copy of all cached values."""
+        return {key: entry.value for key, entry in self._entries.items()}
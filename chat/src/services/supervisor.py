@@ -0,0 +1,281 @@
+"""Supervisor tree for long-running tasks.
+
+A ``Supervisor`` runs a set of named children, each a factory returning a
+fresh coroutine. When a child fails it is restarted after an exponential
+backoff (``backoff_initial`` doubling up to ``backoff_max``, with jitter;
+the backoff resets once a child has stayed up for ``backoff_max``). Each
+child has a restart budget: more than ``max_restarts`` restarts within
+``window`` seconds exhausts it, and the supervisor gives up, cancels its
+other children and raises ``SupervisorEscalation``.
+
+Supervisors nest: a child supervisor added with ``add_supervisor`` is
+restarted as a whole by its parent, so a flapping subtree is retried before
+the failure climbs further. Only when the root's budget is exhausted does
+the process exit, letting Kubernetes restart the pod as the last resort.
+
+``ChildProcess`` makes an OS process a supervised child: its ``run`` starts
+the process and returns when it exits, raising on a non-zero exit code, so
+``PROCESS_MODE=split`` restarts a crashed process like any other task.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Callable, Coroutine, Deque, Dict, List, Optional
+
+from services.metrics import REGISTRY, Counter, Gauge
+from services.tasks import spawn
+
+logger = logging.getLogger(__name__)
+
+RESTARTS = REGISTRY.register(Counter(
+    'chat_supervisor_restarts',
+    'Restarts of supervised tasks, by supervisor and child.',
+    ('supervisor', 'child')
+))
+ESCALATIONS = REGISTRY.register(Counter(
+    'chat_supervisor_escalations',
+    'Times a supervisor exhausted a restart budget and gave up, by supervisor.',
+    ('supervisor',)
+))
+CHILD_UP = REGISTRY.register(Gauge(
+    'chat_supervisor_child_up',
+    'Whether a supervised task is running (1) or waiting to be restarted (0).',
+    ('supervisor', 'child')
+))
+
+Factory = Callable[[], Coroutine[Any, Any, Any]]
+
+
+class SupervisorEscalation(Exception):
+    """Raised by ``Supervisor.run`` when a child exhausted its restart budget."""
+
+
+class _Child:
+    """A supervised child and its restart history."""
+
+    __slots__ = ('name', 'factory', 'permanent', 'max_restarts', 'restarts', 'total_restarts', 'task')
+
+    def __init__(self, name: str, factory: Factory, permanent: bool, max_restarts: int):
+        self.name = name
+        self.factory = factory
+        self.permanent = permanent
+        self.max_restarts = max_restarts
+        # Monotonic times of recent restarts, for the budget window
+        self.restarts: Deque[float] = deque()
+        self.total_restarts = 0
+        self.task: Optional[asyncio.Task] = None
+
+
+class Supervisor:
+    """Restarts failed child tasks with backoff and escalates when a budget runs out."""
+
+    def __init__(
+        self,
+        name: str,
+        max_restarts: int = 5,
+        window: float = 300.0,
+        backoff_initial: float = 1.0,
+        backoff_max: float = 60.0
+    ):
+        """
+        Initialize the supervisor.
+
+        Args:
+            name: Supervisor name, used in task names, logs and metrics
+            max_restarts: Default restarts allowed per child within ``window``
+            window: Seconds over which restarts count against the budget
+            backoff_initial: Delay before the first restart (seconds)
+            backoff_max: Longest delay between restarts (seconds)
+        """
+        self.name = name
+        self._max_restarts = max_restarts
+        self._window = window
+        self._backoff_initial = backoff_initial
+        self._backoff_max = backoff_max
+        self._children: Dict[str, _Child] = {}
+        self._subtrees: List['Supervisor'] = []
+        self._stopping = False
+
+    def add(
+        self,
+        name: str,
+        factory: Factory,
+        permanent: bool = True,
+        max_restarts: Optional[int] = None
+    ) -> None:
+        """
+        Register a child. Children start when ``run`` starts.
+
+        Args:
+            name: Child name (``<area>-<what>``), also used as its task name
+            factory: Returns a new coroutine for each (re)start
+            permanent: Restart when the child returns, not only when it raises
+            max_restarts: Restart budget within the window; the supervisor default when omitted
+        """
+        if name in self._children:
+            raise ValueError(f"Supervisor {self.name} already has a child named {name}")
+        budget = self._max_restarts if max_restarts is None else max_restarts
+        self._children[name] = _Child(name, factory, permanent, budget)
+
+    def add_supervisor(self, child: 'Supervisor', max_restarts: Optional[int] = None) -> None:
+        """Supervise ``child``: when it escalates, the whole subtree is restarted."""
+        self.add(f'supervisor-{child.name}', child.run, permanent=False, max_restarts=max_restarts)
+        self._subtrees.append(child)
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Each child's state and restart count."""
+        return [
+            {
+                'supervisor': self.name,
+                'child': child.name,
+                'running': child.task is not None and not child.task.done(),
+                'restarts': child.total_restarts,
+            }
+            for child in self._children.values()
+        ]
+
+    def shutdown(self) -> None:
+        """Stop restarting children, here and in child supervisors. Children that exit from now on stay down."""
+        self._stopping = True
+        for subtree in self._subtrees:
+            subtree.shutdown()
+
+    async def run(self) -> None:
+        """
+        Run every child until all have finished or one exhausts its budget.
+
+        Raises:
+            SupervisorEscalation: If a child failed more than its budget allows
+        """
+        # A restarted subtree starts with fresh budgets
+        for child in self._children.values():
+            child.restarts.clear()
+        keepers = [spawn(self._keep(child), name=f'supervisor-{self.name}') for child in self._children.values()]
+        try:
+            for done in asyncio.as_completed(keepers):
+                await done
+        except SupervisorEscalation:
+            ESCALATIONS.labels(self.name).inc()
+            raise
+        finally:
+            for keeper in keepers:
+                keeper.cancel()
+            await asyncio.gather(*keepers, return_exceptions=True)
+
+    async def _keep(self, child: _Child) -> None:
+        """Run one child, restarting it until it finishes for good."""
+        labels = (self.name, child.name)
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            child.task = spawn(child.factory(), name=child.name)
+            CHILD_UP.labels(*labels).set(1)
+            try:
+                # wait() rather than await, so cancelling the supervisor is told apart from the child being cancelled
+                await asyncio.wait({child.task})
+            finally:
+                CHILD_UP.labels(*labels).set(0)
+                if not child.task.done():
+                    # The supervisor itself is being cancelled
+                    child.task.cancel()
+                    await asyncio.gather(child.task, return_exceptions=True)
+            # A child cancelled by someone else (e.g. its own stop()) counts as returning
+            error = None if child.task.cancelled() else child.task.exception()
+
+            if self._stopping or (error is None and not child.permanent):
+                return
+
+            now = time.monotonic()
+            if now - started >= self._backoff_max:
+                attempt = 0
+            while child.restarts and now - child.restarts[0] > self._window:
+                child.restarts.popleft()
+            if len(child.restarts) >= child.max_restarts:
+                logger.error(
+                    "%s/%s failed %d times in %.0fs, giving up: %s",
+                    self.name, child.name, len(child.restarts) + 1, self._window, error or 'exited'
+                )
+                raise SupervisorEscalation(f'{self.name}/{child.name} exhausted its restart budget') from error
+
+            delay = min(self._backoff_initial * 2 ** attempt, self._backoff_max)
+            delay *= random.uniform(0.8, 1.2)
+            attempt += 1
+            child.restarts.append(now)
+            child.total_restarts += 1
+            RESTARTS.labels(*labels).inc()
+            if error is not None:
+                logger.warning("%s/%s failed (%s), restarting in %.1fs", self.name, child.name, error, delay)
+            else:
+                logger.warning("%s/%s exited, restarting in %.1fs", self.name, child.name, delay)
+            await asyncio.sleep(delay)
+            if self._stopping:
+                return
+
+
+class ChildProcess:
+    """An OS process run as a supervised child."""
+
+    def __init__(self, name: str, target: Callable[..., Any], *args: Any, context=None):
+        """
+        Initialize the child.
+
+        Args:
+            name: Process name, used in logs
+            target: Top-level function the process runs
+            args: Arguments for ``target``; must be picklable
+            context: multiprocessing context; 'spawn' when omitted, so no event loop state is inherited
+        """
+        self.name = name
+        self._target = target
+        self._args = args
+        self._context = context or multiprocessing.get_context('spawn')
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self._exit: Optional[asyncio.Future] = None
+
+    async def run(self) -> None:
+        """
+        Start the process and wait for it to exit; a supervisor factory.
+
+        Raises:
+            ChildProcessError: If the process exited with a non-zero code or was killed
+        """
+        loop = asyncio.get_running_loop()
+        self.process = self._context.Process(target=self._target, args=self._args, name=self.name)
+        self.process.start()
+        logger.info("Started process %s (pid %d)", self.name, self.process.pid)
+        self._exit = exited = loop.create_future()
+        loop.add_reader(self.process.sentinel, lambda: exited.done() or exited.set_result(None))
+        try:
+            # wait() rather than await, so a cancelled run does not cancel the future stop() waits on
+            await asyncio.wait({exited})
+        finally:
+            loop.remove_reader(self.process.sentinel)
+            if self.process.is_alive():
+                # The supervisor is being cancelled: do not leave the process behind
+                self.process.kill()
+            await asyncio.to_thread(self.process.join)
+        if self.process.exitcode:
+            raise ChildProcessError(f'{self.name} exited with code {self.process.exitcode}')
+        logger.info("Process %s exited", self.name)
+
+    def send_signal(self, signum: int) -> None:
+        """Deliver ``signum`` to the process if it is running."""
+        if self.process is not None and self.process.is_alive():
+            os.kill(self.process.pid, signum)
+
+    async def stop(self, timeout: float) -> None:
+        """Send SIGTERM and wait up to ``timeout`` for a graceful exit, then kill the process."""
+        if self.process is None or not self.process.is_alive():
+            return
+        # SIGTERM: the process drains as it would for Kubernetes
+        self.process.terminate()
+        await asyncio.wait({self._exit}, timeout=timeout)
+        if self.process.is_alive():
+            logger.warning("Process %s did not exit within %.0fs, killing it", self.name, timeout)
+            self.process.kill()
+            await asyncio.to_thread(self.process.join)
@@ -0,0 +1,196 @@
+"""Task naming, inspection and leak detection for the chat layer.
+
+Background work in the chat layer is started with ``spawn``, which requires a
+name of the form ``<area>-<what>`` (``command-engine``, ``services-start``,
+``effect-state-watch``). The name with any trailing ``-<number>`` removed is
+the task's kind, used to group tasks when looking for leaks.
+
+``install_task_factory`` records when and where every task on the loop was
+created, including tasks started by TwitchIO and nats-py, so ``/debug/tasks``
+can show each live task's age, creating call site and current await point.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import sys
+import time
+import weakref
+from collections import Counter, deque
+from typing import Any, Coroutine, Deque, Dict, List, Optional, Tuple
+
+from services.metrics import REGISTRY, Gauge
+
+logger = logging.getLogger(__name__)
+
+TASKS = REGISTRY.register(Gauge('chat_tasks', 'Live asyncio tasks by kind.', ('kind',)))
+TASK_LEAKS = REGISTRY.register(Gauge(
+    'chat_task_leak_suspected',
+    'Task kinds whose live count has grown for the whole leak detection window.',
+    ('kind',)
+))
+
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+_TRAILING_NUMBER = re.compile(r'-\d+$')
+
+# Task -> (monotonic creation time, creating call site)
+_created: 'weakref.WeakKeyDictionary[asyncio.Task, Tuple[float, str]]' = weakref.WeakKeyDictionary()
+
+
+def task_kind(name: str) -> str:
+    """Kind of a task: its name without a trailing ``-<number>`` ('Task-12' -> 'Task')."""
+    return _TRAILING_NUMBER.sub('', name)
+
+
+def _call_site(depth: int) -> str:
+    """First caller outside asyncio and this module, as 'file:line in function'."""
+    frame = sys._getframe(depth)
+    while frame is not None and (
+        frame.f_code.co_filename.startswith(_ASYNCIO_DIR) or frame.f_code.co_filename == __file__
+    ):
+        frame = frame.f_back
+    if frame is None:
+        return 'unknown'
+    return f'{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}'
+
+
+def _task_factory(loop, coro, **kwargs):
+    # Python 3.13.3+ passes every create_task keyword (name, context, eager_start) to the factory
+    task = asyncio.Task(coro, loop=loop, **kwargs)
+    _created[task] = (time.monotonic(), _call_site(2))
+    return task
+
+
+def install_task_factory(loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    """Record creation time and call site for every task created on ``loop`` from now on."""
+    (loop or asyncio.get_running_loop()).set_task_factory(_task_factory)
+
+
+def spawn(coro: Coroutine, name: str) -> asyncio.Task:
+    """
+    Start a named background task.
+
+    Args:
+        coro: Coroutine to run
+        name: Task name, ``<area>-<what>`` (e.g. 'command-engine')
+
+    Returns:
+        The created task
+    """
+    task = asyncio.create_task(coro, name=name)
+    if task not in _created:
+        _created[task] = (time.monotonic(), _call_site(2))
+    return task
+
+
+def name_current_task(name: str) -> None:
+    """Rename the running task, e.g. a TwitchIO dispatch task once its command is known."""
+    task = asyncio.current_task()
+    if task is not None:
+        task.set_name(name)
+
+
+def _await_point(task: asyncio.Task) -> Optional[str]:
+    """Innermost frame the task is suspended in."""
+    stack = task.get_stack()
+    if not stack:
+        return None
+    frame = stack[-1]
+    return f'{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}'
+
+
+def describe_tasks(loop: Optional[asyncio.AbstractEventLoop] = None) -> List[Dict[str, Any]]:
+    """
+    Live tasks on ``loop`` (default: the running loop), oldest first.
+
+    Safe to call from another thread: ``asyncio.all_tasks`` copies the task
+    set and the rest only reads task state.
+    """
+    now = time.monotonic()
+    described = []
+    for task in asyncio.all_tasks(loop):
+        created = _created.get(task)
+        described.append({
+            'name': task.get_name(),
+            'kind': task_kind(task.get_name()),
+            'age_s': round(now - created[0], 3) if created else None,
+            'created_at': created[1] if created else None,
+            'await_point': _await_point(task),
+        })
+    described.sort(key=lambda t: t['age_s'] if t['age_s'] is not None else -1, reverse=True)
+    return described
+
+
+class TaskLeakDetector:
+    """Samples live task counts by kind and flags kinds that keep growing."""
+
+    def __init__(self, interval: float = 60.0, window: int = 5, min_count: int = 10):
+        """
+        Initialize the detector.
+
+        Args:
+            interval: Seconds between samples
+            window: Consecutive growing samples before a kind is flagged
+            min_count: Ignore kinds with fewer live tasks than this
+        """
+        self._interval = interval
+        self._window = window
+        self._min_count = min_count
+        self._history: Deque[Counter] = deque(maxlen=window + 1)
+        self._suspects: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def suspects(self) -> Dict[str, int]:
+        """Kinds currently suspected of leaking, with their live count."""
+        return dict(self._suspects)
+
+    def start(self) -> None:
+        """Start sampling in the background."""
+        if self._task is None or self._task.done():
+            self._task = spawn(self.run(), name='task-leak-detector')
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def sample(self) -> Counter:
+        """Count live tasks by kind, update the gauges and re-evaluate suspects."""
+        counts = Counter(task_kind(task.get_name()) for task in asyncio.all_tasks())
+        previous = self._history[-1] if self._history else Counter()
+        for kind in previous.keys() - counts.keys():
+            TASKS.labels(kind).set(0)
+        for kind, count in counts.items():
+            TASKS.labels(kind).set(count)
+        self._history.append(counts)
+
+        suspects = {}
+        if len(self._history) == self._history.maxlen:
+            samples = list(self._history)
+            for kind, count in counts.items():
+                series = [s.get(kind, 0) for s in samples]
+                if count >= self._min_count and all(b > a for a, b in zip(series, series[1:])):
+                    suspects[kind] = count
+        for kind in set(self._suspects) - set(suspects):
+            TASK_LEAKS.labels(kind).set(0)
+            logger.info("Task kind %s no longer growing (%d live)", kind, counts.get(kind, 0))
+        for kind, count in suspects.items():
+            TASK_LEAKS.labels(kind).set(1)
+            if kind not in self._suspects:
+                logger.warning("Possible task leak: %d live '%s' tasks, growing for %d samples",
+                               count, kind, self._window)
+        self._suspects = suspects
+        return counts
+
+    async def run(self) -> None:
+        """Sampling loop, started by ``start`` or run under a Supervisor."""
+        while True:
+            self.sample()
+            await asyncio.sleep(self._interval)
@@ -0,0 +1,221 @@
+"""Command lifecycle telemetry pushed to NATS.
+
+Each command emits compact lifecycle events:
+
+- ``received``: the command handler started (``dispatch_ms`` since the chat message was sent)
+- ``queued``: a MIDI request waited for a concurrency slot (``wait_ms``)
+- ``executed``: the command finished with outcome ``ok`` or ``rejected``
+- ``failed``: the command timed out or errored
+
+``executed`` and ``failed`` carry the total ``ms`` and the per-stage latency
+budget. Events are appended to an in-memory batch and a background task
+publishes the batch as one JSON array to ``TELEMETRY_SUBJECT`` every
+``TELEMETRY_INTERVAL`` or as soon as ``TELEMETRY_BATCH_SIZE`` events are
+pending, so emitting never waits on NATS. Commands are sampled by
+correlation ID (all of a command's events are kept or dropped together);
+``failed`` events are always sent.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from config.logging_config import correlation_id_var, get_latency_budget
+from config.settings import settings
+from services.metrics import REGISTRY, Counter
+from services.tasks import spawn
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_DROPPED = REGISTRY.register(Counter(
+    'chat_telemetry_dropped',
+    'Telemetry events dropped because the pending buffer was full or NATS was unavailable.'
+))
+
+_command_var: ContextVar[Optional[str]] = ContextVar('telemetry_command', default=None)
+
+
+class CommandTelemetry:
+    """Batches sampled command lifecycle events and publishes them in the background."""
+
+    def __init__(
+        self,
+        subject: str,
+        interval: float = 1.0,
+        batch_size: int = 50,
+        sample_rate: float = 1.0,
+        max_pending: int = 1000
+    ):
+        """
+        Initialize telemetry.
+
+        Args:
+            subject: NATS subject batches are published to; empty disables telemetry
+            interval: Seconds between publishes of a partial batch
+            batch_size: Pending events that trigger an immediate publish
+            sample_rate: Fraction of commands whose events are sent (failures always are)
+            max_pending: Events kept while NATS is unavailable; the oldest are dropped beyond this
+        """
+        self._subject = subject
+        self._interval = interval
+        self._batch_size = batch_size
+        self._sample_rate = sample_rate
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._max_pending = max_pending
+        self._publisher = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Check if events are collected."""
+        return bool(self._subject) and self._sample_rate > 0
+
+    @property
+    def pending(self) -> int:
+        """Events waiting to be published."""
+        return len(self._pending)
+
+    def start(self, publisher) -> None:
+        """
+        Start publishing in the background.
+
+        Args:
+            publisher: NatsPublisher whose connection carries the batches
+        """
+        self._publisher = publisher
+        if self.enabled and (self._task is None or self._task.done()):
+            self._wakeup = asyncio.Event()
+            self._task = spawn(self._run(), name='telemetry-publish')
+
+    async def stop(self) -> None:
+        """Stop the background task and publish whatever is pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    @contextmanager
+    def command(self, command: str, received_at: Optional[datetime] = None) -> Iterator[None]:
+        """
+        Scope events to ``command`` and emit ``received``.
+
+        Must be entered after the command's correlation ID is set.
+
+        Args:
+            command: Command name
+            received_at: When the chat message was sent, for ``dispatch_ms``
+        """
+        token = _command_var.set(command)
+        try:
+            if received_at is not None:
+                self.emit('received', dispatch_ms=round((time.time() - received_at.timestamp()) * 1000, 1))
+            else:
+                self.emit('received')
+            yield
+        finally:
+            _command_var.reset(token)
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """
+        Queue a lifecycle event for the current command. Never blocks.
+
+        Args:
+            event: 'received', 'queued', 'executed' or 'failed'
+            **fields: Event-specific values (durations in ms)
+        """
+        if not self.enabled:
+            return
+        correlation_id = correlation_id_var.get()
+        if event != 'failed' and not self._sampled(correlation_id):
+            return
+        entry = {
+            'event': event,
+            'command': _command_var.get(),
+            'cid': correlation_id,
+            'ts': int(time.time() * 1000),
+        }
+        entry.update(fields)
+        if len(self._pending) >= self._max_pending:
+            self._pending.popleft()
+            TELEMETRY_DROPPED.inc()
+        self._pending.append(entry)
+        if len(self._pending) >= self._batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def finish(self, outcome: str, seconds: float, failed: bool) -> None:
+        """
+        Emit ``executed`` or ``failed`` with the total duration and time per stage.
+
+        Args:
+            outcome: 'ok', 'rejected', 'timeout' or 'error'
+            seconds: Total command duration
+            failed: Whether the command timed out or errored
+        """
+        if not self.enabled:
+            return
+        stages: Dict[str, float] = {}
+        for stage, spent in get_latency_budget():
+            stages[stage] = stages.get(stage, 0.0) + spent
+        self.emit(
+            'failed' if failed else 'executed',
+            outcome=outcome,
+            ms=round(seconds * 1000, 1),
+            stages={stage: round(spent * 1000, 1) for stage, spent in stages.items()}
+        )
+
+    def _sampled(self, correlation_id: Optional[str]) -> bool:
+        """Keep or drop every event of a command based on its correlation ID."""
+        if self._sample_rate >= 1:
+            return True
+        if not correlation_id:
+            return False
+        try:
+            bucket = int(correlation_id.replace('-', '')[:8], 16) / 0xFFFFFFFF
+        except ValueError:
+            bucket = (hash(correlation_id) & 0xFFFFFFFF) / 0xFFFFFFFF
+        return bucket < self._sample_rate
+
+    async def flush(self) -> None:
+        """Publish pending events in batches of at most ``batch_size``."""
+        client = self._publisher.client if self._publisher is not None else None
+        if not self._pending or client is None or not client.is_connected:
+            return
+        while self._pending:
+            batch: List[Dict[str, Any]] = [
+                self._pending.popleft() for _ in range(min(self._batch_size, len(self._pending)))
+            ]
+            try:
+                await client.publish(self._subject, json.dumps(batch, separators=(',', ':')).encode())
+            except Exception as e:
+                TELEMETRY_DROPPED.inc(len(batch))
+                logger.warning("Dropped %d telemetry events: %s", len(batch), e)
+                return
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+telemetry = CommandTelemetry(
+    settings.telemetry_subject,
+    settings.telemetry_interval,
+    settings.telemetry_batch_size,
+    settings.telemetry_sample_rate,
+    settings.telemetry_max_pending
+)
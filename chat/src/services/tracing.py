@@ -0,0 +1,296 @@
+"""Lightweight span tracing for chat commands.
+
+A command's trace starts at the EventSub message timestamp and records a span
+per stage (dispatch, handler, MIDI auth, MIDI HTTP, overlay publish, reply).
+The trace ID doubles as the correlation ID, and the current span is passed on
+as ``traceparent`` / ``X-Correlation-ID`` headers on MIDI HTTP requests and
+NATS messages so downstream layers join the same trace.
+
+Finished spans are kept in an in-process ring buffer (served on
+``/debug/traces``) and, when ``OTLP_ENDPOINT`` is configured, batched and
+exported as OTLP/JSON over HTTP in the background.
+"""
+
+import asyncio
+import logging
+import random
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+import aiohttp
+
+from config.logging_config import correlation_id_var, get_correlation_id
+from config.settings import settings
+from services.tasks import spawn
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'eightbitsaxlounge-chat'
+
+# OTLP status codes
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+current_span_var: ContextVar[Optional['Span']] = ContextVar('current_span', default=None)
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'start_ns', 'end_ns', 'attributes', 'error')
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, start_ns: Optional[int] = None):
+        self.trace_id = trace_id
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        """Duration in milliseconds, or None while the span is open."""
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace context header value identifying this span."""
+        return f'00-{self.trace_id}-{self.span_id}-01'
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach a key/value to the span."""
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        """Mark the span as failed."""
+        self.error = message
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain representation for the debug endpoint."""
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start_ns / 1e9,
+            'duration_ms': self.duration_ms,
+            'attributes': dict(self.attributes),
+            'error': self.error,
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON representation."""
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            'status': {'code': _STATUS_ERROR, 'message': self.error} if self.error else {'code': _STATUS_OK},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    """Encode an attribute as an OTLP KeyValue."""
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+class RingBufferExporter:
+    """Keeps the most recent finished spans in memory."""
+
+    def __init__(self, capacity: int):
+        self._spans: Deque[Span] = deque(maxlen=capacity)
+
+    def export(self, span: Span) -> None:
+        self._spans.append(span)
+
+    def traces(self, trace_id: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Group buffered spans by trace, most recent trace first.
+
+        Args:
+            trace_id: Only return this trace (accepts a correlation ID too)
+            limit: Maximum number of traces to return
+        """
+        if trace_id:
+            trace_id = trace_id.replace('-', '')
+        grouped: Dict[str, List[Span]] = {}
+        # Copy first: spans are appended by the event loop while the health server thread reads
+        for span in reversed(list(self._spans)):
+            if trace_id and span.trace_id != trace_id:
+                continue
+            if span.trace_id not in grouped:
+                if len(grouped) >= limit:
+                    continue
+                grouped[span.trace_id] = []
+            grouped[span.trace_id].append(span)
+        return [
+            {'trace_id': tid, 'spans': [s.to_dict() for s in sorted(spans, key=lambda s: s.start_ns)]}
+            for tid, spans in grouped.items()
+        ]
+
+
+class OtlpExporter:
+    """Batches finished spans and posts them to an OTLP/HTTP collector in the background."""
+
+    def __init__(self, endpoint: str, interval: float, max_pending: int):
+        self._url = endpoint.rstrip('/') + '/v1/traces'
+        self._interval = interval
+        self._pending: Deque[Span] = deque(maxlen=max_pending)
+        self._task: Optional[asyncio.Task] = None
+
+    def export(self, span: Span) -> None:
+        self._pending.append(span)
+
+    def start(self) -> None:
+        """Start the periodic flush task."""
+        if self._task is None or self._task.done():
+            self._task = spawn(self._run(), name='otlp-export')
+
+    async def stop(self) -> None:
+        """Stop the flush task and send whatever is pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Send all pending spans in one request. Spans are dropped if the collector fails."""
+        if not self._pending:
+            return
+        spans = [self._pending.popleft().to_otlp() for _ in range(len(self._pending))]
+        body = {
+            'resourceSpans': [{
+                'resource': {'attributes': [_otlp_attribute('service.name', SERVICE_NAME)]},
+                'scopeSpans': [{'scope': {'name': 'chat'}, 'spans': spans}],
+            }]
+        }
+        try:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
+                async with session.post(self._url, json=body) as response:
+                    response.raise_for_status()
+        except Exception as e:
+            logger.warning("Failed to export %d spans to %s: %s", len(spans), self._url, e)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            await self.flush()
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporters."""
+
+    def __init__(self, buffer: RingBufferExporter, otlp: Optional[OtlpExporter] = None):
+        self.buffer = buffer
+        self.otlp = otlp
+
+    def _finish(self, span: Span) -> None:
+        if span.end_ns is None:
+            span.end_ns = time.time_ns()
+        self.buffer.export(span)
+        if self.otlp is not None:
+            self.otlp.export(span)
+
+    @contextmanager
+    def start_trace(self, name: str, received_at: Optional[datetime] = None, **attributes) -> Iterator[Span]:
+        """
+        Start a new trace whose ID also becomes the correlation ID.
+
+        Args:
+            name: Root span name (e.g. 'command engine')
+            received_at: When the triggering message was sent; starts the root span
+                and is recorded as a 'dispatch' span up to now
+            **attributes: Attributes for the root span
+        """
+        trace_uuid = uuid.uuid4()
+        start_ns = int(received_at.timestamp() * 1e9) if received_at is not None else None
+        root = Span(name, trace_uuid.hex, start_ns=start_ns)
+        root.attributes.update(attributes)
+
+        correlation_token = correlation_id_var.set(str(trace_uuid))
+        span_token = current_span_var.set(root)
+        try:
+            if start_ns is not None:
+                dispatch = Span('dispatch', root.trace_id, root.span_id, start_ns=start_ns)
+                self._finish(dispatch)
+            yield root
+        except BaseException as e:
+            root.set_error(repr(e))
+            raise
+        finally:
+            current_span_var.reset(span_token)
+            correlation_id_var.reset(correlation_token)
+            self._finish(root)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """
+        Record a child of the current span (or a new trace if there is none).
+
+        Exceptions raised inside the block mark the span as failed.
+        """
+        parent = current_span_var.get()
+        if parent is not None:
+            span = Span(name, parent.trace_id, parent.span_id)
+        else:
+            span = Span(name, uuid.uuid4().hex)
+        span.attributes.update(attributes)
+
+        token = current_span_var.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(repr(e))
+            raise
+        finally:
+            current_span_var.reset(token)
+            self._finish(span)
+
+
+def _create_tracer() -> Tracer:
+    otlp = None
+    if settings.otlp_endpoint:
+        otlp = OtlpExporter(settings.otlp_endpoint, settings.otlp_export_interval, settings.trace_buffer_size)
+    return Tracer(RingBufferExporter(settings.trace_buffer_size), otlp)
+
+
+tracer = _create_tracer()
+
+
+def inject_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """
+    Add ``traceparent`` and ``X-Correlation-ID`` for the current context to ``headers``.
+
+    Returns:
+        The same dictionary, for chaining
+    """
+    span = current_span_var.get()
+    if span is not None:
+        headers['traceparent'] = span.traceparent
+    headers['X-Correlation-ID'] = get_correlation_id()
+    return headers
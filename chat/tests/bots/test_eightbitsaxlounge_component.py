@@ -0,0 +1,290 @@
+"""Tests for EightBitSaxLoungeComponent command execution."""
+
+import asyncio
+import os
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+
+os.environ.setdefault('TWITCH_BOT_ID', '1424580736')
+os.environ.setdefault('TWITCH_OWNER_ID', '896950964')
+os.environ.setdefault('TWITCH_CLIENT_SECRET', 'test_midi_secret')
+
+from bots.twitch.eightbitsaxlounge_component import RESTARTING_MESSAGE, EightBitSaxLoungeComponent
+from commands.handlers.errors import CommandError
+from config.settings import settings
+from services.metrics import COMMAND_LATENCY
+from services.tracing import tracer
+
+
+@pytest.fixture
+def registry():
+    registry = Mock()
+    registry.execute_command = AsyncMock(return_value='🎵 Engine set to \'room\' mode! 🎵')
+    registry.optimistic_response = Mock(return_value='🎵 Engine set to \'room\' mode! 🎵')
+    return registry
+
+
+@pytest.fixture
+def component(registry):
+    with patch('bots.twitch.eightbitsaxlounge_component.CommandRegistry', return_value=registry):
+        comp = EightBitSaxLoungeComponent()
+        comp._ensure_services = AsyncMock()
+        comp._nats = Mock()
+        comp._nats.publish = AsyncMock()
+        comp._effect_state = Mock()
+        comp._effect_state.put = AsyncMock()
+        yield comp
+
+
+@pytest.fixture
+def ctx():
+    ctx = Mock()
+    ctx.send = AsyncMock()
+    ctx.author = Mock()
+    ctx.author.name = 'tester'
+    return ctx
+
+
+@pytest.mark.asyncio
+async def test_success_publishes_overlay_after_reply(component, registry, ctx):
+    await component._execute_command('engine', ['room'], ctx)
+
+    ctx.send.assert_awaited_once_with("🎵 Engine set to 'room' mode! 🎵")
+    component._nats.publish.assert_awaited_once_with('overlay.engine', 'room')
+    component._effect_state.put.assert_awaited_once_with('engine', 'room')
+
+
+@pytest.mark.asyncio
+async def test_command_error_skips_overlay(component, registry, ctx):
+    registry.execute_command.side_effect = CommandError('❌ nope')
+
+    await component._execute_command('engine', ['room'], ctx)
+
+    ctx.send.assert_awaited_once_with('❌ nope')
+    component._nats.publish.assert_not_awaited()
+    component._effect_state.put.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_draining_refuses_new_commands(component, registry, ctx):
+    await component._services.in_flight.drain(1)
+
+    await component._execute_command('engine', ['room'], ctx)
+
+    registry.execute_command.assert_not_awaited()
+    ctx.send.assert_awaited_once_with(RESTARTING_MESSAGE)
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_flight_command(component, registry, ctx):
+    release = asyncio.Event()
+
+    async def slow(*args):
+        await release.wait()
+        return '🎵 done'
+    registry.execute_command.side_effect = slow
+
+    command = asyncio.create_task(component._execute_command('engine', ['room'], ctx))
+    await asyncio.sleep(0)
+    assert component._services.in_flight.count == 1
+
+    drain = asyncio.create_task(component._services.in_flight.drain(1))
+    await asyncio.sleep(0)
+    assert not drain.done()
+    release.set()
+
+    assert await drain == (1, 0)
+    await command
+    ctx.send.assert_awaited_once_with('🎵 done')
+    component._nats.publish.assert_awaited_once_with('overlay.engine', 'room')
+
+
+@pytest.mark.asyncio
+async def test_drain_deadline_cancels_and_notifies(component, registry, ctx):
+    async def hangs(*args):
+        await asyncio.sleep(10)
+    registry.execute_command.side_effect = hangs
+    cancelled = COMMAND_LATENCY.labels('engine', 'cancelled')
+    before = sum(cancelled.counts)
+
+    command = asyncio.create_task(component._execute_command('engine', ['room'], ctx))
+    await asyncio.sleep(0)
+
+    assert await component._services.in_flight.drain(0.01) == (0, 1)
+    assert command.cancelled()
+    ctx.send.assert_awaited_once_with(RESTARTING_MESSAGE)
+    assert sum(cancelled.counts) == before + 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_exceeded_replies_with_timeout(component, registry, ctx, monkeypatch):
+    monkeypatch.setattr(settings, 'command_deadline', 0.01)
+
+    async def slow(*args):
+        await asyncio.sleep(1)
+    registry.execute_command.side_effect = slow
+
+    await component._execute_command('engine', ['room'], ctx)
+
+    ctx.send.assert_awaited_once_with('⏱️ Your command timed out. Please try again.')
+    component._nats.publish.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_command_latency_recorded_by_outcome(component, registry, ctx):
+    ok = COMMAND_LATENCY.labels('engine', 'ok')
+    rejected = COMMAND_LATENCY.labels('engine', 'rejected')
+    ok_before, rejected_before = sum(ok.counts), sum(rejected.counts)
+
+    await component._execute_command('engine', ['room'], ctx)
+    registry.execute_command.side_effect = CommandError('❌ nope')
+    await component._execute_command('engine', ['bogus'], ctx)
+
+    assert sum(ok.counts) == ok_before + 1
+    assert sum(rejected.counts) == rejected_before + 1
+
+
+@pytest.mark.asyncio
+async def test_command_is_traced_from_message_timestamp(component, registry, ctx):
+    from datetime import datetime, timezone
+    ctx.message.timestamp = datetime.now(timezone.utc)
+
+    await component._execute_command('engine', ['room'], ctx)
+
+    trace = tracer.buffer.traces(limit=1)[0]
+    names = [span['name'] for span in trace['spans']]
+    assert names[:2] == ['command engine', 'dispatch']
+    assert 'handler' in names and 'reply' in names
+    root = trace['spans'][0]
+    assert root['attributes']['outcome'] == 'ok'
+
+
+@pytest.mark.asyncio
+async def test_failed_command_releases_sampled_logs(component, registry, ctx):
+    registry.execute_command.side_effect = RuntimeError('MIDI down')
+
+    with patch('bots.twitch.eightbitsaxlounge_component.finish_command_logs') as finish:
+        await component._execute_command('engine', ['room'], ctx)
+        registry.execute_command.side_effect = CommandError('❌ nope')
+        await component._execute_command('engine', ['bogus'], ctx)
+
+    assert [c.kwargs['failed'] for c in finish.call_args_list] == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_runs_player_and_registry_commands(component, registry, ctx):
+    await component.dispatch('player', ['abc'], ctx)
+    await component.dispatch('engine', ['room'], ctx)
+
+    assert component._nats.publish.await_args_list[0].args == ('overlay.player', 'ABC')
+    registry.execute_command.assert_awaited_once_with('engine', ['room'], ctx)
+
+
+@pytest.mark.asyncio
+async def test_dispatch_with_bridge_forwards_instead_of_running(registry, ctx):
+    bridge = Mock()
+    bridge.submit = AsyncMock()
+    with patch('bots.twitch.eightbitsaxlounge_component.CommandRegistry', return_value=registry):
+        component = EightBitSaxLoungeComponent(bridge=bridge)
+
+    await component.dispatch('engine', ['room'], ctx)
+    await component._ensure_services()
+
+    bridge.submit.assert_awaited_once_with('engine', ['room'], ctx)
+    registry.execute_command.assert_not_awaited()
+    assert component._services._task is None
+
+
+class TestOptimisticOverlay:
+    """Optimistic mode publishes and replies before the MIDI call completes."""
+
+    @pytest.fixture(autouse=True)
+    def optimistic(self, monkeypatch):
+        monkeypatch.setattr(settings, 'optimistic_overlay', True)
+
+    @pytest.mark.asyncio
+    async def test_publishes_and_replies_before_midi_completes(self, component, registry, ctx):
+        order = []
+        component._nats.publish.side_effect = lambda *a: order.append('overlay')
+        ctx.send.side_effect = lambda *a: order.append('reply')
+
+        async def execute(*args):
+            await asyncio.sleep(0.01)
+            order.append('midi-done')
+            return 'ignored'
+        registry.execute_command.side_effect = execute
+
+        await component._execute_command('engine', ['room'], ctx)
+
+        assert order.index('overlay') < order.index('midi-done')
+        assert order.index('reply') < order.index('midi-done')
+        ctx.send.assert_awaited_once_with("🎵 Engine set to 'room' mode! 🎵")
+        component._effect_state.put.assert_awaited_once_with('engine', 'room')
+
+    @pytest.mark.asyncio
+    async def test_invalid_input_never_reaches_overlay(self, component, registry, ctx):
+        registry.optimistic_response.side_effect = CommandError('❌ Invalid engine type')
+
+        await component._execute_command('engine', ['bogus'], ctx)
+
+        ctx.send.assert_awaited_once_with('❌ Invalid engine type')
+        component._nats.publish.assert_not_awaited()
+        registry.execute_command.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failure_restores_cached_value(self, component, registry, ctx):
+        component._state_cache.update('engine', 'hall')
+        registry.execute_command.side_effect = CommandError('❌ Failed to set engine')
+
+        await component._execute_command('engine', ['room'], ctx)
+
+        assert component._nats.publish.await_args_list[0].args == ('overlay.engine', 'room')
+        assert component._nats.publish.await_args_list[1].args == ('overlay.engine', 'hall')
+        ctx.send.assert_awaited_with('❌ Failed to set engine')
+        component._effect_state.put.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failure_without_cached_value_does_not_restore(self, component, registry, ctx):
+        registry.execute_command.side_effect = CommandError('❌ Failed to set engine')
+
+        await component._execute_command('engine', ['room'], ctx)
+
+        component._nats.publish.assert_awaited_once_with('overlay.engine', 'room')
+
+    @pytest.mark.asyncio
+    async def test_command_without_optimistic_reply_replies_with_result(self, component, registry, ctx):
+        registry.optimistic_response.return_value = None
+        registry.execute_command.return_value = 'done'
+
+        await component._execute_command('time', ['5'], ctx)
+
+        component._nats.publish.assert_awaited_once_with('overlay.time', '5')
+        ctx.send.assert_awaited_once_with('done')
+
+    @pytest.mark.asyncio
+    async def test_failed_reply_still_sees_midi_call_through(self, component, registry, ctx):
+        ctx.send.side_effect = [ConnectionError('chat unavailable'), None]
+
+        async def execute(*args):
+            await asyncio.sleep(0.01)
+            return 'ignored'
+        registry.execute_command.side_effect = execute
+
+        await component._execute_command('engine', ['room'], ctx)
+
+        registry.execute_command.assert_awaited_once()
+        component._nats.publish.assert_awaited_once_with('overlay.engine', 'room')
+        component._effect_state.put.assert_awaited_once_with('engine', 'room')
+        ctx.send.assert_awaited_with('❌ An error occurred while processing your command.')
+
+    @pytest.mark.asyncio
+    async def test_failed_reply_and_midi_call_restore_cached_value(self, component, registry, ctx):
+        component._state_cache.update('engine', 'hall')
+        ctx.send.side_effect = [ConnectionError('chat unavailable'), None]
+        registry.execute_command.side_effect = CommandError('❌ Failed to set engine')
+
+        await component._execute_command('engine', ['room'], ctx)
+
+        assert component._nats.publish.await_args_list[-1].args == ('overlay.engine', 'hall')
+        component._effect_state.put.assert_not_awaited()
+        ctx.send.assert_awaited_with('❌ Failed to set engine')
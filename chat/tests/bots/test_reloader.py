@@ -0,0 +1,99 @@
+"""Tests for the command hot reload."""
+
+import json
+import os
+import sys
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+os.environ.setdefault('TWITCH_BOT_ID', '1424580736')
+os.environ.setdefault('TWITCH_OWNER_ID', '896950964')
+os.environ.setdefault('TWITCH_CLIENT_SECRET', 'test_midi_secret')
+
+from bots.twitch.eightbitsaxlounge_component import EightBitSaxLoungeComponent
+from bots.twitch.reloader import COMPONENT_MODULE, RELOADS, CommandReloader
+from config.settings import settings
+from services.container import ServiceContainer
+
+
+@pytest.fixture
+def catalog_file(tmp_path, monkeypatch):
+    """A command catalog file in place of the ConfigMap volume; the catalog is restored afterwards."""
+    path = tmp_path / 'catalog.json'
+    path.write_text(json.dumps({'valid_engines': ['Room', 'Cave'], 'help_topics': ['engine', 'cave']}))
+    monkeypatch.setenv('COMMAND_CATALOG_FILE', str(path))
+    running = {'valid_engines': settings.valid_engines, 'help_topics': settings.help_topics}
+    yield path
+    settings.apply_catalog(running)
+
+
+class TestCommandReloader:
+    """Test cases for CommandReloader."""
+
+    @pytest.mark.asyncio
+    async def test_reload_installs_component_built_from_fresh_modules(self, catalog_file):
+        services = ServiceContainer()
+        install = AsyncMock()
+        ok = RELOADS.labels('ok')
+        before = ok.value
+
+        assert await CommandReloader(install, services=services).reload()
+
+        component = install.await_args.args[0]
+        reloaded = sys.modules[COMPONENT_MODULE].EightBitSaxLoungeComponent
+        assert type(component) is reloaded and reloaded is not EightBitSaxLoungeComponent
+        assert component._services is services
+        assert settings.engine_names == {'room': 'Room', 'cave': 'Cave'}
+        assert settings.help_topics == ['engine', 'cave']
+        assert ok.value == before + 1
+
+    @pytest.mark.asyncio
+    async def test_failed_install_keeps_running_commands_and_catalog(self, catalog_file):
+        install = AsyncMock(side_effect=RuntimeError('component failed to load'))
+        engines = dict(settings.engine_names)
+        error = RELOADS.labels('error')
+        before = error.value
+
+        assert not await CommandReloader(install, services=ServiceContainer()).reload()
+
+        assert settings.engine_names == engines
+        assert error.value == before + 1
+
+    @pytest.mark.asyncio
+    async def test_invalid_catalog_file_is_not_applied(self, catalog_file):
+        catalog_file.write_text('{"valid_engines": "Room"}')
+        install = AsyncMock()
+        engines = dict(settings.engine_names)
+
+        assert not await CommandReloader(install, services=ServiceContainer()).reload()
+
+        install.assert_not_awaited()
+        assert settings.engine_names == engines
+
+    @pytest.mark.asyncio
+    async def test_module_that_fails_to_import_is_not_installed(self):
+        install = AsyncMock()
+
+        with patch('bots.twitch.reloader.importlib.reload', side_effect=SyntaxError('invalid syntax')):
+            assert not await CommandReloader(install, services=ServiceContainer()).reload()
+
+        install.assert_not_awaited()
+
+
+class TestReloadCommand:
+    """Test cases for !reload."""
+
+    @pytest.mark.asyncio
+    async def test_reload_replies_with_outcome(self):
+        component = EightBitSaxLoungeComponent()
+        ctx = Mock()
+        ctx.send = AsyncMock()
+        ctx.bot.reload_commands = AsyncMock(side_effect=[True, False])
+
+        await component.reload._callback(component, ctx)
+        await component.reload._callback(component, ctx)
+
+        assert [c.args[0] for c in ctx.send.await_args_list] == [
+            "🔄 Commands reloaded.",
+            "❌ Reload failed, the previous commands are still active.",
+        ]
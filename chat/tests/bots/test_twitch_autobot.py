@@ -71,6 +71,7 @@ async def test_component_engine_calls_registry(autobot):
 
     with patch('bots.twitch.eightbitsaxlounge_component.CommandRegistry', return_value=mock_registry):
         comp = EightBitSaxLoungeComponent(bot=Mock())
+        comp._ensure_services = AsyncMock()
         ctx = Mock()
         ctx.send = AsyncMock()
         ctx.author = Mock()
@@ -99,3 +100,32 @@ async def test_event_oauth_authorized_ignores_bot_channel(autobot):
 
     autobot._add_token.assert_awaited()
     autobot.multi_subscribe.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_replace_component_swaps_without_reconnecting(autobot):
+    old, new = Mock(__component_name__='old'), Mock(__component_name__='new')
+    autobot.component = old
+    autobot.remove_component = AsyncMock()
+    autobot.add_component = AsyncMock()
+
+    await autobot.replace_component(new)
+
+    autobot.remove_component.assert_awaited_once_with('old')
+    autobot.add_component.assert_awaited_once_with(new)
+    assert autobot.component is new
+    autobot.twitchio.close.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_replace_component_restores_previous_on_failure(autobot):
+    old, new = Mock(__component_name__='old'), Mock(__component_name__='new')
+    autobot.component = old
+    autobot.remove_component = AsyncMock()
+    autobot.add_component = AsyncMock(side_effect=[RuntimeError('load failed'), None])
+
+    with pytest.raises(RuntimeError):
+        await autobot.replace_component(new)
+
+    assert autobot.add_component.await_args_list[-1].args == (old,)
+    assert autobot.component is old
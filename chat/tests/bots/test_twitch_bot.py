@@ -44,4 +44,29 @@ async def test_start_and_shutdown_no_errors(basic_bot):
     basic_bot.shutdown = AsyncMock()
 
     await basic_bot.start()
-    await basic_bot.shutdown()
\ No newline at end of file
+    await basic_bot.shutdown()
+
+
+def test_not_ready_before_twitch_login(basic_bot):
+    assert basic_bot.is_ready() is False
+
+
+@pytest.mark.asyncio
+async def test_check_twitch_requires_bot_token(basic_bot):
+    from bots.twitch.bot import BOT_ID
+    basic_bot._bot = Mock(ready=True, tokens={})
+
+    assert basic_bot.is_ready() is True
+    with pytest.raises(PermissionError):
+        await basic_bot.check_twitch()
+
+    basic_bot._bot.tokens = {str(BOT_ID): Mock()}
+    await basic_bot.check_twitch()
+
+
+@pytest.mark.asyncio
+async def test_check_nats_delegates_to_services(basic_bot):
+    basic_bot.services.nats.ping = AsyncMock(side_effect=ConnectionError('NATS not connected'))
+
+    with pytest.raises(ConnectionError):
+        await basic_bot.check_nats()
@@ -73,3 +73,20 @@ class TestCommandRegistry:
         assert "engine" in commands
         assert commands["engine"] is not None
         assert "engine" in commands["engine"].lower()
+
+    def test_optimistic_response_validates_and_returns_reply(self, command_registry):
+        """Optimistic replies come from the handler without calling the MIDI API."""
+        response = command_registry.optimistic_response("dial1", ["5"])
+
+        assert response == "🎵 Dial1 set to 5! 🎵"
+        command_registry._midi_client.set_effect.assert_not_called()
+
+    def test_optimistic_response_rejects_invalid_args(self, command_registry):
+        """Invalid arguments raise CommandError before anything is published."""
+        from commands.handlers.errors import CommandError
+        with pytest.raises(CommandError, match="Invalid engine type"):
+            command_registry.optimistic_response("engine", ["bogus"])
+
+    def test_optimistic_response_unsupported_command(self, command_registry):
+        """Commands whose reply depends on the result return None."""
+        assert command_registry.optimistic_response("help", []) is None
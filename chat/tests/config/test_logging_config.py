@@ -0,0 +1,325 @@
+"""Tests for logging configuration helpers."""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import pytest
+
+from config.logging_config import (
+    CHAT_LOGGERS,
+    ChatLogFilter,
+    ChatQueueHandler,
+    ChatTextFormatter,
+    FlightRecorder,
+    JsonFormatter,
+    LogSampler,
+    configure_logging,
+    finish_command_logs,
+    get_flight_recorder,
+    shutdown_logging,
+    correlation_id_var,
+    deadline_scope,
+    format_latency_budget,
+    get_latency_budget,
+    get_remaining_time,
+    record_stage,
+    within_deadline,
+)
+
+
+class TestDeadline:
+    """Test cases for per-command deadline propagation."""
+
+    def test_no_deadline_outside_scope(self):
+        assert get_remaining_time() is None
+        record_stage('ignored', 1.0)
+        assert get_latency_budget() == []
+
+    def test_scope_sets_and_resets_deadline(self):
+        with deadline_scope(5):
+            remaining = get_remaining_time()
+            assert 4.9 < remaining <= 5
+        assert get_remaining_time() is None
+
+    @pytest.mark.asyncio
+    async def test_within_deadline_records_stage(self):
+        with deadline_scope(5):
+            result = await within_deadline('midi_http', asyncio.sleep(0, result='ok'))
+            budget = get_latency_budget()
+
+        assert result == 'ok'
+        assert [stage for stage, _ in budget] == ['midi_http']
+
+    @pytest.mark.asyncio
+    async def test_within_deadline_without_scope_is_unbounded(self):
+        assert await within_deadline('reply', asyncio.sleep(0.01, result=1)) == 1
+
+    @pytest.mark.asyncio
+    async def test_within_deadline_cancels_leftover_work(self):
+        cancelled = asyncio.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with deadline_scope(0.01):
+            with pytest.raises(asyncio.TimeoutError):
+                await within_deadline('handler', slow())
+
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_expired_deadline_fails_fast(self):
+        with deadline_scope(0):
+            coro = asyncio.sleep(10)
+            with pytest.raises(asyncio.TimeoutError, match="before reply"):
+                await within_deadline('reply', coro)
+
+    @pytest.mark.asyncio
+    async def test_child_tasks_share_budget(self):
+        with deadline_scope(5):
+            await asyncio.create_task(within_deadline('nats_publish', asyncio.sleep(0)))
+            assert [stage for stage, _ in get_latency_budget()] == ['nats_publish']
+
+    def test_format_latency_budget(self):
+        with deadline_scope(10):
+            record_stage('handler', 0.120)
+            record_stage('reply', 0.040)
+            formatted = format_latency_budget(10)
+
+        assert formatted.startswith('handler=120ms reply=40ms (')
+        assert formatted.endswith('of 10000ms)')
+
+
+def make_record(msg='chat from %s', args=('viewer',), level=logging.INFO, **extra):
+    record = logging.LogRecord('bots.twitch', level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+class TestStructuredLogging:
+    """Test cases for the queue-based logging pipeline."""
+
+    def test_filter_stamps_correlation_id_at_log_time(self):
+        record = make_record()
+        token = correlation_id_var.set('abc')
+        try:
+            ChatLogFilter().filter(record)
+        finally:
+            correlation_id_var.reset(token)
+
+        assert record.correlation_id == 'abc'
+        assert record.msg == 'chat from %s'
+
+    def test_queue_handler_merges_args_only(self):
+        record = make_record(args=(['viewer'],))
+
+        prepared = ChatQueueHandler(None).prepare(record)
+
+        assert prepared.msg == "chat from ['viewer']"
+        assert prepared.args is None
+        assert prepared.levelname == 'INFO'
+
+    def test_text_format(self):
+        line = ChatTextFormatter().format(make_record(correlation_id='abc'))
+
+        assert line.endswith(' [Information] [chat] chat from viewer correlationID=abc')
+
+    def test_text_format_without_correlation_id(self):
+        line = ChatTextFormatter().format(make_record(level=logging.WARNING, correlation_id=None))
+
+        assert line.endswith(' [Warning] [chat] chat from viewer')
+
+    def test_json_format(self):
+        entry = json.loads(JsonFormatter().format(make_record(correlation_id='abc', command='engine')))
+
+        assert entry['level'] == 'info'
+        assert entry['logger'] == 'bots.twitch'
+        assert entry['message'] == 'chat from viewer'
+        assert entry['correlation_id'] == 'abc'
+        assert entry['command'] == 'engine'
+        assert entry['time'].endswith('Z')
+
+    def test_json_format_includes_exception(self):
+        try:
+            raise ValueError('bad')
+        except ValueError:
+            record = make_record()
+            record.exc_info = __import__('sys').exc_info()
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert 'ValueError: bad' in entry['exception']
+
+    def test_records_written_by_listener_thread(self, restore_root_logger, capsys):
+        threads = []
+        listener = configure_logging('INFO', 'json')
+        original_handle = listener.handlers[0].handle
+        listener.handlers[0].handle = lambda record: threads.append(threading.current_thread()) or original_handle(record)
+
+        token = correlation_id_var.set('abc')
+        try:
+            logging.getLogger('bench').info('chat from %s', 'viewer')
+            logging.getLogger('bench').debug('dropped')
+        finally:
+            correlation_id_var.reset(token)
+        shutdown_logging()
+
+        lines = capsys.readouterr().err.splitlines()
+        assert [json.loads(line)['message'] for line in lines] == ['chat from viewer']
+        assert json.loads(lines[0])['correlation_id'] == 'abc'
+        assert threads and threads[0] is not threading.main_thread()
+
+
+class TestLogSampler:
+    """Test cases for rate-limited log sampling."""
+
+    @pytest.fixture
+    def emitted(self):
+        return []
+
+    @pytest.fixture
+    def sampler(self, emitted):
+        return LogSampler(emitted.append, interval=60, event_limit=2, logger_limit=5)
+
+    def test_first_records_of_event_pass(self, sampler):
+        passed = [sampler.filter(make_record()) for _ in range(4)]
+
+        assert passed == [True, True, False, False]
+
+    def test_events_sampled_independently(self, sampler):
+        for _ in range(3):
+            sampler.filter(make_record())
+
+        assert sampler.filter(make_record(msg='Executing !%s')) is True
+
+    def test_logger_limit_applies_across_events(self, sampler):
+        passed = [sampler.filter(make_record(msg=f'event {i}')) for i in range(6)]
+
+        assert passed == [True] * 5 + [False]
+
+    def test_errors_always_pass(self, sampler):
+        passed = [sampler.filter(make_record(level=logging.ERROR)) for _ in range(10)]
+
+        assert all(passed)
+
+    def test_summary_emitted_when_window_ends(self, sampler, emitted, monkeypatch):
+        for _ in range(5):
+            sampler.filter(make_record())
+        later = time.monotonic() + 61
+        monkeypatch.setattr(time, 'monotonic', lambda: later)
+
+        assert sampler.filter(make_record()) is True
+
+        [summary] = emitted
+        assert summary.sampled_out == 3
+        assert summary.getMessage() == "Sampled out 3 of 5 records like 'chat from %s' in the last 60s"
+        assert summary.name == 'bots.twitch'
+
+    def test_failed_command_records_released(self, sampler, emitted):
+        for _ in range(4):
+            sampler.filter(make_record(correlation_id='failed'))
+
+        sampler.finish_command('failed', failed=True)
+
+        assert len(emitted) == 2
+        assert all(record.sampling_exempt for record in emitted)
+        assert sampler.filter(emitted[0]) is True
+
+    def test_successful_command_records_dropped(self, sampler, emitted):
+        for _ in range(4):
+            sampler.filter(make_record(correlation_id='ok'))
+
+        sampler.finish_command('ok', failed=False)
+        sampler.finish_command('ok', failed=True)
+
+        assert emitted == []
+
+
+class TestFlightRecorder:
+    """Test cases for the in-memory DEBUG flight recorder."""
+
+    @pytest.fixture
+    def emitted(self):
+        return []
+
+    @pytest.fixture
+    def recorder(self, emitted):
+        return FlightRecorder(5, emitted.append, logging.INFO)
+
+    def test_records_without_formatting(self, recorder):
+        args = (['value'],)
+        record = make_record(msg='payload %s', args=args, level=logging.DEBUG)
+
+        recorder.handle(record)
+
+        [stored] = recorder.records()
+        assert stored.msg == 'payload %s'
+        assert stored.args is args
+        assert stored.correlation_id is None
+
+    def test_ring_buffer_keeps_most_recent(self, recorder):
+        for i in range(8):
+            recorder.handle(make_record(msg=f'record {i}', args=None, level=logging.DEBUG))
+
+        assert [r.msg for r in recorder.records()] == [f'record {i}' for i in range(3, 8)]
+
+    def test_records_filtered_by_correlation_id(self, recorder):
+        recorder.handle(make_record(level=logging.DEBUG, correlation_id='a'))
+        recorder.handle(make_record(level=logging.DEBUG, correlation_id='b'))
+
+        assert [r.correlation_id for r in recorder.records('a')] == ['a']
+
+    def test_error_dumps_hidden_records_for_its_command(self, recorder, emitted):
+        recorder.handle(make_record(msg='midi request', args=None, level=logging.DEBUG, correlation_id='a'))
+        recorder.handle(make_record(msg='other command', args=None, level=logging.DEBUG, correlation_id='b'))
+        recorder.handle(make_record(msg='already written', args=None, level=logging.INFO, correlation_id='a'))
+        recorder.handle(make_record(msg='failed', args=None, level=logging.ERROR, correlation_id='a'))
+
+        header, record = emitted
+        assert header.getMessage() == 'Flight recorder: 1 debug records leading up to the failure follow'
+        assert header.correlation_id == 'a'
+        assert record.msg == 'midi request'
+        assert record.sampling_exempt is True
+
+    def test_dumped_once_per_correlation_id(self, recorder, emitted):
+        recorder.handle(make_record(level=logging.DEBUG, correlation_id='a'))
+
+        assert recorder.dump('a') == 1
+        assert recorder.dump('a') == 0
+        assert len(emitted) == 2
+
+    def test_configure_logging_records_chat_debug_at_info(self, restore_root_logger, capsys):
+        configure_logging('INFO', flight_recorder_size=10)
+        recorder = get_flight_recorder()
+        try:
+            token = correlation_id_var.set('cmd')
+            try:
+                logging.getLogger('services.midi_client').debug('MIDI POST %s', 'api/engine')
+                finish_command_logs(failed=True)
+            finally:
+                correlation_id_var.reset(token)
+            shutdown_logging()
+        finally:
+            for name in CHAT_LOGGERS:
+                logging.getLogger(name).setLevel(logging.NOTSET)
+
+        [record] = recorder.records('cmd')
+        assert record.levelno == logging.DEBUG
+        lines = capsys.readouterr().err.splitlines()
+        assert '[Warning] [chat] Flight recorder: 1 debug records' in lines[0]
+        assert lines[1].endswith('[Debug] [chat] MIDI POST api/engine correlationID=cmd')
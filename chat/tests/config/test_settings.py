@@ -51,3 +51,54 @@ class TestSettings:
         # Should raise validation error when required field is missing
         with pytest.raises(ValidationError):
             TestConfig()
+
+    def test_low_footprint_shrinks_buffers_not_set_explicitly(self, monkeypatch):
+        """Test LOW_FOOTPRINT applies its defaults without overriding explicit values."""
+        from config.settings import LOW_FOOTPRINT_DEFAULTS, Settings
+
+        monkeypatch.setenv("LOW_FOOTPRINT", "true")
+        monkeypatch.setenv("FLIGHT_RECORDER_SIZE", "500")
+
+        config = Settings(_env_file=None)
+
+        assert config.flight_recorder_size == 500
+        assert config.trace_buffer_size == LOW_FOOTPRINT_DEFAULTS['trace_buffer_size']
+        assert config.memory_budget_mb == LOW_FOOTPRINT_DEFAULTS['memory_budget_mb']
+
+    def test_default_mode_has_no_memory_budget(self):
+        """Test the buffers keep their sizes and no budget is set by default."""
+        from config.settings import Settings
+
+        config = Settings(_env_file=None)
+
+        assert not config.low_footprint
+        assert config.memory_budget_mb == 0
+        assert config.trace_buffer_size == 2048
+
+    def test_engine_names_are_shared(self):
+        """Test the lowercase engine map is built once per settings instance."""
+        from config.settings import Settings
+
+        config = Settings(_env_file=None)
+
+        assert config.engine_names['room'] == 'Room'
+        assert config.engine_names is config.engine_names
+
+    def test_command_catalog_file_wins_over_environment(self, monkeypatch, tmp_path):
+        """Test the catalog file is applied over the environment and re-read by read_catalog."""
+        from config.settings import Settings
+
+        catalog = tmp_path / 'catalog.json'
+        catalog.write_text('{"valid_engines": ["Room", "Cave"]}')
+        monkeypatch.setenv('VALID_ENGINES', '["Hall"]')
+        monkeypatch.setenv('COMMAND_CATALOG_FILE', str(catalog))
+        config = Settings(_env_file=None)
+        assert config.valid_engines == ['Room', 'Cave']
+
+        catalog.write_text('{"valid_engines": ["Plate"], "help_topics": ["plate"]}')
+        fresh = config.read_catalog()
+        assert config.engine_names == {'room': 'Room', 'cave': 'Cave'}
+
+        config.apply_catalog(fresh)
+        assert config.engine_names == {'plate': 'Plate'}
+        assert config.help_topics == ['plate']
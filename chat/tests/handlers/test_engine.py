@@ -156,3 +156,55 @@ class TestEngineHandler:
             selection="Room"
         )
 
+
+class TestEngineHandlerStateCache:
+    """Test cases for EngineHandler backed by a DeviceStateCache."""
+
+    @pytest.fixture
+    def state_cache(self):
+        from services.state_cache import DeviceStateCache
+        return DeviceStateCache()
+
+    @pytest.fixture
+    def engine_handler(self, mock_midi_client, state_cache):
+        return EngineHandler(mock_midi_client, state_cache=state_cache)
+
+    @pytest.fixture
+    def confirm_timeout(self, monkeypatch):
+        from config.settings import settings
+        monkeypatch.setattr(settings, 'midi_state_confirm_timeout', 0.05)
+
+    @pytest.mark.asyncio
+    async def test_no_args_reports_current_engine(self, engine_handler, state_cache, mock_twitch_context):
+        """Usage message includes the cached engine without calling the MIDI API."""
+        state_cache.update('engine', 'Hall')
+        with pytest.raises(CommandError, match="Current engine: hall. Usage:"):
+            await engine_handler.handle([], mock_twitch_context)
+
+    @pytest.mark.asyncio
+    async def test_confirmed_change(self, engine_handler, state_cache, mock_twitch_context, mock_midi_client, confirm_timeout):
+        """A matching midi.* update confirms the change."""
+        async def set_effect(**kwargs):
+            state_cache.update('engine', 'Room')
+        mock_midi_client.set_effect = AsyncMock(side_effect=set_effect)
+
+        response = await engine_handler.handle(["room"], mock_twitch_context)
+
+        assert "Engine set to 'room' mode!" in response
+
+    @pytest.mark.asyncio
+    async def test_overridden_change(self, engine_handler, state_cache, mock_twitch_context, mock_midi_client, confirm_timeout):
+        """A different midi.* value means another client overrode the change."""
+        async def set_effect(**kwargs):
+            state_cache.update('engine', 'Plate')
+        mock_midi_client.set_effect = AsyncMock(side_effect=set_effect)
+
+        with pytest.raises(CommandError, match="overridden, device is on 'plate'"):
+            await engine_handler.handle(["room"], mock_twitch_context)
+
+    @pytest.mark.asyncio
+    async def test_unconfirmed_change_still_succeeds(self, engine_handler, mock_twitch_context, confirm_timeout):
+        """No confirmation within the timeout falls back to the HTTP result."""
+        response = await engine_handler.handle(["room"], mock_twitch_context)
+
+        assert "Engine set to 'room' mode!" in response
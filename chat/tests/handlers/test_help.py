@@ -2,7 +2,8 @@
 
 import pytest
 from unittest.mock import AsyncMock
-from commands.handlers.help import HelpHandler, HELP_TOPICS
+from commands.handlers.help import HelpHandler
+from config.settings import settings
 
 
 @pytest.fixture
@@ -64,7 +65,7 @@ class TestHelpHandler:
     async def test_unknown_topic_lists_valid_topics(self, help_handler, mock_publisher, mock_twitch_context):
         """Error response includes the list of valid topics."""
         response = await help_handler.handle(['bad'], mock_twitch_context)
-        for topic in HELP_TOPICS:
+        for topic in settings.help_topics:
             assert topic in response
 
     @pytest.mark.asyncio
@@ -75,6 +76,6 @@ class TestHelpHandler:
 
     @pytest.mark.asyncio
     async def test_help_topics_contains_expected_values(self, help_handler, mock_twitch_context):
-        """Sanity-check that HELP_TOPICS includes the initial set."""
-        assert 'engine' in HELP_TOPICS
-        assert 'lofi' in HELP_TOPICS
+        """Sanity-check that the help topics include the initial set."""
+        assert 'engine' in settings.help_topics
+        assert 'lofi' in settings.help_topics
@@ -180,3 +180,57 @@ class TestValueHandler:
         description = value_handler.description
         assert "time" in description.lower()
         assert "0-10" in description
+
+
+class TestValueHandlerStateCache:
+    """Tests for ValueHandler backed by a DeviceStateCache."""
+
+    @pytest.fixture
+    def state_cache(self):
+        from services.state_cache import DeviceStateCache
+        return DeviceStateCache()
+
+    @pytest.fixture
+    def mock_midi_client(self):
+        client = MagicMock(spec=MidiClient)
+        client.set_effect = AsyncMock()
+        return client
+
+    @pytest.fixture
+    def value_handler(self, mock_midi_client, state_cache):
+        return ValueHandler(
+            midi_client=mock_midi_client,
+            command_name="dial1",
+            device_name="VentrisDualReverb",
+            device_effect_name="ReverbEngineA",
+            device_effect_setting_name="Control1",
+            state_cache=state_cache
+        )
+
+    @pytest.mark.asyncio
+    async def test_no_args_reports_current_value(self, value_handler, state_cache):
+        """Usage message includes the cached value."""
+        state_cache.update('dial1', '7')
+        with pytest.raises(CommandError, match="Current dial1: 7. Usage"):
+            await value_handler.handle([], MagicMock())
+
+    @pytest.mark.asyncio
+    async def test_overridden_change(self, value_handler, state_cache, mock_midi_client, monkeypatch):
+        """A different confirmed value is reported as an override."""
+        from config.settings import settings
+        monkeypatch.setattr(settings, 'midi_state_confirm_timeout', 0.05)
+        mock_midi_client.set_effect.side_effect = lambda **kwargs: state_cache.update('dial1', '2')
+
+        with pytest.raises(CommandError, match="overridden, device is at 2"):
+            await value_handler.handle(["5"], MagicMock())
+
+    @pytest.mark.asyncio
+    async def test_confirmed_change_matches_numeric_format(self, value_handler, state_cache, mock_midi_client, monkeypatch):
+        """'5.0' from the MIDI layer confirms a request for 5."""
+        from config.settings import settings
+        monkeypatch.setattr(settings, 'midi_state_confirm_timeout', 0.05)
+        mock_midi_client.set_effect.side_effect = lambda **kwargs: state_cache.update('dial1', '5.0')
+
+        result = await value_handler.handle(["5"], MagicMock())
+
+        assert "Dial1 set to 5!" in result
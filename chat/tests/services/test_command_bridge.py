@@ -0,0 +1,181 @@
+"""Tests for the ingest/execution command bridge."""
+
+import asyncio
+import multiprocessing
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+import pytest_asyncio
+
+from services.command_bridge import (
+    BUSY_MESSAGE,
+    DONE,
+    DROPPED_RECORDS,
+    REPLY,
+    REQUEST_RECORD_SIZE,
+    RESTARTING_MESSAGE,
+    TIMEOUT_MESSAGE,
+    BridgeChannels,
+    ExecutionBridge,
+    IngestBridge,
+    decode_reply,
+    decode_request,
+    encode_reply,
+    encode_request,
+)
+from services.ring_buffer import SLOT_HEADER_SIZE
+
+
+def chat_ctx(user: str = 'tester'):
+    ctx = Mock()
+    ctx.send = AsyncMock()
+    ctx.author.name = user
+    ctx.message.timestamp = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return ctx
+
+
+@pytest_asyncio.fixture
+async def bridges():
+    channels, rings = BridgeChannels.create(multiprocessing.get_context('spawn'), capacity=4)
+    ingest, execution = IngestBridge(channels, reply_timeout=5), ExecutionBridge(channels)
+    yield ingest, execution
+    ingest.close()
+    execution.close()
+    for ring in rings:
+        ring.close()
+
+
+async def settle(ingest: IngestBridge) -> None:
+    """Let spawned command and reply tasks run, then relay what they sent."""
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+        ingest._relay()
+    await asyncio.sleep(0.01)
+
+
+class TestRecords:
+    """Test cases for the record encoding."""
+
+    def test_request_round_trip(self):
+        received_at = datetime(2026, 1, 1, 12, 0, 0, 250000, tzinfo=timezone.utc)
+        record = encode_request(7, 'engine', ['room', 'now'], 'chätter', received_at)
+
+        assert decode_request(record) == (7, 'engine', ['room', 'now'], 'chätter', received_at)
+        assert decode_request(encode_request(8, 'help', [], 'x', None)) == (8, 'help', [], 'x', None)
+
+    def test_oversized_fields_are_truncated_on_character_boundaries(self):
+        record = encode_request(1, 'engine', ['é' * 400], 'ü' * 40, None)
+
+        _, _, args, user, _ = decode_request(record)
+        assert len(record) <= REQUEST_RECORD_SIZE - SLOT_HEADER_SIZE
+        assert user == 'ü' * 32
+        assert set(args[0]) == {'é'}
+
+    @pytest.mark.asyncio
+    async def test_longest_records_fit_their_ring(self, bridges):
+        ingest, execution = bridges
+
+        assert ingest._requests.push(encode_request(1, 'x' * 40, ['é' * 400], 'ü' * 40, None))
+        assert execution._replies.push(encode_reply(1, REPLY, '🎵' * 1000))
+
+    def test_reply_round_trip(self):
+        assert decode_reply(encode_reply(3, REPLY, '🎵 ok')) == (3, REPLY, '🎵 ok')
+        assert decode_reply(encode_reply(3, DONE)) == (3, DONE, '')
+
+
+class TestBridge:
+    """Test cases for IngestBridge and ExecutionBridge."""
+
+    @pytest.mark.asyncio
+    async def test_command_runs_remotely_and_replies_reach_the_chatter(self, bridges):
+        ingest, execution = bridges
+        seen = []
+
+        async def dispatch(command, args, ctx):
+            seen.append((command, args, ctx.author.name, ctx.message.timestamp))
+            await ctx.send('first')
+            await ctx.send('second')
+
+        runner = asyncio.create_task(execution.run(dispatch))
+        ctx = chat_ctx()
+        await ingest.submit('engine', ['room'], ctx)
+        await asyncio.wait_for(ingest._reply_bell.wait(1), 1)
+        await settle(ingest)
+        runner.cancel()
+
+        assert seen == [('engine', ['room'], 'tester', ctx.message.timestamp)]
+        assert [c.args[0] for c in ctx.send.await_args_list] == ['first', 'second']
+        assert ingest.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_full_request_ring_answers_busy(self, bridges):
+        ingest, _ = bridges
+        dropped = DROPPED_RECORDS.labels('requests')
+        before = dropped.value
+        for _ in range(4):
+            await ingest.submit('time', ['5'], chat_ctx())
+
+        ctx = chat_ctx()
+        await ingest.submit('time', ['5'], ctx)
+
+        ctx.send.assert_awaited_once_with(BUSY_MESSAGE)
+        assert dropped.value == before + 1
+        assert ingest.pending == 4
+
+    @pytest.mark.asyncio
+    async def test_command_without_reply_times_out(self, bridges):
+        ingest, _ = bridges
+        ingest._reply_timeout = 0
+        ctx = chat_ctx()
+
+        await ingest.submit('time', ['5'], ctx)
+        ingest._expire()
+        await settle(ingest)
+
+        ctx.send.assert_awaited_once_with(TIMEOUT_MESSAGE)
+        assert ingest.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_execution_readiness_follows_heartbeat(self, bridges):
+        ingest, execution = bridges
+        with pytest.raises(ConnectionError, match='not responding'):
+            await ingest.check_execution()
+
+        execution.ready = lambda: False
+        runner = asyncio.create_task(execution.run(AsyncMock()))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ConnectionError, match='not ready'):
+            await ingest.check_execution()
+
+        execution.ready = lambda: True
+        # The heartbeat is written on every wake-up
+        ingest._request_bell.ring()
+        await asyncio.sleep(0.01)
+        await ingest.check_execution()
+        runner.cancel()
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_for_pending_then_refuses(self, bridges):
+        ingest, execution = bridges
+        release = asyncio.Event()
+
+        async def dispatch(command, args, ctx):
+            await release.wait()
+            await ctx.send('done')
+
+        runner = asyncio.create_task(execution.run(dispatch))
+        ctx = chat_ctx()
+        await ingest.submit('time', ['5'], ctx)
+        drain = asyncio.create_task(ingest.drain(2))
+        await asyncio.sleep(0.05)
+        assert not drain.done()
+
+        release.set()
+        await asyncio.wait_for(drain, 1)
+        late = chat_ctx()
+        await ingest.submit('time', ['6'], late)
+        runner.cancel()
+
+        ctx.send.assert_awaited_once_with('done')
+        late.send.assert_awaited_once_with(RESTARTING_MESSAGE)
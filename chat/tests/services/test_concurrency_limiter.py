@@ -0,0 +1,130 @@
+"""Tests for the adaptive concurrency limiter."""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from config.logging_config import deadline_scope, get_latency_budget
+from services.concurrency_limiter import AdaptiveConcurrencyLimiter, ConcurrencyLimitExceeded
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test cases for AdaptiveConcurrencyLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_fast_requests_at_limit_grow_it(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=3)
+
+        async def request():
+            async with limiter.slot():
+                await asyncio.sleep(0)
+
+        for _ in range(5):
+            await asyncio.gather(*(request() for _ in range(limiter.limit)))
+
+        assert limiter.limit == 3
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_unused_limit_does_not_grow(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+
+        async with limiter.slot():
+            pass
+
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_slow_request_shrinks_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10, latency_threshold=0.5)
+        await limiter.acquire()
+
+        limiter.release(latency=2.0)
+
+        assert limiter.limit == 9
+
+    @pytest.mark.asyncio
+    async def test_overload_errors_shrink_limit_but_not_below_minimum(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1, backoff=0.5)
+
+        for _ in range(3):
+            with pytest.raises(asyncio.TimeoutError):
+                async with limiter.slot():
+                    raise asyncio.TimeoutError()
+
+        assert limiter.limit == 1
+
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_shrink_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+
+        with pytest.raises(ValueError):
+            async with limiter.slot():
+                raise ValueError('bad request')
+
+        assert limiter.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_requests_over_limit_queue_in_order(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        order = []
+
+        async def request(name):
+            async with limiter.slot():
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*(request(i) for i in range(4)))
+
+        assert order == [0, 1, 2, 3]
+        assert limiter.in_flight == 0
+        assert limiter.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_full_queue_sheds(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_queue=1)
+        await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(ConcurrencyLimitExceeded):
+            await limiter.acquire()
+        assert limiter.shed == 1
+
+        limiter.release(latency=0.01)
+        await queued
+        assert limiter.in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        await limiter.acquire()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acquire(), 0.01)
+
+        assert limiter.queued == 0
+        limiter.release(latency=0.01)
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_wait_recorded(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+        await limiter.acquire()
+
+        async def queued():
+            with deadline_scope(10):
+                await limiter.acquire()
+                return get_latency_budget()
+
+        with patch('services.concurrency_limiter.telemetry') as telemetry:
+            waiter = asyncio.create_task(queued())
+            await asyncio.sleep(0.02)
+            limiter.release(latency=0.01)
+            budget = await waiter
+
+        [(stage, waited)] = budget
+        assert stage == 'midi_queue'
+        assert waited >= 0.02
+        assert telemetry.emit.call_args.args == ('queued',)
+        assert telemetry.emit.call_args.kwargs['wait_ms'] >= 20
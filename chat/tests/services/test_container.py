@@ -0,0 +1,115 @@
+"""Tests for the shared service container."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from services.container import ServiceContainer
+
+
+@pytest.fixture
+def services():
+    services = ServiceContainer(midi_client=Mock())
+    services.midi_client.warm_up = AsyncMock()
+    services.midi_client.close = AsyncMock()
+    services.nats = Mock()
+    services.nats.connect = AsyncMock()
+    services.nats.close = AsyncMock()
+    services.nats.ping = AsyncMock()
+    services.effect_state = Mock(start=AsyncMock(), stop=AsyncMock())
+    services.midi_state = Mock(start=AsyncMock(), stop=AsyncMock())
+    with patch('services.container.telemetry') as telemetry:
+        telemetry.stop = AsyncMock()
+        yield services
+
+
+class TestServiceContainer:
+    """Test cases for ServiceContainer."""
+
+    @pytest.mark.asyncio
+    async def test_nats_and_midi_warm_up_concurrently(self, services):
+        """Test the MIDI handshake does not wait for NATS (and vice versa)."""
+        both_started = asyncio.Event()
+        started = []
+
+        def handshake(name):
+            async def run():
+                started.append(name)
+                if len(started) == 2:
+                    both_started.set()
+                await asyncio.wait_for(both_started.wait(), 1)
+            return run
+
+        services.nats.connect.side_effect = handshake('nats')
+        services.midi_client.warm_up.side_effect = handshake('midi')
+
+        services.start()
+        assert await services.wait_started(2) is True
+
+        assert sorted(started) == ['midi', 'nats']
+        assert services.nats_connected
+        services.effect_state.start.assert_awaited_once()
+        services.midi_state.start.assert_awaited_once()
+        assert services.startup_seconds is not None
+
+    @pytest.mark.asyncio
+    async def test_failures_do_not_block_startup(self, services):
+        """Test unreachable dependencies are logged and startup still finishes."""
+        services.nats.connect.side_effect = OSError('connection refused')
+        services.midi_client.warm_up.side_effect = Exception('401')
+
+        assert await services.wait_started(1) is True
+
+        assert not services.nats_connected
+        services.effect_state.start.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_wait_started_times_out_without_cancelling(self, services):
+        """Test a slow warm-up lets the bot continue and keeps running."""
+        release = asyncio.Event()
+
+        async def slow_connect():
+            await release.wait()
+
+        services.nats.connect.side_effect = slow_connect
+
+        assert await services.wait_started(0.05) is False
+        assert not services.started
+
+        release.set()
+        assert await services.wait_started(1) is True
+
+    @pytest.mark.asyncio
+    async def test_start_is_idempotent_and_close_releases_connections(self, services):
+        """Test repeated starts warm up once and close shuts everything down."""
+        services.start()
+        services.start()
+        await services.wait_started(1)
+        await services.close()
+
+        services.nats.connect.assert_awaited_once()
+        services.midi_client.warm_up.assert_awaited_once()
+        services.midi_state.stop.assert_awaited_once()
+        services.effect_state.stop.assert_awaited_once()
+        services.nats.close.assert_awaited_once()
+        services.midi_client.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_keep_nats_reconnects_and_restores_state(self, services):
+        """Test a dead connection is reopened and the state bindings are rebuilt."""
+        services.nats.connect.side_effect = [OSError('connection refused'), None]
+        services.nats.wait_closed = AsyncMock()
+        services.start()
+        await services.wait_started(1)
+        assert not services.nats_connected
+
+        with pytest.raises(ConnectionError):
+            await services._keep_nats()
+
+        assert services.nats.connect.await_count == 2
+        services.effect_state.stop.assert_awaited_once()
+        services.midi_state.stop.assert_awaited_once()
+        services.effect_state.start.assert_awaited_once()
+        services.midi_state.start.assert_awaited_once()
+        # The connection closed again, so the next run reconnects
+        assert not services.nats_connected
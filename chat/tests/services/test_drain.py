@@ -0,0 +1,77 @@
+"""Tests for in-flight command tracking and shutdown drain."""
+
+import asyncio
+import pytest
+
+from services.drain import InFlightCommands
+
+
+class TestInFlightCommands:
+    """Test cases for InFlightCommands."""
+
+    @pytest.mark.asyncio
+    async def test_drain_with_nothing_running(self):
+        in_flight = InFlightCommands()
+
+        assert await in_flight.drain(1) == (0, 0)
+        assert not in_flight.accepting
+
+    @pytest.mark.asyncio
+    async def test_track_counts_running_commands(self):
+        in_flight = InFlightCommands()
+        release = asyncio.Event()
+
+        async def command():
+            with in_flight.track():
+                await release.wait()
+
+        tasks = [asyncio.create_task(command()) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert in_flight.count == 3
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert in_flight.count == 0
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_then_cancels_stragglers(self):
+        in_flight = InFlightCommands(cancel_grace=1)
+        unwound = []
+
+        async def command(seconds):
+            with in_flight.track():
+                try:
+                    await asyncio.sleep(seconds)
+                except asyncio.CancelledError:
+                    unwound.append(seconds)
+                    raise
+
+        quick = asyncio.create_task(command(0.01))
+        stuck = asyncio.create_task(command(10))
+        await asyncio.sleep(0)
+
+        assert await in_flight.drain(0.2) == (1, 1)
+        assert quick.done() and not quick.cancelled()
+        assert stuck.cancelled()
+        assert unwound == [10]
+        assert in_flight.count == 0
+
+    @pytest.mark.asyncio
+    async def test_busy_and_idle_hooks_bracket_running_commands(self):
+        in_flight = InFlightCommands()
+        transitions = []
+        in_flight.on_busy = lambda: transitions.append('busy')
+        in_flight.on_idle = lambda: transitions.append('idle')
+        release = asyncio.Event()
+
+        async def command():
+            with in_flight.track():
+                await release.wait()
+
+        tasks = [asyncio.create_task(command()) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert transitions == ['busy']
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert transitions == ['busy', 'idle']
@@ -0,0 +1,142 @@
+"""Tests for the KV-backed effect state store."""
+
+import asyncio
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from nats.js.errors import KeyNotFoundError
+
+from services.effect_state_store import EffectStateStore
+from services.state_cache import DeviceStateCache
+
+
+def create_entry(key, value, operation=None):
+    """Helper to create a KV entry."""
+    entry = Mock()
+    entry.key = key
+    entry.value = value.encode() if value is not None else None
+    entry.operation = operation
+    return entry
+
+
+class FakeWatcher:
+    """Minimal stand-in for nats KeyValue.KeyWatcher backed by a queue."""
+
+    def __init__(self, initial):
+        self._queue = asyncio.Queue()
+        for entry in initial:
+            self._queue.put_nowait(entry)
+        self._queue.put_nowait(None)
+        self.stopped = False
+
+    def push(self, entry):
+        self._queue.put_nowait(entry)
+
+    async def stop(self):
+        self.stopped = True
+        self._queue.put_nowait(StopAsyncIteration)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        entry = await self._queue.get()
+        if entry is StopAsyncIteration:
+            raise StopAsyncIteration
+        return entry
+
+
+class TestEffectStateStore:
+    """Test cases for EffectStateStore."""
+
+    @pytest.fixture
+    def watcher(self):
+        return FakeWatcher([create_entry('engine', 'hall'), create_entry('time', '4')])
+
+    @pytest.fixture
+    def kv(self, watcher):
+        kv = Mock()
+        kv.watchall = AsyncMock(return_value=watcher)
+        kv.put = AsyncMock(return_value=1)
+        kv.get = AsyncMock(side_effect=KeyNotFoundError)
+        return kv
+
+    @pytest.fixture
+    def store(self, kv):
+        js = Mock()
+        js.key_value = AsyncMock(return_value=kv)
+        publisher = Mock()
+        publisher.client = Mock(is_closed=False)
+        publisher.client.jetstream = Mock(return_value=js)
+        return EffectStateStore(publisher, DeviceStateCache())
+
+    @pytest.mark.asyncio
+    async def test_start_rehydrates_cache_in_one_read(self, store):
+        loaded = await store.start()
+
+        assert loaded == 2
+        assert store._cache.snapshot() == {'engine': 'hall', 'time': '4'}
+        assert store._cache.entry('engine').source == 'kv'
+        await store.stop()
+
+    @pytest.mark.asyncio
+    async def test_watch_applies_changes_from_other_replicas(self, store, watcher):
+        await store.start()
+
+        watcher.push(create_entry('dial1', '9'))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert store._cache.get('dial1') == '9'
+        await store.stop()
+
+    @pytest.mark.asyncio
+    async def test_deletes_are_ignored(self, store, watcher):
+        await store.start()
+
+        watcher.push(create_entry('engine', None, operation='DEL'))
+        await asyncio.sleep(0)
+
+        assert store._cache.get('engine') == 'hall'
+        await store.stop()
+
+    @pytest.mark.asyncio
+    async def test_put_writes_to_bucket(self, store, kv):
+        await store.start()
+
+        await store.put('engine', 'room')
+
+        kv.put.assert_awaited_once_with('engine', b'room')
+        await store.stop()
+
+    @pytest.mark.asyncio
+    async def test_put_without_bucket_is_skipped(self, store, kv):
+        await store.put('engine', 'room')
+
+        kv.put.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_get_reads_through_to_bucket_on_miss(self, store, kv):
+        await store.start()
+        kv.get = AsyncMock(return_value=create_entry('delay', '2'))
+
+        assert await store.get('engine') == 'hall'
+        assert await store.get('delay') == '2'
+        kv.get.assert_awaited_once_with('delay')
+        await store.stop()
+
+    @pytest.mark.asyncio
+    async def test_get_unknown_key_returns_none(self, store):
+        await store.start()
+
+        assert await store.get('dial2') is None
+        await store.stop()
+
+    @pytest.mark.asyncio
+    async def test_start_without_connection_does_nothing(self):
+        publisher = Mock()
+        publisher.client = None
+        store = EffectStateStore(publisher, DeviceStateCache())
+
+        assert await store.start() == 0
+        assert not store.is_running
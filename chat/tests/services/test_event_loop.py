@@ -0,0 +1,56 @@
+"""Tests for event loop backend selection."""
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from services.event_loop import LOOP_BACKEND, loop_factory, run
+
+
+@pytest.fixture
+def uvloop_missing():
+    with patch.dict('sys.modules', {'uvloop': None}):
+        yield
+
+
+@pytest.fixture
+def uvloop_installed():
+    fake = SimpleNamespace(new_event_loop=asyncio.new_event_loop)
+    with patch.dict('sys.modules', {'uvloop': fake}):
+        yield fake
+
+
+class TestLoopFactory:
+    """Test cases for loop_factory."""
+
+    def test_auto_prefers_uvloop(self, uvloop_installed):
+        assert loop_factory('auto') == ('uvloop', uvloop_installed.new_event_loop)
+
+    def test_auto_falls_back_to_asyncio(self, uvloop_missing):
+        assert loop_factory('auto') == ('asyncio', asyncio.new_event_loop)
+
+    def test_asyncio_ignores_uvloop(self, uvloop_installed):
+        assert loop_factory('asyncio') == ('asyncio', asyncio.new_event_loop)
+
+    def test_missing_uvloop_warns_when_requested(self, uvloop_missing, caplog):
+        assert loop_factory('uvloop')[0] == 'asyncio'
+        assert 'uvloop is not installed' in caplog.text
+
+    def test_unknown_backend_is_rejected(self):
+        with pytest.raises(ValueError):
+            loop_factory('trio')
+
+
+class TestRun:
+    """Test cases for run."""
+
+    def test_runs_on_selected_backend(self, uvloop_missing):
+        async def main():
+            return asyncio.get_running_loop()
+
+        loop = run(main(), 'auto')
+
+        assert isinstance(loop, asyncio.AbstractEventLoop)
+        assert loop.is_closed()
+        assert LOOP_BACKEND.labels('asyncio').get() == 1
@@ -0,0 +1,97 @@
+"""Tests for GC pause instrumentation and the low-pause mode."""
+
+import asyncio
+import gc
+import pytest
+
+from services.gc_monitor import GC_COLLECTED, GC_DEFERRALS_CUT_SHORT, GC_PAUSE, GcMonitor
+
+
+@pytest.fixture
+def restore_gc():
+    thresholds = gc.get_threshold()
+    yield
+    gc.set_threshold(*thresholds)
+    gc.unfreeze()
+    gc.enable()
+
+
+def make_cycle():
+    a, b = [], []
+    a.append(b)
+    b.append(a)
+
+
+class TestGcMonitor:
+    """Test cases for GcMonitor."""
+
+    def test_collections_are_timed_per_generation(self, restore_gc):
+        monitor = GcMonitor()
+        monitor.install()
+        before_pauses = sum(GC_PAUSE.labels('2').counts)
+        before_collected = GC_COLLECTED.labels('2').value
+        try:
+            make_cycle()
+            gc.collect()
+        finally:
+            monitor.uninstall()
+
+        assert sum(GC_PAUSE.labels('2').counts) == before_pauses + 1
+        assert GC_COLLECTED.labels('2').value >= before_collected + 2
+        assert monitor._callback not in gc.callbacks
+
+    def test_thresholds_only_apply_in_low_pause_mode(self, restore_gc):
+        default = gc.get_threshold()
+        GcMonitor('default', [5000, 30, 30]).install()
+        assert gc.get_threshold() == default
+
+        monitor = GcMonitor('low_pause', [5000, 30, 30])
+        monitor.install()
+        monitor.uninstall()
+        assert gc.get_threshold() == (5000, 30, 30)
+
+    def test_unknown_mode_is_rejected(self):
+        with pytest.raises(ValueError):
+            GcMonitor('off')
+
+    @pytest.mark.asyncio
+    async def test_freeze_waits_for_ready(self, restore_gc):
+        monitor = GcMonitor('low_pause')
+        ready = False
+        freezing = asyncio.create_task(monitor.freeze_when(lambda: ready, poll=0.01))
+        await asyncio.sleep(0.02)
+        assert gc.get_freeze_count() == 0
+
+        ready = True
+        await asyncio.wait_for(freezing, 1)
+        assert gc.get_freeze_count() > 0
+
+    @pytest.mark.asyncio
+    async def test_default_mode_never_freezes_or_defers(self, restore_gc):
+        monitor = GcMonitor('default')
+        await monitor.freeze_when(lambda: True)
+        monitor.busy()
+
+        assert gc.get_freeze_count() == 0
+        assert gc.isenabled()
+
+    @pytest.mark.asyncio
+    async def test_collections_are_deferred_while_busy(self, restore_gc):
+        monitor = GcMonitor('low_pause', defer_max=5)
+        monitor.busy()
+        assert not gc.isenabled()
+
+        monitor.idle()
+        assert gc.isenabled()
+
+    @pytest.mark.asyncio
+    async def test_long_busy_period_re_enables_collections(self, restore_gc):
+        monitor = GcMonitor('low_pause', defer_max=0.01)
+        before = GC_DEFERRALS_CUT_SHORT._default.value
+        monitor.busy()
+        await asyncio.sleep(0.05)
+
+        assert gc.isenabled()
+        assert GC_DEFERRALS_CUT_SHORT._default.value == before + 1
+        monitor.idle()
+        assert gc.isenabled()
@@ -0,0 +1,265 @@
+"""Tests for the health server endpoints."""
+
+import pytest
+import pytest_asyncio
+from aiohttp.test_utils import TestClient, TestServer
+
+from config.settings import settings
+from services.health_server import HealthServer
+from services.readiness import ReadinessMonitor
+
+
+@pytest_asyncio.fixture
+async def client():
+    server = HealthServer(port=0)
+    async with TestClient(TestServer(server.app)) as client:
+        yield client
+
+
+class TestDebugEndpoints:
+    """Test cases for the token-protected /debug/* endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_disabled_without_token(self, client, monkeypatch):
+        monkeypatch.setattr(settings, 'debug_token', '')
+
+        response = await client.get('/debug/traces')
+
+        assert response.status == 404
+
+    @pytest.mark.asyncio
+    async def test_wrong_token_rejected(self, client, monkeypatch):
+        monkeypatch.setattr(settings, 'debug_token', 'secret')
+
+        response = await client.get('/debug/traces', headers={'Authorization': 'Bearer nope'})
+
+        assert response.status == 401
+
+    @pytest.mark.asyncio
+    async def test_token_grants_access(self, client, monkeypatch):
+        monkeypatch.setattr(settings, 'debug_token', 'secret')
+
+        response = await client.get('/debug/traces', headers={'Authorization': 'Bearer secret'})
+
+        assert response.status == 200
+        assert 'traces' in await response.json()
+
+    @pytest.mark.asyncio
+    async def test_health_does_not_need_token(self, client, monkeypatch):
+        monkeypatch.setattr(settings, 'debug_token', 'secret')
+
+        response = await client.get('/health')
+
+        assert response.status == 200
+
+    @pytest.mark.asyncio
+    async def test_profile_returns_collapsed_stacks(self, client, monkeypatch):
+        monkeypatch.setattr(settings, 'debug_token', 'secret')
+
+        response = await client.get(
+            '/debug/profile?seconds=0.2&rate=200',
+            headers={'Authorization': 'Bearer secret'}
+        )
+
+        assert response.status == 200
+        assert response.headers['Content-Type'].startswith('text/plain')
+        assert ';' in await response.text()
+
+    @pytest.mark.asyncio
+    async def test_profile_rejects_bad_seconds(self, client, monkeypatch):
+        monkeypatch.setattr(settings, 'debug_token', 'secret')
+
+        response = await client.get('/debug/profile?seconds=abc', headers={'Authorization': 'Bearer secret'})
+
+        assert response.status == 400
+
+
+class TestReadiness:
+    """Test cases for /ready backed by cached dependency probes."""
+
+    @pytest.mark.asyncio
+    async def test_ready_from_cache(self):
+        async def healthy():
+            return None
+
+        readiness = ReadinessMonitor({'nats': healthy, 'midi': healthy})
+        await readiness.probe_all()
+        server = HealthServer(port=0, readiness=readiness)
+
+        async with TestClient(TestServer(server.app)) as client:
+            response = await client.get('/ready')
+            body = await response.json()
+
+        assert response.status == 200
+        assert body['status'] == 'ready'
+        assert 'dependencies' not in body
+
+    @pytest.mark.asyncio
+    async def test_not_ready_while_draining(self):
+        async def healthy():
+            return None
+
+        readiness = ReadinessMonitor({'nats': healthy})
+        await readiness.probe_all()
+        server = HealthServer(port=0, readiness=readiness)
+        server.draining = True
+
+        async with TestClient(TestServer(server.app)) as client:
+            response = await client.get('/ready')
+            body = await response.json()
+
+        assert response.status == 503
+        assert body['status'] == 'draining'
+
+    @pytest.mark.asyncio
+    async def test_verbose_reports_dependencies(self):
+        async def down():
+            raise ConnectionError('unreachable')
+
+        readiness = ReadinessMonitor({'midi': down})
+        await readiness.probe_all()
+        server = HealthServer(port=0, readiness=readiness)
+
+        async with TestClient(TestServer(server.app)) as client:
+            response = await client.get('/ready?verbose=1')
+            body = await response.json()
+
+        assert response.status == 503
+        assert body['dependencies']['midi']['status'] == 'down'
+        assert body['dependencies']['midi']['error'] == 'unreachable'
+
+
+@pytest.mark.asyncio
+async def test_debug_tasks_lists_live_tasks(client, monkeypatch):
+    monkeypatch.setattr(settings, 'debug_token', 'secret')
+
+    response = await client.get('/debug/tasks', headers={'Authorization': 'Bearer secret'})
+    body = await response.json()
+
+    assert response.status == 200
+    assert body['count'] == len(body['tasks']) > 0
+    assert body['leak_suspects'] == {}
+    assert {'name', 'kind', 'age_s', 'created_at', 'await_point'} <= set(body['tasks'][0])
+
+
+@pytest.mark.asyncio
+async def test_debug_heap_toggle_snapshot_and_diff(client, monkeypatch):
+    monkeypatch.setattr(settings, 'debug_token', 'secret')
+    auth = {'Authorization': 'Bearer secret'}
+
+    try:
+        assert (await (await client.get('/debug/heap', headers=auth)).json())['tracing'] is False
+        assert (await client.post('/debug/heap/snapshot', headers=auth)).status == 409
+
+        started = await (await client.post('/debug/heap/start?frames=2', headers=auth)).json()
+        snapshot = await client.post('/debug/heap/snapshot?name=baseline', headers=auth)
+        diff = await client.get('/debug/heap/diff?base=baseline&limit=5', headers=auth)
+        bad_group = await client.get('/debug/heap/diff?base=baseline&group_by=file', headers=auth)
+
+        assert started['tracing'] is True and started['frames'] == 2
+        assert snapshot.status == 200
+        assert diff.status == 200
+        assert (await diff.json())['group_by'] == 'module'
+        assert bad_group.status == 400
+    finally:
+        stopped = await (await client.post('/debug/heap/stop', headers=auth)).json()
+
+    assert stopped['tracing'] is False
+
+
+@pytest.mark.asyncio
+async def test_debug_flight_serves_recorded_records(monkeypatch):
+    import logging
+    from config.logging_config import FlightRecorder
+
+    monkeypatch.setattr(settings, 'debug_token', 'secret')
+    recorder = FlightRecorder(10, lambda record: None, logging.INFO)
+    for correlation_id in ('a', 'b'):
+        record = logging.LogRecord('services.midi_client', logging.DEBUG, __file__, 1, 'MIDI %s', ('POST',), None)
+        record.correlation_id = correlation_id
+        recorder.handle(record)
+    server = HealthServer(port=0, flight_recorder=recorder)
+
+    async with TestClient(TestServer(server.app)) as client:
+        response = await client.get('/debug/flight?correlation_id=a', headers={'Authorization': 'Bearer secret'})
+        body = await response.json()
+
+    assert response.status == 200
+    [entry] = body['records']
+    assert entry['level'] == 'debug'
+    assert entry['message'] == 'MIDI POST'
+    assert entry['correlation_id'] == 'a'
+
+
+@pytest.mark.asyncio
+async def test_debug_flight_disabled(client, monkeypatch):
+    monkeypatch.setattr(settings, 'debug_token', 'secret')
+
+    response = await client.get('/debug/flight', headers={'Authorization': 'Bearer secret'})
+
+    assert response.status == 404
+
+
+class TestDedicatedThread:
+    """Test cases for the server running on its own thread and event loop."""
+
+    @staticmethod
+    def _get(server, path, headers=None):
+        """Blocking GET, so the test's (the bot's) event loop is blocked while it runs."""
+        import json
+        import urllib.error
+        import urllib.request
+        port = server.runner.addresses[0][1]
+        request = urllib.request.Request(f'http://127.0.0.1:{port}{path}', headers=headers or {})
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    @pytest.mark.asyncio
+    async def test_answers_while_bot_loop_is_blocked(self):
+        server = HealthServer(port=0)
+        await server.start()
+        try:
+            status, body = self._get(server, '/health')
+        finally:
+            await server.stop()
+
+        assert status == 200
+        assert body['status'] == 'healthy'
+        assert server._thread is None
+
+    @pytest.mark.asyncio
+    async def test_liveness_fails_after_long_block(self, monkeypatch):
+        from unittest.mock import Mock
+        monitor = Mock(last_lag=0.002, heartbeat_age=0.0)
+        server = HealthServer(port=0, loop_monitor=monitor)
+        await server.start()
+        try:
+            healthy_status, healthy = self._get(server, '/health')
+            monitor.heartbeat_age = settings.liveness_max_lag + 1
+            blocked_status, blocked = self._get(server, '/health')
+        finally:
+            await server.stop()
+
+        assert healthy_status == 200
+        assert healthy['loop_lag_ms'] == 2.0
+        assert blocked_status == 503
+        assert blocked['status'] == 'unhealthy'
+
+    @pytest.mark.asyncio
+    async def test_debug_tasks_inspects_bot_loop(self, monkeypatch):
+        import asyncio
+        monkeypatch.setattr(settings, 'debug_token', 'secret')
+        waiter = asyncio.get_running_loop().create_task(asyncio.Event().wait(), name='command-engine')
+        server = HealthServer(port=0)
+        await server.start()
+        try:
+            status, body = self._get(server, '/debug/tasks?kind=command-engine', {'Authorization': 'Bearer secret'})
+        finally:
+            await server.stop()
+            waiter.cancel()
+
+        assert status == 200
+        assert body['count'] == 1
@@ -0,0 +1,96 @@
+"""Tests for the on-demand heap profiler."""
+
+import os
+import tracemalloc
+
+import pytest
+
+from services.heap_profiler import HeapProfiler, HeapProfilerError, module_name
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+# Kept alive between snapshots so the diff sees it
+_retained = []
+
+
+def grow(count):
+    _retained.extend(bytearray(1024) for _ in range(count))
+
+
+@pytest.fixture
+def heap():
+    profiler = HeapProfiler(max_snapshots=2)
+    yield profiler
+    profiler.stop()
+    _retained.clear()
+
+
+class TestModuleName:
+    """Test cases for module_name."""
+
+    def test_resolves_against_sys_path(self):
+        assert module_name(os.path.join(SRC, 'services', 'tracing.py')) == 'services.tracing'
+
+    def test_package_init(self):
+        assert module_name(os.path.join(SRC, 'services', '__init__.py')) == 'services'
+
+
+class TestHeapProfiler:
+    """Test cases for HeapProfiler."""
+
+    def test_off_by_default(self, heap):
+        assert heap.is_tracing is False
+        with pytest.raises(HeapProfilerError):
+            heap.snapshot('baseline')
+
+    def test_start_and_stop(self, heap):
+        heap.start(frames=3)
+
+        assert tracemalloc.is_tracing()
+        assert heap.status()['frames'] == 3
+
+        heap.snapshot('baseline')
+        heap.stop()
+
+        assert not tracemalloc.is_tracing()
+        assert heap.status()['snapshots'] == []
+
+    def test_oldest_snapshot_dropped_over_limit(self, heap):
+        heap.start()
+        for name in ('a', 'b', 'c'):
+            heap.snapshot(name)
+
+        assert [s['name'] for s in heap.status()['snapshots']] == ['b', 'c']
+
+    @pytest.mark.asyncio
+    async def test_diff_grouped_by_module(self, heap):
+        heap.start()
+        heap.snapshot('baseline')
+        grow(500)
+
+        diff = await heap.diff('baseline')
+
+        assert diff['name'] == '<live>'
+        top = diff['top'][0]
+        assert top['site'].endswith('test_heap_profiler')
+        assert top['size_diff'] >= 500 * 1024
+        assert top['count_diff'] >= 500
+
+    @pytest.mark.asyncio
+    async def test_diff_between_named_snapshots_by_line(self, heap):
+        heap.start()
+        heap.snapshot('before')
+        grow(200)
+        heap.snapshot('after')
+
+        diff = await heap.diff('before', 'after', group_by='lineno', limit=1)
+
+        assert len(diff['top']) == 1
+        assert 'test_heap_profiler.py:' in diff['top'][0]['site'][0]
+
+    @pytest.mark.asyncio
+    async def test_diff_unknown_snapshot(self, heap):
+        heap.start()
+
+        with pytest.raises(HeapProfilerError):
+            await heap.diff('missing')
@@ -0,0 +1,57 @@
+"""Tests for the event loop lag monitor."""
+
+import asyncio
+import time
+import pytest
+
+from services.loop_monitor import LoopLagMonitor
+from services.metrics import LOOP_LAG
+
+
+def block_loop(seconds):
+    time.sleep(seconds)
+
+
+async def blocking_command():
+    block_loop(0.3)
+
+
+class TestLoopLagMonitor:
+    """Test cases for LoopLagMonitor."""
+
+    @pytest.mark.asyncio
+    async def test_records_lag_histogram(self):
+        monitor = LoopLagMonitor(interval=0.01, threshold=0.5)
+        before = sum(LOOP_LAG._default.counts)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.1)
+        finally:
+            await monitor.stop()
+
+        assert sum(LOOP_LAG._default.counts) > before
+        assert monitor.stalls() == []
+
+    @pytest.mark.asyncio
+    async def test_stall_attributed_to_blocking_task(self):
+        monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.02)
+            await asyncio.create_task(blocking_command(), name='command-engine')
+            await asyncio.sleep(0.05)
+        finally:
+            await monitor.stop()
+
+        [stall] = monitor.stalls()
+        assert stall['task'] == 'command-engine'
+        assert stall['coroutine'] == 'blocking_command'
+        assert any('in block_loop' in frame for frame in stall['stack'])
+        assert stall['lag'] >= 0.2
+
+    @pytest.mark.asyncio
+    async def test_stop_is_idempotent(self):
+        monitor = LoopLagMonitor(interval=0.01)
+        monitor.start()
+        await monitor.stop()
+        await monitor.stop()
@@ -0,0 +1,58 @@
+"""Tests for resident memory reporting and the memory budget."""
+
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from services.memory import OVER_BUDGET, MemoryBudget, resident_bytes
+
+BENCH_MEMORY = Path(__file__).resolve().parents[2] / 'benchmarks' / 'bench_memory.py'
+
+
+class TestMemoryBudget:
+    """Test cases for MemoryBudget."""
+
+    def test_resident_bytes(self):
+        assert resident_bytes() > 10 * 2 ** 20
+
+    def test_crossing_the_budget_is_reported_once(self, caplog):
+        caplog.set_level(logging.INFO, logger='services.memory')
+        budget = MemoryBudget(100)
+
+        with patch('services.memory.resident_bytes', return_value=120 * 2 ** 20):
+            budget.check()
+            budget.check()
+        assert budget.over_budget
+        assert OVER_BUDGET._default.get() == 1
+        assert caplog.text.count('over the 100MiB budget') == 1
+
+        with patch('services.memory.resident_bytes', return_value=90 * 2 ** 20):
+            budget.check()
+        assert not budget.over_budget
+        assert OVER_BUDGET._default.get() == 0
+        assert 'back under' in caplog.text
+
+    def test_no_budget_never_reports(self):
+        budget = MemoryBudget(0)
+
+        with patch('services.memory.resident_bytes', return_value=2 ** 40):
+            budget.check()
+
+        assert budget.budget_bytes == 0
+        assert not budget.over_budget
+
+
+class TestFootprintRegression:
+    """Steady-state resident memory of the service under simulated traffic."""
+
+    def test_low_footprint_steady_state_within_budget(self):
+        """Fails when LOW_FOOTPRINT's budget is exceeded or memory keeps growing under traffic."""
+        env = dict(os.environ, LOW_FOOTPRINT='true')
+        result = subprocess.run(
+            [sys.executable, str(BENCH_MEMORY), '--commands', '500', '--batches', '4', '--check'],
+            capture_output=True, text=True, env=env, timeout=120
+        )
+        assert result.returncode == 0, result.stdout
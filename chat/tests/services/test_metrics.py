@@ -0,0 +1,109 @@
+"""Tests for the in-process Prometheus metrics."""
+
+import threading
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from services.health_server import HealthServer
+from services.metrics import Counter, Gauge, Histogram, Registry
+
+
+class TestMetrics:
+    """Test cases for metric recording and exposition."""
+
+    def test_counter_renders_total(self):
+        registry = Registry()
+        errors = registry.register(Counter('test_errors', 'Errors.', ('source',)))
+
+        errors.labels('midi').inc()
+        errors.labels('midi').inc(2)
+
+        assert 'test_errors_total{source="midi"} 3' in registry.render()
+
+    def test_labelled_series_are_cached(self):
+        histogram = Histogram('test_latency', 'Latency.', ('command', 'outcome'))
+
+        assert histogram.labels('engine', 'ok') is histogram.labels('engine', 'ok')
+
+    def test_wrong_label_count_raises(self):
+        counter = Counter('test_count', 'Count.', ('source',))
+
+        with pytest.raises(ValueError):
+            counter.labels('a', 'b')
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        latency = registry.register(Histogram('test_seconds', 'Latency.', buckets=(0.1, 1.0)))
+
+        latency.observe(0.05)
+        latency.observe(0.1)
+        latency.observe(0.5)
+        latency.observe(3)
+        output = registry.render()
+
+        assert 'test_seconds_bucket{le="0.1"} 2' in output
+        assert 'test_seconds_bucket{le="1"} 3' in output
+        assert 'test_seconds_bucket{le="+Inf"} 4' in output
+        assert 'test_seconds_count 4' in output
+        assert 'test_seconds_sum 3.65' in output
+
+    def test_scrape_from_another_thread_sees_consistent_buckets(self):
+        registry = Registry()
+        histogram = registry.register(Histogram('lag_seconds', 'Lag.', buckets=(0.1, 1.0)))
+        stop = threading.Event()
+
+        def record():
+            while not stop.is_set():
+                for value in (0.05, 0.5, 5.0):
+                    histogram.observe(value)
+
+        recorder = threading.Thread(target=record)
+        recorder.start()
+        try:
+            for _ in range(200):
+                samples = dict(line.rsplit(' ', 1) for line in registry.render().splitlines()[2:])
+                buckets = [int(samples[f'lag_seconds_bucket{{le="{le}"}}']) for le in ('0.1', '1', '+Inf')]
+                assert buckets == sorted(buckets)
+                assert int(samples['lag_seconds_count']) == buckets[-1]
+        finally:
+            stop.set()
+            recorder.join()
+
+    def test_gauge_function_read_at_render(self):
+        registry = Registry()
+        depth = registry.register(Gauge('test_depth', 'Depth.'))
+        queue = [1, 2]
+        depth.set_function(lambda: len(queue))
+
+        queue.append(3)
+
+        assert 'test_depth 3' in registry.render()
+
+    def test_label_values_are_escaped(self):
+        registry = Registry()
+        counter = registry.register(Counter('test_escape', 'Escape.', ('value',)))
+
+        counter.labels('say "hi"\n').inc()
+
+        assert 'test_escape_total{value="say \\"hi\\"\\n"} 1' in registry.render()
+
+    def test_duplicate_registration_raises(self):
+        registry = Registry()
+        registry.register(Counter('test_dup', 'Dup.'))
+
+        with pytest.raises(ValueError):
+            registry.register(Counter('test_dup', 'Dup.'))
+
+
+@pytest.mark.asyncio
+async def test_health_server_serves_metrics():
+    server = HealthServer(port=0)
+    async with TestClient(TestServer(server.app)) as client:
+        response = await client.get('/metrics')
+        body = await response.text()
+
+    assert response.status == 200
+    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    assert '# TYPE chat_command_duration_seconds histogram' in body
+    assert '# TYPE chat_midi_queue_depth gauge' in body
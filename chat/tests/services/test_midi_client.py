@@ -28,6 +28,7 @@ def create_mock_response(status=200, json_data=None, text_data=None):
 def create_mock_session_with_response(response):
     """Helper to create a mock aiohttp session with a response."""
     mock_session = AsyncMock()
+    mock_session.closed = False
     # Make get/post return the response which is itself an async context manager
     mock_session.get = MagicMock(return_value=response)
     mock_session.post = MagicMock(return_value=response)
@@ -121,23 +122,12 @@ class TestMidiClient:
             json_data={"success": True}
         )
         
-        # Create three mock sessions for the three POST calls
-        unauth_session = AsyncMock()
-        unauth_session.post = MagicMock(return_value=unauthorized_response)
-        unauth_session.__aenter__ = AsyncMock(return_value=unauth_session)
-        unauth_session.__aexit__ = AsyncMock(return_value=None)
-        
-        auth_session = AsyncMock()
-        auth_session.post = MagicMock(return_value=auth_response)
-        auth_session.__aenter__ = AsyncMock(return_value=auth_session)
-        auth_session.__aexit__ = AsyncMock(return_value=None)
-        
-        post_session = AsyncMock()
-        post_session.post = MagicMock(return_value=post_response)
-        post_session.__aenter__ = AsyncMock(return_value=post_session)
-        post_session.__aexit__ = AsyncMock(return_value=None)
+        # One pooled session serves all three POST calls
+        mock_session = AsyncMock()
+        mock_session.closed = False
+        mock_session.post = MagicMock(side_effect=[unauthorized_response, auth_response, post_response])
         
-        with patch('aiohttp.ClientSession', side_effect=[unauth_session, auth_session, post_session]):
+        with patch('aiohttp.ClientSession', return_value=mock_session) as session_class:
             result = await midi_client.post(
                 'api/Midi/SendControlChangeMessage',
                 {"address": 1, "value": 8},
@@ -145,6 +135,7 @@ class TestMidiClient:
             )
             
             assert result == {"success": True}
+            session_class.assert_called_once()
     
     @pytest.mark.asyncio
     async def test_send_control_change_message(self, midi_client):
@@ -159,6 +150,7 @@ class TestMidiClient:
         )
         
         mock_session = AsyncMock()
+        mock_session.closed = False
         mock_session.post = MagicMock(side_effect=[auth_response, midi_response])
         mock_session.__aenter__ = AsyncMock(return_value=mock_session)
         mock_session.__aexit__ = AsyncMock(return_value=None)
@@ -185,6 +177,7 @@ class TestMidiClient:
         )
         
         mock_session = AsyncMock()
+        mock_session.closed = False
         mock_session.post = MagicMock(side_effect=[auth_response, midi_response])
         mock_session.__aenter__ = AsyncMock(return_value=mock_session)
         mock_session.__aexit__ = AsyncMock(return_value=None)
@@ -212,6 +205,7 @@ class TestMidiClient:
         )
         
         mock_session = AsyncMock()
+        mock_session.closed = False
         mock_session.post = MagicMock(side_effect=[auth_response, midi_response])
         mock_session.__aenter__ = AsyncMock(return_value=mock_session)
         mock_session.__aexit__ = AsyncMock(return_value=None)
@@ -239,6 +233,7 @@ class TestMidiClient:
         )
         
         mock_session = AsyncMock()
+        mock_session.closed = False
         mock_session.post = MagicMock(side_effect=[auth_response, midi_response])
         mock_session.__aenter__ = AsyncMock(return_value=mock_session)
         mock_session.__aexit__ = AsyncMock(return_value=None)
@@ -263,3 +258,41 @@ class TestMidiClient:
                 device_effect_name="ReverbEngineA",
                 device_effect_setting_name="ReverbEngine"
             )
+
+    def test_request_timeout_capped_by_deadline(self, midi_client):
+        """Test the HTTP timeout never exceeds what is left of the command deadline."""
+        from config.logging_config import deadline_scope
+
+        assert midi_client._request_timeout().total == midi_client.timeout.total
+        with deadline_scope(0.5):
+            assert midi_client._request_timeout().total <= 0.5
+
+    def test_request_timeout_expired_deadline(self, midi_client):
+        """Test no request is started once the deadline has passed."""
+        import asyncio
+        from config.logging_config import deadline_scope
+
+        with deadline_scope(0):
+            with pytest.raises(asyncio.TimeoutError):
+                midi_client._request_timeout()
+
+    @pytest.mark.asyncio
+    async def test_warm_up_authenticates_on_shared_session(self, midi_client):
+        """Test warm-up fetches the token and later requests reuse its session."""
+        auth_response = create_mock_response(status=200, json_data={"token": "warm_token"})
+        post_response = create_mock_response(status=200, json_data={"success": True})
+        mock_session = create_mock_session_with_response(auth_response)
+        mock_session.post = MagicMock(side_effect=[auth_response, post_response])
+
+        with patch('aiohttp.ClientSession', return_value=mock_session) as session_class:
+            await midi_client.warm_up()
+            assert midi_client._token == "warm_token"
+
+            await midi_client.set_effect("VentrisDualReverb", "ReverbEngineA", "Time", value=5)
+
+            session_class.assert_called_once()
+            assert mock_session.post.call_args.kwargs['headers']['Authorization'] == 'Bearer warm_token'
+
+        await midi_client.close()
+        mock_session.close.assert_awaited_once()
+        assert midi_client._session is None
@@ -0,0 +1,126 @@
+"""Tests for the MIDI_STATE subscriber."""
+
+import json
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from services.midi_state_subscriber import MidiStateSubscriber
+from services.state_cache import DeviceStateCache
+
+
+def create_message(subject, payload):
+    """Helper to create a mock JetStream message."""
+    msg = Mock()
+    msg.subject = subject
+    msg.data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    return msg
+
+
+class TestMidiStateSubscriber:
+    """Test cases for MidiStateSubscriber."""
+
+    @pytest.fixture
+    def nats_client(self):
+        client = Mock()
+        client.is_closed = False
+        js = Mock()
+        js.subscribe = AsyncMock(return_value=Mock(unsubscribe=AsyncMock()))
+        client.jetstream = Mock(return_value=js)
+        return client
+
+    @pytest.fixture
+    def subscriber(self, nats_client):
+        publisher = Mock()
+        publisher.client = nats_client
+        return MidiStateSubscriber(publisher, DeviceStateCache())
+
+    @pytest.mark.asyncio
+    async def test_start_creates_ordered_consumer(self, subscriber, nats_client):
+        await subscriber.start()
+
+        js = nats_client.jetstream.return_value
+        js.subscribe.assert_awaited_once()
+        kwargs = js.subscribe.call_args.kwargs
+        assert js.subscribe.call_args.args[0] == 'midi.*'
+        assert kwargs['stream'] == 'MIDI_STATE'
+        assert kwargs['ordered_consumer'] and 'durable' not in kwargs
+        assert subscriber.is_running
+
+    @pytest.mark.asyncio
+    async def test_replicas_subscribe_side_by_side(self, nats_client):
+        bound = set()
+
+        async def subscribe(subject, durable=None, **kwargs):
+            # A push durable without a deliver group accepts one subscription
+            if durable is not None and durable in bound:
+                raise Exception("consumer is already bound to a subscription")
+            bound.add(durable or object())
+            return Mock(unsubscribe=AsyncMock())
+
+        nats_client.jetstream.return_value.subscribe = subscribe
+        publisher = Mock(client=nats_client)
+        old_pod = MidiStateSubscriber(publisher, DeviceStateCache())
+        new_pod = MidiStateSubscriber(publisher, DeviceStateCache())
+
+        await old_pod.start()
+        await new_pod.start()
+
+        assert old_pod.is_running and new_pod.is_running
+
+    @pytest.mark.asyncio
+    async def test_start_is_idempotent(self, subscriber, nats_client):
+        await subscriber.start()
+        await subscriber.start()
+
+        nats_client.jetstream.return_value.subscribe.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_start_without_connection_does_nothing(self):
+        publisher = Mock()
+        publisher.client = None
+        subscriber = MidiStateSubscriber(publisher, DeviceStateCache())
+
+        await subscriber.start()
+
+        assert not subscriber.is_running
+
+    @pytest.mark.asyncio
+    async def test_stop_unsubscribes(self, subscriber):
+        await subscriber.start()
+        sub = subscriber._sub
+
+        await subscriber.stop()
+
+        sub.unsubscribe.assert_awaited_once()
+        assert not subscriber.is_running
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('subject, key', [
+        ('midi.reverbengine', 'engine'),
+        ('midi.time', 'time'),
+        ('midi.predelay', 'delay'),
+        ('midi.control1', 'dial1'),
+        ('midi.Control2', 'dial2'),
+    ])
+    async def test_message_updates_cache(self, subscriber, subject, key):
+        msg = create_message(subject, {'value': 'Hall'})
+
+        await subscriber._on_message(msg)
+
+        assert subscriber._cache.get(key) == 'Hall'
+
+    @pytest.mark.asyncio
+    async def test_unknown_setting_is_ignored(self, subscriber):
+        msg = create_message('midi.unknown', {'value': '1'})
+
+        await subscriber._on_message(msg)
+
+        assert subscriber._cache.snapshot() == {}
+
+    @pytest.mark.asyncio
+    async def test_malformed_payload_is_ignored(self, subscriber):
+        msg = create_message('midi.time', b'not json')
+
+        await subscriber._on_message(msg)
+
+        assert subscriber._cache.get('time') is None
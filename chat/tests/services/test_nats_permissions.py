@@ -0,0 +1,128 @@
+"""Check the chat user's NATS permissions against the subjects the client actually uses.
+
+The state layer's ``nats.conf.template`` grants the chat user a fixed list of
+JetStream API subjects. The subjects nats-py uses depend on the consumer kind
+(ordered, named, durable) and on whether a stream name is passed, so they are
+recorded here from the real ``JetStreamContext`` over a fake connection.
+"""
+
+import asyncio
+import json
+import re
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from nats.aio.client import ServerVersion
+from nats.js import JetStreamContext
+
+from services.effect_state_store import EffectStateStore
+from services.midi_state_subscriber import MidiStateSubscriber
+from services.state_cache import DeviceStateCache
+
+NATS_CONF = Path(__file__).resolve().parents[3] / 'state' / 'nats.conf.template'
+# Server-chosen reply subjects of ordered consumer flow control messages: $JS.FC.<stream>.<consumer>.<id>
+FLOW_CONTROL_REPLIES = ('$JS.FC.MIDI_STATE.consumer.1', '$JS.FC.KV_EFFECT_STATE.consumer.1')
+
+
+def chat_permissions() -> dict:
+    """The chat user's publish and subscribe lists from nats.conf.template."""
+    conf = NATS_CONF.read_text()
+    block = conf[conf.index('user: "chat"'):]
+    block = block[:block.index('user: "midi"')]
+    return {
+        kind: re.findall(r'"([^"]+)"', re.search(kind + r': \[(.*?)\]', block, re.S).group(1))
+        for kind in ('publish', 'subscribe')
+    }
+
+
+def permitted(subject: str, patterns: list) -> bool:
+    """NATS subject matching: ``*`` is one token, ``>`` one or more trailing tokens."""
+    tokens = subject.split('.')
+    for pattern in patterns:
+        wanted = pattern.split('.')
+        if wanted[-1] == '>':
+            if len(tokens) >= len(wanted) and all(w in ('*', t) for w, t in zip(wanted[:-1], tokens)):
+                return True
+        elif len(tokens) == len(wanted) and all(w in ('*', t) for w, t in zip(wanted, tokens)):
+            return True
+    return False
+
+
+class RecordingConnection:
+    """Just enough of nats.aio.client.Client to run JetStream calls, recording every subject."""
+
+    is_closed = False
+    connected_server_version = ServerVersion('2.10.0')
+
+    def __init__(self):
+        self.published = []
+        self.subscribed = []
+
+    def jetstream(self):
+        return JetStreamContext(self)
+
+    def new_inbox(self) -> str:
+        return '_INBOX.test'
+
+    async def subscribe(self, subject, **kwargs):
+        self.subscribed.append(subject)
+        return Mock(unsubscribe=AsyncMock(), _received=0, _pending_queue=asyncio.Queue())
+
+    async def publish(self, subject, *args, **kwargs):
+        self.published.append(subject)
+
+    async def request(self, subject, payload=b'', timeout=None, headers=None):
+        self.published.append(subject)
+        stream = subject.split('.')[4] if subject.startswith('$JS.API.') and subject.count('.') >= 4 else ''
+        if subject.endswith('.STREAM.NAMES'):
+            data = {'streams': ['KV_EFFECT_STATE'], 'total': 1, 'offset': 0, 'limit': 1024}
+        elif '.STREAM.INFO.' in subject:
+            data = {
+                'config': {'name': stream, 'subjects': ['$KV.EFFECT_STATE.>'], 'max_msgs_per_subject': 1,
+                           'allow_direct': True},
+                'state': {'messages': 0, 'bytes': 0, 'first_seq': 0, 'last_seq': 0, 'consumer_count': 0},
+                'created': '2026-01-01T00:00:00.0Z',
+            }
+        elif subject.startswith('$KV.'):
+            data = {'stream': 'KV_EFFECT_STATE', 'seq': 1}
+        else:
+            data = {
+                'stream_name': stream, 'name': 'consumer',
+                'config': json.loads(payload or b'{}').get('config', {}),
+                'num_pending': 0, 'num_ack_pending': 0, 'num_redelivered': 0, 'num_waiting': 0,
+                'delivered': {'consumer_seq': 0, 'stream_seq': 0},
+                'ack_floor': {'consumer_seq': 0, 'stream_seq': 0},
+                'created': '2026-01-01T00:00:00.0Z',
+            }
+        return Mock(data=json.dumps(data).encode(), headers=None)
+
+
+@pytest.mark.skipif(not NATS_CONF.exists(), reason='state layer not checked out')
+class TestChatNatsPermissions:
+    """The chat user may use every subject the state services need."""
+
+    @pytest.mark.asyncio
+    async def test_state_services_only_use_permitted_subjects(self):
+        nc = RecordingConnection()
+        publisher = Mock(client=nc)
+        subscriber = MidiStateSubscriber(publisher, DeviceStateCache())
+        store = EffectStateStore(publisher, DeviceStateCache())
+
+        await subscriber.start()
+        await asyncio.wait_for(store.start(), 1)
+        await store.put('engine', 'room')
+        nc.is_closed = True
+        for task in asyncio.all_tasks() - {asyncio.current_task()}:
+            task.cancel()
+
+        permissions = chat_permissions()
+        assert '$JS.API.CONSUMER.CREATE.MIDI_STATE' in nc.published
+        assert '$JS.API.STREAM.NAMES' in nc.published
+        assert [s for s in nc.published + list(FLOW_CONTROL_REPLIES) if not permitted(s, permissions['publish'])] == []
+        assert [s for s in nc.subscribed if not permitted(s, permissions['subscribe'])] == []
+
+    def test_subject_matching(self):
+        assert permitted('$JS.API.CONSUMER.CREATE.MIDI_STATE', ['$JS.API.CONSUMER.CREATE.MIDI_STATE'])
+        assert not permitted('$JS.API.CONSUMER.CREATE.MIDI_STATE', ['$JS.API.CONSUMER.CREATE.MIDI_STATE.>'])
+        assert permitted('$KV.EFFECT_STATE.engine', ['$KV.*.engine'])
@@ -0,0 +1,75 @@
+"""Tests for the sampling profiler."""
+
+import asyncio
+import threading
+import time
+import pytest
+
+from services.profiler import ProfilerBusy, SamplingProfiler
+
+
+def spin(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+def run_until_complete():
+    # Stands in for the frame that entered a uvloop loop, which waits for I/O in C
+    time.sleep(0.3)
+
+
+async def busy():
+    for _ in range(20):
+        spin(0.01)
+        await asyncio.sleep(0)
+
+
+class TestSamplingProfiler:
+    """Test cases for SamplingProfiler."""
+
+    @pytest.mark.asyncio
+    async def test_collapsed_stacks_attribute_task(self):
+        profiler = SamplingProfiler()
+        task = asyncio.create_task(busy(), name='command-engine')
+
+        stacks = await profiler.profile(0.3, rate=500)
+        await task
+
+        lines = stacks.splitlines()
+        assert lines
+        assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+        busy_lines = [line for line in lines if line.startswith('task:command-engine;')]
+        assert any('spin (test_profiler.py' in line for line in busy_lines)
+        assert not profiler.is_running
+
+    @pytest.mark.asyncio
+    async def test_idle_loop_is_labelled(self):
+        profiler = SamplingProfiler()
+
+        stacks = await profiler.profile(0.2, rate=200)
+
+        assert '<idle>;' in stacks
+
+    @pytest.mark.asyncio
+    async def test_loop_waiting_outside_python_is_idle(self):
+        thread = threading.Thread(target=run_until_complete)
+        thread.start()
+        profiler = SamplingProfiler()
+
+        stacks = await profiler.profile(0.2, rate=200, thread_id=thread.ident, loop=asyncio.new_event_loop())
+        thread.join()
+
+        assert '<idle>;' in stacks
+        assert '<loop>;' not in stacks
+        assert profiler._labels == {}
+
+    @pytest.mark.asyncio
+    async def test_only_one_profile_at_a_time(self):
+        profiler = SamplingProfiler()
+        first = asyncio.create_task(profiler.profile(0.2))
+        await asyncio.sleep(0)
+
+        with pytest.raises(ProfilerBusy):
+            await profiler.profile(0.1)
+        await first
@@ -0,0 +1,76 @@
+"""Tests for background dependency readiness probes."""
+
+import asyncio
+import pytest
+
+from services.readiness import ReadinessMonitor
+
+
+async def healthy():
+    return None
+
+
+async def broken():
+    raise ConnectionError('NATS not connected')
+
+
+async def hangs():
+    await asyncio.sleep(10)
+
+
+class TestReadinessMonitor:
+    """Test cases for ReadinessMonitor."""
+
+    def test_not_ready_before_first_probe(self):
+        monitor = ReadinessMonitor({'nats': healthy})
+
+        assert monitor.is_ready is False
+        assert monitor.snapshot() == {'nats': {'status': 'pending'}}
+
+    @pytest.mark.asyncio
+    async def test_ready_when_all_checks_pass(self):
+        monitor = ReadinessMonitor({'nats': healthy, 'midi': healthy})
+
+        await monitor.probe_all()
+
+        assert monitor.is_ready is True
+        snapshot = monitor.snapshot()
+        assert snapshot['midi']['status'] == 'up'
+        assert snapshot['midi']['latency_ms'] >= 0
+
+    @pytest.mark.asyncio
+    async def test_failed_check_reports_error(self):
+        monitor = ReadinessMonitor({'nats': broken, 'midi': healthy})
+
+        await monitor.probe_all()
+
+        assert monitor.is_ready is False
+        assert monitor.snapshot()['nats'] == {
+            'status': 'down',
+            'latency_ms': monitor.snapshot()['nats']['latency_ms'],
+            'checked_at': monitor.snapshot()['nats']['checked_at'],
+            'error': 'NATS not connected',
+        }
+
+    @pytest.mark.asyncio
+    async def test_slow_check_times_out(self):
+        monitor = ReadinessMonitor({'twitch': hangs}, timeout=0.01)
+
+        await monitor.probe_all()
+
+        assert monitor.snapshot()['twitch']['error'] == 'timed out after 0.01s'
+
+    @pytest.mark.asyncio
+    async def test_background_probing(self):
+        calls = []
+
+        async def counted():
+            calls.append(1)
+
+        monitor = ReadinessMonitor({'midi': counted}, interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        assert len(calls) >= 2
+        assert monitor.is_ready is True
@@ -0,0 +1,118 @@
+"""Tests for the shared memory ring buffer."""
+
+import asyncio
+import multiprocessing
+import struct
+import pytest
+
+from services.ring_buffer import Doorbell, RingHandle, SharedRingBuffer
+
+
+def produce(handle: RingHandle, count: int) -> None:
+    """Child process: push ``count`` numbered records."""
+    ring = SharedRingBuffer.attach(handle)
+    for i in range(count):
+        while not ring.push(f'record-{i}'.encode()):
+            pass
+    ring.close()
+
+
+@pytest.fixture
+def ring():
+    ring = SharedRingBuffer.create(capacity=4, record_size=64)
+    yield ring
+    ring.close()
+
+
+class TestSharedRingBuffer:
+    """Test cases for SharedRingBuffer."""
+
+    def test_records_come_out_in_order_across_wraparound(self, ring):
+        popped = []
+        for i in range(10):
+            assert ring.push(f'r{i}'.encode())
+            assert ring.push(f's{i}'.encode())
+            popped += [ring.pop(), ring.pop()]
+
+        assert popped == [m.encode() for i in range(10) for m in (f'r{i}', f's{i}')]
+        assert ring.pop() is None
+        assert len(ring) == 0
+
+    def test_full_ring_refuses_records(self, ring):
+        assert all(ring.push(b'x') for _ in range(4))
+        assert not ring.push(b'y')
+
+        assert ring.pop() == b'x'
+        assert ring.push(b'y')
+        assert len(ring) == 4
+
+    def test_record_larger_than_slot_is_rejected(self, ring):
+        assert ring.max_payload == 56
+        ring.push(b'x' * 56)
+        with pytest.raises(ValueError):
+            ring.push(b'x' * 57)
+
+    def test_unpublished_slot_is_not_read(self, ring):
+        ring.push(b'first')
+        # A producer that advanced tail but has not published the record yet
+        tail_only = SharedRingBuffer.attach(ring.handle)
+        struct.pack_into('<Q', tail_only._buf, 8, 2)
+
+        assert ring.pop() == b'first'
+        assert ring.pop() is None
+        tail_only.close()
+
+    def test_slot_is_reused_only_after_release(self, ring):
+        assert all(ring.push(b'x') for _ in range(4))
+        # A consumer that advanced head but is still reading the slot
+        head_only = SharedRingBuffer.attach(ring.handle)
+        struct.pack_into('<Q', head_only._buf, 0, 1)
+
+        assert not ring.push(b'y')
+        head_only.close()
+
+    def test_consumer_status(self, ring):
+        age, ready = ring.consumer_status()
+        assert age == float('inf') and not ready
+
+        ring.beat(True)
+        other = SharedRingBuffer.attach(ring.handle)
+        age, ready = other.consumer_status()
+        other.close()
+        assert age < 1 and ready
+
+    def test_records_cross_processes(self):
+        context = multiprocessing.get_context('spawn')
+        ring = SharedRingBuffer.create(capacity=8, record_size=64, context=context)
+        producer = context.Process(target=produce, args=(ring.handle, 50))
+        producer.start()
+
+        received = []
+        while len(received) < 50:
+            record = ring.pop()
+            if record is not None:
+                received.append(record)
+        producer.join(10)
+        ring.close()
+
+        assert received == [f'record-{i}'.encode() for i in range(50)]
+        assert producer.exitcode == 0
+
+
+class TestDoorbell:
+    """Test cases for Doorbell."""
+
+    @pytest.mark.asyncio
+    async def test_ring_wakes_waiter_and_clears(self):
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        consumer, producer = Doorbell(reader=reader), Doorbell(writer=writer)
+
+        waiting = asyncio.create_task(consumer.wait(5))
+        await asyncio.sleep(0)
+        producer.ring()
+        producer.ring()
+        await asyncio.wait_for(waiting, 1)
+
+        start = asyncio.get_running_loop().time()
+        await consumer.wait(0.05)
+        assert asyncio.get_running_loop().time() - start >= 0.04
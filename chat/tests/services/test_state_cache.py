@@ -0,0 +1,93 @@
+"""Tests for the device state cache."""
+
+import asyncio
+import pytest
+
+from services.state_cache import DeviceStateCache
+
+
+class TestDeviceStateCache:
+    """Test cases for DeviceStateCache."""
+
+    @pytest.fixture
+    def cache(self):
+        return DeviceStateCache()
+
+    def test_get_unknown_key_returns_none(self, cache):
+        assert cache.get('engine') is None
+        assert cache.entry('engine') is None
+
+    def test_update_stores_value_and_bumps_revision(self, cache):
+        entry = cache.update('engine', 'Hall')
+
+        assert cache.get('engine') == 'Hall'
+        assert entry.revision == 1
+        assert entry.source == 'midi'
+        assert cache.revision == 1
+
+    def test_snapshot_returns_copy(self, cache):
+        cache.update('engine', 'Room')
+        cache.update('time', '5')
+
+        snapshot = cache.snapshot()
+        snapshot['engine'] = 'Plate'
+
+        assert cache.snapshot() == {'engine': 'Room', 'time': '5'}
+
+    @pytest.mark.asyncio
+    async def test_wait_for_update_returns_newer_entry(self, cache):
+        since = cache.revision
+
+        async def publish_later():
+            await asyncio.sleep(0.01)
+            cache.update('engine', 'Plate')
+
+        asyncio.create_task(publish_later())
+        entry = await cache.wait_for_update('engine', since, timeout=1)
+
+        assert entry is not None
+        assert entry.value == 'Plate'
+
+    @pytest.mark.asyncio
+    async def test_wait_for_update_returns_existing_newer_entry(self, cache):
+        since = cache.revision
+        cache.update('engine', 'Room')
+
+        entry = await cache.wait_for_update('engine', since, timeout=0.01)
+
+        assert entry.value == 'Room'
+
+    @pytest.mark.asyncio
+    async def test_wait_for_update_times_out(self, cache):
+        entry = await cache.wait_for_update('engine', cache.revision, timeout=0.01)
+
+        assert entry is None
+        assert cache._waiters == {}
+
+    @pytest.mark.asyncio
+    async def test_wait_for_update_ignores_other_keys(self, cache):
+        since = cache.revision
+
+        async def publish_later():
+            await asyncio.sleep(0.01)
+            cache.update('time', '3')
+
+        asyncio.create_task(publish_later())
+        entry = await cache.wait_for_update('engine', since, timeout=0.05)
+
+        assert entry is None
+
+    @pytest.mark.asyncio
+    async def test_wait_for_update_filters_by_source(self, cache):
+        since = cache.revision
+
+        async def publish_later():
+            await asyncio.sleep(0.01)
+            cache.update('engine', 'Room', source='kv')
+            await asyncio.sleep(0.01)
+            cache.update('engine', 'Hall', source='midi')
+
+        asyncio.create_task(publish_later())
+        entry = await cache.wait_for_update('engine', since, timeout=1, source='midi')
+
+        assert entry.value == 'Hall'
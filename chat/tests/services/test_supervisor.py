@@ -0,0 +1,194 @@
+"""Tests for the supervisor tree."""
+
+import asyncio
+import multiprocessing
+import signal
+import sys
+import time
+import pytest
+
+from services.supervisor import ESCALATIONS, RESTARTS, ChildProcess, Supervisor, SupervisorEscalation
+
+
+def exit_with(code: int) -> None:
+    """Child process target."""
+    sys.exit(code)
+
+
+def wait_for_sigterm(installed) -> None:
+    """Child process target: exit cleanly on SIGTERM."""
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    installed.set()
+    time.sleep(30)
+
+
+def fast(name: str, max_restarts: int = 3) -> Supervisor:
+    return Supervisor(name, max_restarts=max_restarts, window=60, backoff_initial=0.01, backoff_max=0.05)
+
+
+class TestSupervisor:
+    """Test cases for Supervisor."""
+
+    @pytest.mark.asyncio
+    async def test_failed_child_is_restarted(self):
+        supervisor = fast('restart')
+        runs = []
+
+        async def flaky():
+            runs.append(1)
+            if len(runs) < 3:
+                raise ConnectionError('dropped')
+
+        supervisor.add('test-flaky', flaky, permanent=False)
+        await asyncio.wait_for(supervisor.run(), 1)
+
+        assert len(runs) == 3
+        assert supervisor.status() == [
+            {'supervisor': 'restart', 'child': 'test-flaky', 'running': False, 'restarts': 2}
+        ]
+        assert RESTARTS.labels('restart', 'test-flaky').value == 2
+
+    @pytest.mark.asyncio
+    async def test_transient_child_that_returns_is_not_restarted(self):
+        supervisor = fast('transient')
+        runs = []
+
+        async def once():
+            runs.append(1)
+
+        supervisor.add('test-once', once, permanent=False)
+        await asyncio.wait_for(supervisor.run(), 1)
+
+        assert runs == [1]
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_escalates_and_cancels_siblings(self):
+        supervisor = fast('budget', max_restarts=2)
+        sibling_cancelled = asyncio.Event()
+
+        async def broken():
+            raise RuntimeError('boom')
+
+        async def sibling():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                sibling_cancelled.set()
+                raise
+
+        supervisor.add('test-broken', broken)
+        supervisor.add('test-sibling', sibling)
+        with pytest.raises(SupervisorEscalation) as raised:
+            await asyncio.wait_for(supervisor.run(), 1)
+
+        assert isinstance(raised.value.__cause__, RuntimeError)
+        assert sibling_cancelled.is_set()
+        assert RESTARTS.labels('budget', 'test-broken').value == 2
+        assert ESCALATIONS.labels('budget').value == 1
+
+    @pytest.mark.asyncio
+    async def test_subtree_is_restarted_before_escalating_to_the_root(self):
+        root = fast('root', max_restarts=1)
+        subtree = fast('subtree', max_restarts=1)
+        runs = []
+
+        async def broken():
+            runs.append(1)
+            raise RuntimeError('boom')
+
+        subtree.add('test-broken', broken)
+        root.add_supervisor(subtree)
+        with pytest.raises(SupervisorEscalation):
+            await asyncio.wait_for(root.run(), 1)
+
+        # Two runs of the subtree (initial + one restart), each with one child restart
+        assert len(runs) == 4
+        assert RESTARTS.labels('root', 'supervisor-subtree').value == 1
+
+    @pytest.mark.asyncio
+    async def test_shutdown_stops_restarts(self):
+        supervisor = fast('shutdown')
+        stop = asyncio.Event()
+        runs = []
+
+        async def service():
+            runs.append(1)
+            await stop.wait()
+
+        supervisor.add('test-service', service)
+        run = asyncio.create_task(supervisor.run())
+        await asyncio.sleep(0.01)
+
+        supervisor.shutdown()
+        stop.set()
+        await asyncio.wait_for(run, 1)
+
+        assert runs == [1]
+
+    @pytest.mark.asyncio
+    async def test_cancelling_the_supervisor_cancels_children(self):
+        supervisor = fast('cancel')
+        cancelled = asyncio.Event()
+
+        async def service():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        supervisor.add('test-service', service)
+        run = asyncio.create_task(supervisor.run())
+        await asyncio.sleep(0.01)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+
+        assert cancelled.is_set()
+        assert supervisor.status()[0]['restarts'] == 0
+
+    def test_duplicate_child_names_are_rejected(self):
+        supervisor = fast('duplicate')
+
+        async def noop():
+            pass
+
+        supervisor.add('test-noop', noop)
+        with pytest.raises(ValueError):
+            supervisor.add('test-noop', noop)
+
+
+class TestChildProcess:
+    """Test cases for ChildProcess."""
+
+    @pytest.mark.asyncio
+    async def test_failed_process_is_restarted_then_escalates(self):
+        supervisor = fast('processes', max_restarts=1)
+        child = ChildProcess('test-exits', exit_with, 3)
+        supervisor.add('process-test', child.run)
+
+        with pytest.raises(SupervisorEscalation):
+            await asyncio.wait_for(supervisor.run(), 30)
+
+        assert child.process.exitcode == 3
+        assert RESTARTS.labels('processes', 'process-test').value == 1
+
+    @pytest.mark.asyncio
+    async def test_clean_exit_returns(self):
+        child = ChildProcess('test-clean', exit_with, 0)
+
+        await asyncio.wait_for(child.run(), 30)
+
+        assert child.process.exitcode == 0
+
+    @pytest.mark.asyncio
+    async def test_stop_sends_sigterm(self):
+        installed = multiprocessing.get_context('spawn').Event()
+        child = ChildProcess('test-stop', wait_for_sigterm, installed)
+        run = asyncio.create_task(child.run())
+        assert await asyncio.to_thread(installed.wait, 30)
+
+        await child.stop(10)
+
+        await asyncio.wait_for(run, 5)
+        assert child.process.exitcode == 0
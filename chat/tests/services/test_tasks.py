@@ -0,0 +1,120 @@
+"""Tests for task naming, inspection and leak detection."""
+
+import asyncio
+import pytest
+
+from services.tasks import (
+    TaskLeakDetector,
+    describe_tasks,
+    install_task_factory,
+    name_current_task,
+    spawn,
+    task_kind,
+)
+
+
+async def waits_forever(event):
+    await event.wait()
+
+
+class TestTaskInspection:
+    """Test cases for spawn and describe_tasks."""
+
+    def test_task_kind_strips_trailing_number(self):
+        assert task_kind('Task-12') == 'Task'
+        assert task_kind('command-engine') == 'command-engine'
+        assert task_kind('midi-dial1') == 'midi-dial1'
+
+    @pytest.mark.asyncio
+    async def test_spawned_task_described(self):
+        event = asyncio.Event()
+        task = spawn(waits_forever(event), name='command-engine')
+        await asyncio.sleep(0.01)
+
+        [described] = [t for t in describe_tasks() if t['name'] == 'command-engine']
+        event.set()
+        await task
+
+        assert described['kind'] == 'command-engine'
+        assert described['age_s'] >= 0.01
+        assert 'test_tasks.py' in described['created_at']
+        assert 'test_spawned_task_described' in described['created_at']
+        assert described['await_point'].endswith('in waits_forever')
+
+    @pytest.mark.asyncio
+    async def test_task_factory_records_foreign_tasks(self):
+        loop = asyncio.get_running_loop()
+        previous = loop.get_task_factory()
+        install_task_factory()
+        try:
+            event = asyncio.Event()
+            task = asyncio.ensure_future(waits_forever(event))
+            await asyncio.sleep(0)
+            [described] = [t for t in describe_tasks() if t['name'] == task.get_name()]
+            event.set()
+            await task
+        finally:
+            loop.set_task_factory(previous)
+
+        assert 'test_task_factory_records_foreign_tasks' in described['created_at']
+
+    @pytest.mark.asyncio
+    async def test_task_factory_creates_named_tasks(self):
+        loop = asyncio.get_running_loop()
+        previous = loop.get_task_factory()
+        install_task_factory()
+        try:
+            event = asyncio.Event()
+            spawned = spawn(waits_forever(event), name='test-spawned')
+            # Python 3.13.3+ hands create_task's keywords to the factory
+            direct = loop.get_task_factory()(loop, waits_forever(event), name='test-direct', context=None)
+            await asyncio.sleep(0)
+            names = {t['name'] for t in describe_tasks()}
+            event.set()
+            await asyncio.gather(spawned, direct)
+        finally:
+            loop.set_task_factory(previous)
+
+        assert {'test-spawned', 'test-direct'} <= names
+
+    @pytest.mark.asyncio
+    async def test_name_current_task(self):
+        async def command():
+            name_current_task('command-time')
+            return asyncio.current_task().get_name()
+
+        assert await asyncio.create_task(command()) == 'command-time'
+
+
+class TestTaskLeakDetector:
+    """Test cases for TaskLeakDetector."""
+
+    @pytest.mark.asyncio
+    async def test_flags_kind_growing_for_whole_window(self):
+        detector = TaskLeakDetector(window=3, min_count=2)
+        event = asyncio.Event()
+        tasks = []
+
+        for _ in range(4):
+            tasks.append(spawn(waits_forever(event), name='command-engine'))
+            detector.sample()
+
+        assert detector.suspects == {'command-engine': 4}
+
+        event.set()
+        await asyncio.gather(*tasks)
+        detector.sample()
+        assert detector.suspects == {}
+
+    @pytest.mark.asyncio
+    async def test_stable_count_not_flagged(self):
+        detector = TaskLeakDetector(window=2, min_count=1)
+        event = asyncio.Event()
+        task = spawn(waits_forever(event), name='nats-connect')
+
+        for _ in range(4):
+            detector.sample()
+
+        event.set()
+        await task
+        assert detector.suspects == {}
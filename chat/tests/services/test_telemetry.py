@@ -0,0 +1,137 @@
+"""Tests for command lifecycle telemetry."""
+
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from config.logging_config import correlation_id_var, deadline_scope, record_stage
+from services.telemetry import CommandTelemetry
+
+
+def publisher():
+    nats = Mock()
+    nats.client = Mock()
+    nats.client.is_connected = True
+    nats.client.publish = AsyncMock()
+    return nats
+
+
+def published(nats):
+    return [json.loads(c.args[1]) for c in nats.client.publish.await_args_list]
+
+
+@pytest.fixture
+def correlation_id():
+    token = correlation_id_var.set(str(uuid.uuid4()))
+    yield correlation_id_var.get()
+    correlation_id_var.reset(token)
+
+
+class TestCommandTelemetry:
+    """Test cases for CommandTelemetry."""
+
+    def test_command_lifecycle_events(self, correlation_id):
+        telemetry = CommandTelemetry('chat.telemetry.commands')
+        sent = datetime.now(timezone.utc) - timedelta(milliseconds=250)
+
+        with deadline_scope(10), telemetry.command('engine', sent):
+            record_stage('midi_http', 0.1)
+            record_stage('midi_http', 0.05)
+            telemetry.emit('queued', wait_ms=12.5)
+            telemetry.finish('ok', 0.2, failed=False)
+
+        received, queued, executed = telemetry._pending
+        assert received['event'] == 'received'
+        assert received['command'] == 'engine'
+        assert received['cid'] == correlation_id
+        assert 250 <= received['dispatch_ms'] < 1000
+        assert queued['wait_ms'] == 12.5
+        assert executed['event'] == 'executed'
+        assert executed['outcome'] == 'ok'
+        assert executed['ms'] == 200.0
+        assert executed['stages'] == {'midi_http': 150.0}
+
+    def test_failure_emits_failed(self, correlation_id):
+        telemetry = CommandTelemetry('chat.telemetry.commands')
+
+        with telemetry.command('engine'):
+            telemetry.finish('timeout', 10.0, failed=True)
+
+        assert [e['event'] for e in telemetry._pending] == ['received', 'failed']
+
+    def test_disabled_without_subject(self, correlation_id):
+        telemetry = CommandTelemetry('')
+
+        with telemetry.command('engine'):
+            telemetry.finish('ok', 0.1, failed=False)
+
+        assert telemetry.pending == 0
+
+    def test_sampling_keeps_whole_commands_and_all_failures(self):
+        telemetry = CommandTelemetry('chat.telemetry.commands', sample_rate=0.5)
+        for i in range(200):
+            token = correlation_id_var.set(f'{(2 * i + 1) * 0xFFFFFFFF // 400:08x}-0000')
+            try:
+                with telemetry.command('engine'):
+                    telemetry.finish('error', 0.1, failed=True)
+            finally:
+                correlation_id_var.reset(token)
+
+        events = list(telemetry._pending)
+        received = [e['cid'] for e in events if e['event'] == 'received']
+        failed = [e for e in events if e['event'] == 'failed']
+        assert len(received) == 100
+        assert len(failed) == 200
+
+    def test_pending_bounded(self, correlation_id):
+        telemetry = CommandTelemetry('chat.telemetry.commands', max_pending=3)
+
+        for i in range(5):
+            telemetry.emit('queued', wait_ms=i)
+
+        assert [e['wait_ms'] for e in telemetry._pending] == [2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_flush_publishes_batches(self, correlation_id):
+        telemetry = CommandTelemetry('chat.telemetry.commands', batch_size=2)
+        nats = publisher()
+        telemetry._publisher = nats
+        for i in range(3):
+            telemetry.emit('queued', wait_ms=i)
+
+        await telemetry.flush()
+
+        assert [c.args[0] for c in nats.client.publish.await_args_list] == ['chat.telemetry.commands'] * 2
+        assert [[e['wait_ms'] for e in batch] for batch in published(nats)] == [[0, 1], [2]]
+        assert telemetry.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_events_kept_while_disconnected(self, correlation_id):
+        telemetry = CommandTelemetry('chat.telemetry.commands')
+        nats = publisher()
+        nats.client.is_connected = False
+        telemetry._publisher = nats
+        telemetry.emit('queued', wait_ms=1)
+
+        await telemetry.flush()
+
+        nats.client.publish.assert_not_awaited()
+        assert telemetry.pending == 1
+
+    @pytest.mark.asyncio
+    async def test_full_batch_published_without_waiting_for_interval(self, correlation_id):
+        telemetry = CommandTelemetry('chat.telemetry.commands', interval=60, batch_size=2)
+        nats = publisher()
+        telemetry.start(nats)
+        try:
+            telemetry.emit('queued', wait_ms=1)
+            telemetry.emit('queued', wait_ms=2)
+            await asyncio.sleep(0.01)
+        finally:
+            await telemetry.stop()
+
+        assert len(published(nats)) == 1
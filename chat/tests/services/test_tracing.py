@@ -0,0 +1,147 @@
+"""Tests for span tracing."""
+
+import re
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+
+from config.logging_config import correlation_id_var
+from services.tracing import (
+    OtlpExporter,
+    RingBufferExporter,
+    Span,
+    Tracer,
+    current_span_var,
+    inject_headers,
+)
+
+
+@pytest.fixture
+def tracer():
+    return Tracer(RingBufferExporter(100))
+
+
+class TestTracer:
+    """Test cases for trace and span creation."""
+
+    def test_trace_id_is_correlation_id(self, tracer):
+        with tracer.start_trace('command engine') as root:
+            correlation_id = correlation_id_var.get()
+
+        assert correlation_id.replace('-', '') == root.trace_id
+        assert correlation_id_var.get() is None
+        assert current_span_var.get() is None
+
+    def test_trace_starts_at_message_timestamp_with_dispatch_span(self, tracer):
+        received_at = datetime.now(timezone.utc) - timedelta(milliseconds=250)
+
+        with tracer.start_trace('command engine', received_at=received_at):
+            pass
+
+        [trace] = tracer.buffer.traces()
+        spans = {span['name']: span for span in trace['spans']}
+        assert spans['dispatch']['duration_ms'] >= 240
+        assert spans['command engine']['duration_ms'] >= spans['dispatch']['duration_ms']
+
+    def test_child_spans_link_to_parent(self, tracer):
+        with tracer.start_trace('command engine') as root:
+            with tracer.span('handler') as handler:
+                with tracer.span('midi.http POST', endpoint='api/Midi/SetEffect') as http:
+                    pass
+
+        assert handler.parent_id == root.span_id
+        assert http.parent_id == handler.span_id
+        assert http.trace_id == root.trace_id
+        assert http.attributes == {'endpoint': 'api/Midi/SetEffect'}
+
+    def test_exception_marks_span_failed(self, tracer):
+        with pytest.raises(ValueError):
+            with tracer.span('reply') as span:
+                raise ValueError('boom')
+
+        assert 'boom' in span.error
+        assert span.end_ns is not None
+
+    def test_inject_headers(self, tracer):
+        with tracer.start_trace('command engine'):
+            with tracer.span('nats.publish') as span:
+                headers = inject_headers({})
+
+        assert headers['traceparent'] == f'00-{span.trace_id}-{span.span_id}-01'
+        assert re.fullmatch(r'00-[0-9a-f]{32}-[0-9a-f]{16}-01', headers['traceparent'])
+        assert headers['X-Correlation-ID'].replace('-', '') == span.trace_id
+
+
+class TestRingBufferExporter:
+    """Test cases for the in-process span buffer."""
+
+    def test_traces_filtered_by_correlation_id(self, tracer):
+        with tracer.start_trace('command engine'):
+            wanted = correlation_id_var.get()
+        with tracer.start_trace('command time'):
+            pass
+
+        [trace] = tracer.buffer.traces(wanted)
+        assert trace['spans'][0]['name'] == 'command engine'
+
+    def test_most_recent_first_and_limited(self, tracer):
+        for name in ('a', 'b', 'c'):
+            with tracer.start_trace(name):
+                pass
+
+        traces = tracer.buffer.traces(limit=2)
+        assert [t['spans'][0]['name'] for t in traces] == ['c', 'b']
+
+    def test_capacity_bounds_memory(self):
+        buffer = RingBufferExporter(2)
+        for _ in range(5):
+            span = Span('x', 'a' * 32)
+            span.end_ns = span.start_ns
+            buffer.export(span)
+
+        assert len(buffer.traces()[0]['spans']) == 2
+
+
+class TestOtlpExporter:
+    """Test cases for OTLP/JSON export."""
+
+    @pytest.mark.asyncio
+    async def test_flush_posts_otlp_json(self):
+        exporter = OtlpExporter('http://collector:4318/', interval=5, max_pending=10)
+        span = Span('command engine', 'a' * 32)
+        span.set_attribute('command', 'engine')
+        span.end_ns = span.start_ns + 1000
+        exporter.export(span)
+
+        response = MagicMock()
+        response.raise_for_status = Mock()
+        response.__aenter__ = AsyncMock(return_value=response)
+        response.__aexit__ = AsyncMock(return_value=None)
+        session = MagicMock()
+        session.post = MagicMock(return_value=response)
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=None)
+
+        with patch('aiohttp.ClientSession', return_value=session):
+            await exporter.flush()
+
+        url = session.post.call_args.args[0]
+        body = session.post.call_args.kwargs['json']
+        assert url == 'http://collector:4318/v1/traces'
+        [otlp_span] = body['resourceSpans'][0]['scopeSpans'][0]['spans']
+        assert otlp_span['traceId'] == 'a' * 32
+        assert otlp_span['endTimeUnixNano'] == str(span.start_ns + 1000)
+        assert {'key': 'command', 'value': {'stringValue': 'engine'}} in otlp_span['attributes']
+
+    @pytest.mark.asyncio
+    async def test_flush_failure_drops_spans(self):
+        exporter = OtlpExporter('http://collector:4318', interval=5, max_pending=10)
+        span = Span('x', 'a' * 32)
+        span.end_ns = span.start_ns
+        exporter.export(span)
+
+        with patch('aiohttp.ClientSession', side_effect=OSError('unreachable')):
+            await exporter.flush()
+
+        assert not exporter._pending
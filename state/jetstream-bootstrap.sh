@@ -97,6 +97,16 @@ else
   log "WARNING: DATA_API failed: $output"
 fi
 
+# Create EFFECT_STATE key-value bucket (latest value per device setting, shared by chat replicas)
+output=$(nats_cmd kv add EFFECT_STATE --history 1 --storage file --replicas 1 2>&1)
+if [ $? -eq 0 ]; then
+  log "✓ EFFECT_STATE bucket created"
+elif nats_cmd kv info EFFECT_STATE >/dev/null 2>&1; then
+  log "ℹ EFFECT_STATE bucket exists"
+else
+  log "WARNING: EFFECT_STATE bucket failed: $output"
+fi
+
 log "JetStream bootstrap complete"
 exit 0
 